@@ -0,0 +1,144 @@
+# benchmarks/datagen.py
+"""
+Synthetic PawCare datasets for benchmarks.
+
+    python benchmarks/datagen.py OUT_DIR --pets 5 --days 365
+
+writes OUT_DIR/data/pets.json in the same shape the app saves: about three
+feedings a day, regular weigh-ins and a mix of recurring and one-time
+medications per pet, stamped with the current schema version so loading
+it doesn't run migrations. Generation is seeded, so the same arguments
+always give the same file.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.journal import META_KEY  # noqa: E402
+from utils.migrations import SCHEMA_VERSION  # noqa: E402
+
+START_DATE = datetime(2024, 1, 1)
+MEALS = (("Breakfast", 8), ("Lunch", 13), ("Dinner", 19))
+SPECIES = ("cat", "dog")
+
+
+MEDICATION_POOL = (
+    # name, dose, frequency, interval_hours
+    ("Metacam", "0.33ml", "every_day", 24),
+    ("Dermotic", "0.5ml per ear", "custom", 12),
+    ("Apoquel", "5.4mg", "every_day", 24),
+    ("Gabapentin", "50mg", "custom", 8),
+    ("Bravecto", "1 chew", "custom", 2160),
+    ("Heartgard", "1 chew", "weekly", 168),
+    ("Cerenia", "16mg", "every_3_days", 72),
+    ("Rabies vaccine", "1ml", None, None),  # One-time
+)
+SKIPPED_MEAL_RATE = 0.03
+
+
+def _medications(rng, days, start):
+    meds = []
+    for name, dose, frequency, interval in rng.sample(MEDICATION_POOL, rng.randrange(0, 4)):
+        started = start + timedelta(days=rng.randrange(max(1, days)))
+        med = {
+            "timestamp": started.strftime("%Y-%m-%d %H:%M"),
+            "medication": name,
+            "dose": dose,
+            "notes": "",
+            "frequency": frequency or "one_time",
+            "interval_hours": interval,
+            "dosing_time": "09:00",
+            "reminder_enabled": rng.random() < 0.8
+        }
+        if interval:
+            due = started.replace(hour=9, minute=0)
+            end = start + timedelta(days=days)
+            while due < end:
+                due += timedelta(hours=interval)
+            med["next_due"] = due.strftime("%Y-%m-%d %H:%M")
+        else:
+            med["next_due"] = None  # Same shape the CLI writes for a one-time dose
+            med["taken"] = True
+        meds.append(med)
+    return meds
+
+
+def generate_pet(rng, days, start=START_DATE):
+    """
+    One pet with `days` days of history: three meals a day (a few skipped),
+    a weigh-in every 1-7 days and 0-3 medications from MEDICATION_POOL.
+    """
+    species = rng.choice(SPECIES)
+    calories_per_100g = rng.choice((83.0, 95.0, 120.0, 350.0))
+    weight = rng.uniform(3.0, 6.0) if species == "cat" else rng.uniform(5.0, 35.0)
+    weigh_every = rng.randrange(1, 8)
+    feedings, weights = [], []
+    for day in range(days):
+        date = start + timedelta(days=day)
+        for food_name, hour in MEALS:
+            if rng.random() < SKIPPED_MEAL_RATE:
+                continue
+            grams = round(rng.uniform(40, 120), 1)
+            when = date.replace(hour=hour, minute=rng.randrange(60))
+            feedings.append({
+                "food_name": food_name,
+                "grams": grams,
+                "calories": round(grams * calories_per_100g / 100, 2),
+                "time": when.strftime("%Y-%m-%d %H:%M:%S"),
+                "notes": ""
+            })
+        weight = max(1.0, weight + rng.gauss(0, 0.02))
+        if day % weigh_every == 0:
+            weights.append({
+                "timestamp": date.replace(hour=7).strftime("%Y-%m-%d %H:%M"),
+                "weight": round(weight, 2)
+            })
+
+    return {
+        "species": species,
+        "weight": round(weight, 2),
+        "target_daily_calories": rng.randrange(150, 900),
+        "medications": _medications(rng, days, start),
+        "feedings": feedings,
+        "weights": weights,
+        "feeding_schedule": [80.0, 60.0, 60.0],
+        "feeding_reminders": rng.random() < 0.5,
+        "feeding_times": ["08:00", "13:00", "19:00"],
+        "calories_per_100g": calories_per_100g
+    }
+
+
+def generate_pets(n_pets, days, seed=0):
+    rng = random.Random(seed)
+    return {f"Pet{i + 1}": generate_pet(rng, days) for i in range(n_pets)}
+
+
+def write_dataset(out_dir, n_pets, days, seed=0):
+    """Write out_dir/data/pets.json and return its path."""
+    data_dir = os.path.join(out_dir, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, "pets.json")
+    pets = generate_pets(n_pets, days, seed)
+    pets[META_KEY] = {"schema_version": SCHEMA_VERSION}
+    with open(path, "w") as f:
+        json.dump(pets, f, indent=2)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic PawCare dataset")
+    parser.add_argument("out_dir")
+    parser.add_argument("--pets", type=int, default=5)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    path = write_dataset(args.out_dir, args.pets, args.days, args.seed)
+    print(f"Wrote {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
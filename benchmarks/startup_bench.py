@@ -0,0 +1,85 @@
+# benchmarks/startup_bench.py
+"""
+Cold-start benchmark.
+
+    python benchmarks/startup_bench.py [--sizes 0 30 365 1825] [--pets 5] [--runs 5]
+
+For each dataset size (days of history per pet) it runs fresh interpreters
+in a scratch directory and reports the median of:
+
+- import:      `import main`
+- first menu:  launch `python main.py` until "MAIN MENU" is printed
+- first option: launch, pick "4" (List All Pets) and wait for the list,
+                i.e. the point where pets have actually been loaded
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from datagen import write_dataset  # noqa: E402
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_PY = os.path.join(REPO_DIR, "main.py")
+
+
+def time_import(cwd):
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import main"], cwd=cwd, check=True,
+                   env=dict(os.environ, PYTHONPATH=REPO_DIR))
+    return time.perf_counter() - started
+
+
+def time_until(cwd, marker, keys):
+    """Seconds from launching main.py until a line containing `marker` is printed."""
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-u", MAIN_PY], cwd=cwd, text=True, encoding="utf-8",
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    proc.stdin.write(keys)
+    proc.stdin.flush()
+    elapsed = None
+    for line in proc.stdout:
+        if marker in line:
+            elapsed = time.perf_counter() - started
+            break
+    proc.stdin.close()
+    proc.kill()
+    proc.wait()
+    if elapsed is None:
+        raise RuntimeError(f"main.py never printed {marker!r}")
+    return elapsed
+
+
+def bench_size(days, n_pets, runs):
+    with tempfile.TemporaryDirectory() as cwd:
+        if days:
+            write_dataset(cwd, n_pets, days)
+        size = os.path.getsize(os.path.join(cwd, "data", "pets.json")) if days else 0
+        # "PET CARE" line is printed before the menu; run once to warm the .pyc cache
+        time_until(cwd, "MAIN MENU", "0\n")
+        imports = [time_import(cwd) for _ in range(runs)]
+        menus = [time_until(cwd, "MAIN MENU", "0\n") for _ in range(runs)]
+        options = [time_until(cwd, "LIST OF ALL PETS" if days else "No pets", "4\n0\n") for _ in range(runs)]
+    return size, statistics.median(imports), statistics.median(menus), statistics.median(options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PawCare cold-start benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 30, 365, 1825],
+                        help="Days of history per pet")
+    parser.add_argument("--pets", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'days':>6} {'pets.json':>10} {'import':>9} {'first menu':>11} {'first option':>13}")
+    for days in args.sizes:
+        size, imported, menu, option = bench_size(days, args.pets, args.runs)
+        print(f"{days:>6} {size / 1e6:>8.1f}MB {imported * 1000:>7.1f}ms {menu * 1000:>9.1f}ms {option * 1000:>11.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+# benchmarks/suite.py
+"""
+Hot-path benchmark suite.
+
+    python benchmarks/suite.py [--sizes 1x365 100x365 1000x90] [--runs 3]
+                               [--baseline benchmarks/baseline.json] [--save] [--tolerance 0.25]
+                               [--min-delta-ms 1.0]
+
+Each size is PETSxDAYS (e.g. 10000x30 = 10,000 pets with 30 days of
+history), generated with benchmarks/datagen.py into a scratch directory.
+For every size it times, as the median of --runs:
+
+- load_pets                 read pets.json + journal into a fresh dict
+- save_pets                 full snapshot write
+- save_pets_one_changed     repository save after editing one pet
+- normalize_feeding_schedule  the schema v1 migration (no longer run on normal startups)
+- print_daily_summary       first call on freshly loaded pets (builds indexes)
+- print_daily_summary_warm  repeat call
+- view_upcoming_medications (30 days)
+- export_csv / export_json  full export
+
+Results are compared with the baseline file. A benchmark that is more than
+--tolerance slower, and at least --min-delta-ms slower in absolute terms,
+is reported as a regression, and the exit code is 1. The absolute floor
+keeps sub-millisecond benchmarks from failing on timer noise.
+--save writes the current results as the new baseline.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+from datagen import write_dataset  # noqa: E402
+
+DEFAULT_SIZES = ("1x365", "100x365", "1000x90")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_MIN_DELTA_MS = 1.0  # Smaller slowdowns are within timer noise
+
+
+def parse_size(text):
+    pets, _, days = text.lower().partition("x")
+    return int(pets), int(days)
+
+
+def timed(fn, runs, setup=None):
+    """Median seconds of fn(setup()) over `runs` runs (setup isn't timed)."""
+    samples = []
+    for _ in range(runs):
+        arg = setup() if setup else None
+        started = time.perf_counter()
+        fn(arg)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+@contextlib.contextmanager
+def headless(devnull):
+    """Silence output and answer "Press Enter" prompts."""
+    stdin, sys.stdin = sys.stdin, io.StringIO("\n" * 10)
+    try:
+        with contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        sys.stdin = stdin
+
+
+def bench_size(n_pets, days, runs):
+    """Time every benchmark on one generated dataset. Returns {name: seconds}."""
+    from utils import storage
+    from utils.repository import repository
+    from utils.logging_utils import print_daily_summary, view_upcoming_medications
+    from utils.migrations import normalize_feeding_schedule
+    from utils.exporters import export_logs
+    from utils.action_log import action_log
+
+    devnull = open(os.devnull, "w")
+    results = {}
+    with tempfile.TemporaryDirectory() as cwd:
+        write_dataset(cwd, n_pets, days)
+        os.chdir(cwd)
+        storage._store = None  # Store paths are relative to the data directory
+
+        results["load_pets"] = timed(lambda _: repository.load(), runs)
+        pets = repository.load()
+        results["save_pets"] = timed(lambda _: storage.save_pets(pets), runs)
+
+        first = next(iter(pets))
+        def edit_one(_):
+            pets[first]["color"] = f"bench-{time.perf_counter()}"
+            repository.save()
+        results["save_pets_one_changed"] = timed(edit_one, runs)
+
+        results["normalize_feeding_schedule"] = timed(lambda _: normalize_feeding_schedule(pets), runs)
+
+        def dashboard(fresh):
+            with headless(devnull):
+                print_daily_summary(fresh)
+        results["print_daily_summary"] = timed(dashboard, runs, setup=repository.load)
+        pets = repository.load()
+        dashboard(pets)
+        results["print_daily_summary_warm"] = timed(lambda _: dashboard(pets), runs)
+
+        def upcoming(_):
+            with headless(devnull):
+                view_upcoming_medications(pets, 30)
+        results["view_upcoming_medications"] = timed(upcoming, runs)
+
+        def export(fmt):
+            with headless(devnull):
+                export_logs(pets, f"bench.{fmt}", fmt)
+        results["export_csv"] = timed(lambda _: export("csv"), runs)
+        results["export_json"] = timed(lambda _: export("json"), runs)
+
+        journal = getattr(storage.get_store(), "journal", None)
+        if journal is not None:
+            journal.sync()  # Flush the pending group commit while its relative path still resolves
+        action_log.flush()  # Same for queued action records (e.g. a migration)
+        os.chdir(REPO_DIR)
+    devnull.close()
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """
+    [(size, name, baseline, current)] for benchmarks slower than
+    baseline * (1 + tolerance) by at least min_delta_ms.
+    """
+    regressions = []
+    for size, timings in results.items():
+        for name, seconds in timings.items():
+            before = baseline.get(size, {}).get(name)
+            if (before and seconds > before * (1 + tolerance)
+                    and (seconds - before) * 1000 >= min_delta_ms):
+                regressions.append((size, name, before, seconds))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PawCare hot-path benchmarks")
+    parser.add_argument("--sizes", nargs="+", default=list(DEFAULT_SIZES), help="PETSxDAYS, e.g. 100x365")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="Write these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown before a regression is reported (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help="Ignore slowdowns smaller than this many milliseconds")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f).get("results", {})
+
+    results = {}
+    for size in args.sizes:
+        n_pets, days = parse_size(size)
+        print(f"\n{size} ({n_pets} pets x {days} days)")
+        results[size] = bench_size(n_pets, days, args.runs)
+        for name, seconds in results[size].items():
+            before = baseline.get(size, {}).get(name)
+            change = f"{(seconds / before - 1) * 100:+6.1f}%" if before else "    new"
+            print(f"  {name:<28} {seconds * 1000:>10.1f}ms  {change}")
+
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump({"meta": {"date": datetime.now().strftime("%Y-%m-%d %H:%M"),
+                                "python": platform.python_version(),
+                                "platform": platform.platform(),
+                                "runs": args.runs},
+                       "results": results}, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%} "
+              f"(and {args.min_delta_ms:g}ms):")
+        for size, name, before, seconds in regressions:
+            print(f"  {size} {name}: {before * 1000:.1f}ms -> {seconds * 1000:.1f}ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
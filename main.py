@@ -1,25 +1,44 @@
-import os
-from datetime import datetime
+import sys
+import threading
 from utils.colors import Colors
-from utils.pet_manager import load_pets, save_pets, add_pet, edit_pet, remove_pet
-from utils.logging_utils import (
-    log_feeding_entry,
-    log_medication_entry,
-    log_weight_entry,
-    print_daily_summary,
-    plot_weekly_weight_trend,
-    manage_medications,
-    manage_feeding_schedule,
-    change_weight_unit,
-    delete_all_data,
-    reset_user_prefs,
-    export_logs_to_csv,
-    export_logs_to_json,
-    view_upcoming_medications,
-    load_user_prefs,
-    manage_feeding,  
-    normalize_feeding_schedule,  
-)
+import utils.instrumentation  # noqa: F401  Starts metrics/cProfile when PAWCARE_METRICS/PAWCARE_PROFILE is set
+
+# Heavy modules (logging_utils, storage, exporters, importers, matplotlib)
+# are imported inside the menu options that need them, and pets are loaded
+# in the background while the first menu is on screen.
+
+# --- DEFERRED STARTUP ---
+_pets = None
+_pets_lock = threading.Lock()
+
+def get_pets():
+    """
+    Return the loaded pets, loading them on first use (older data is
+    migrated once), attach the feeding index and start the reminder service.
+    """
+    global _pets
+    with _pets_lock:
+        if _pets is None:
+            from utils.repository import load_pets
+            from utils.feeding_index import feeding_index
+            from utils.reminders import start_reminder_service
+
+            pets = load_pets()
+            feeding_index.build(pets)  # Each pet's history is indexed on first lookup
+            start_reminder_service(pets)  # Feeding + medication reminders in the background
+            _pets = pets
+        return _pets
+
+def reload_pets():
+    """Drop the loaded pets so the next get_pets() reads them again."""
+    global _pets
+    with _pets_lock:
+        _pets = None
+    return get_pets()
+
+def warm_up():
+    """Start loading pets in the background so the first option is instant."""
+    threading.Thread(target=get_pets, name="pawcare-warm-up", daemon=True).start()
 
 # --- HELPER: select_pet() ---
 def select_pet(pets):
@@ -56,8 +75,18 @@ def select_pet(pets):
         return None
 
 # --- SETTINGS MENU --- (UPDATED TO INCLUDE MANAGE FEEDING)
-def show_settings_menu(pets):
+def show_settings_menu():
+    from utils.logging_utils import (
+        manage_feeding,
+        manage_medications,
+        change_weight_unit,
+        delete_all_data,
+        reset_user_prefs,
+        load_user_prefs,
+    )
+
     while True:
+        pets = get_pets()
         print("\n" + "="*60)
         print(Colors.BLUE + Colors.BOLD + "⚙️  SETTINGS" + Colors.RESET)
         print("="*60)
@@ -66,7 +95,8 @@ def show_settings_menu(pets):
         print("3. Change Weight Unit (Current: " + load_user_prefs().get("unit", "kg").upper() + ")")
         print("4. Delete All Data (Clear Files)")
         print("5. Reset User Preferences")
-        print("6. Back to Main Menu")
+        print("6. Import Logs (CSV/JSON)")
+        print("7. Back to Main Menu")
         print("-" * 60)
 
         choice = input("Choose option: ").strip()
@@ -79,10 +109,15 @@ def show_settings_menu(pets):
             change_weight_unit()
         elif choice == "4":
             delete_all_data()
-            pets = load_pets()  # Reload empty pets after clear
+            reload_pets()  # Reload empty pets after clear
         elif choice == "5":
             reset_user_prefs()
         elif choice == "6":
+            path = input("Path to log file (e.g., logs_export.csv): ").strip()
+            if path:
+                from utils.importers import run_import
+                run_import(pets, path)
+        elif choice == "7":
             print(Colors.CYAN + "← Returning to main menu..." + Colors.RESET)
             break
         else:
@@ -97,8 +132,7 @@ def main():
     print(Colors.CYAN + "🐾 PET CARE TRACKER" + Colors.RESET)
     print("=" * 40)
 
-    pets = load_pets()
-    normalize_feeding_schedule(pets)
+    warm_up()
 
     while True:
         print("\n" + "="*50)
@@ -112,10 +146,18 @@ def main():
         print("7. View Weekly Weight Trend")
         print("8. Export Logs (CSV/JSON)")
         print("9. Settings")  # 👈 Now only 9 items — cleaner!
+        print("10. Multi-Pet Analytics")
         print("0. Exit")
         print("="*50)
 
         choice = input("Choose an option: ").strip()
+        if choice == "0":
+            print(Colors.GREEN + "👋 Goodbye!" + Colors.RESET)
+            break
+
+        pets = get_pets()
+        if choice in ("1", "2", "3"):
+            from utils.pet_manager import add_pet, edit_pet, remove_pet, save_pets
 
         if choice == "1":
             add_pet(pets)
@@ -156,6 +198,8 @@ def main():
             print("0. Back")
             sub_choice = input("Choose: ").strip()
 
+            from utils.logging_utils import log_feeding_entry, log_medication_entry, log_weight_entry
+
             if sub_choice == "1":
                 log_feeding_entry(pets)
             elif sub_choice == "2":
@@ -168,33 +212,48 @@ def main():
                 print(Colors.RED + "❌ Invalid option." + Colors.RESET)
 
         elif choice == "6":
+            from utils.logging_utils import print_daily_summary
             print_daily_summary(pets)
 
         elif choice == "7":
+            from utils.logging_utils import plot_weekly_weight_trend
             plot_weekly_weight_trend(pets)
 
         elif choice == "8":
             print("\nExport format:")
             print("1. CSV")
             print("2. JSON")
-            fmt = input("Choose (1 or 2): ").strip()
+            print("3. JSON Lines")
+            fmt = input("Choose (1, 2 or 3): ").strip()
+            if fmt not in ("1", "2", "3"):
+                print(Colors.RED + "❌ Invalid option." + Colors.RESET)
+                continue
             filename = input("Enter filename (e.g., logs): ").strip() or "logs"
+            pet_filter = input("Only these pets (comma-separated, blank = all): ").strip()
+            pet_names = [p.strip() for p in pet_filter.split(",") if p.strip()] or None
+            start = input("From date (YYYY-MM-DD, blank = beginning): ").strip() or None
+            end = input("To date (YYYY-MM-DD, blank = latest): ").strip() or None
+            compress = input("Compress with gzip? (y/N): ").strip().lower() == "y"
+            from utils.logging_utils import export_logs_to_csv, export_logs_to_json, export_logs_to_jsonl
             if fmt == "1":
-                export_logs_to_csv(pets, f"{filename}.csv")
+                export_logs_to_csv(pets, f"{filename}.csv", pet_names, start, end, compress)
             elif fmt == "2":
-                export_logs_to_json(pets, f"{filename}.json")
+                export_logs_to_json(pets, f"{filename}.json", pet_names, start, end, compress)
             else:
-                print(Colors.RED + "❌ Invalid option." + Colors.RESET)
+                export_logs_to_jsonl(pets, f"{filename}.jsonl", pet_names, start, end, compress)
 
         elif choice == "9":
-            show_settings_menu(pets)
+            show_settings_menu()
 
-        elif choice == "0":
-            print(Colors.GREEN + "👋 Goodbye!" + Colors.RESET)
-            break
+        elif choice == "10":
+            from utils.logging_utils import print_analytics_dashboard
+            print_analytics_dashboard(pets)
 
         else:
             print(Colors.RED + "❌ Invalid choice. Try again." + Colors.RESET)
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        from utils.cli import run_cli
+        sys.exit(run_cli(sys.argv[1:]))
     main()
\ No newline at end of file
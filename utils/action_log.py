@@ -0,0 +1,223 @@
+# utils/action_log.py
+"""
+Structured action (audit) log.
+
+Every mutation — pets added, edited or removed, log entries, deletions —
+is recorded as one JSON line in data/actions.log:
+
+    {"ts": "2026-10-16 09:30:12", "action": "edit_pet", "pet": "Rex",
+     "message": "Updated weight for Rex to 12.5", "details": {...}}
+
+record() only queues the record; a background thread writes queued
+records in batches (every FLUSH_SECONDS or BATCH_SIZE records), so the
+menu never waits on the disk.
+
+The current file is rotated once it passes MAX_BYTES, or when the first
+record of a new day arrives. Rotated files are gzipped to
+data/actions-YYYYMMDD-HHMMSS.log.gz (named after the rotation time) and
+only the newest KEEP_ROTATED are kept.
+
+query() reads the rotated files and the current one, oldest first,
+filtered by pet, action and time range.
+"""
+import atexit
+import glob
+import gzip
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from datetime import datetime
+from utils.columnar import to_jsonable
+from utils.journal import FSYNC_MODE
+
+ACTION_LOG_FILE = "data/actions.log"
+MAX_BYTES = int(os.environ.get("PAWCARE_ACTION_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+KEEP_ROTATED = 10
+FLUSH_SECONDS = 0.5   # Longest a record waits in the queue
+BATCH_SIZE = 500      # Records per write at most
+FLUSH_TIMEOUT = 5     # Seconds flush() waits for the writer
+
+TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+_ROTATED_NAME = re.compile(r"-(\d{8}-\d{6})(?:-(\d+))?\.[^.]*\.gz$")
+
+
+def _in_range(ts, start, end):
+    """start/end are inclusive timestamp prefixes ('2026-10-16' or '2026-10-16 09:00')."""
+    return (start is None or ts[:len(start)] >= start) and (end is None or ts[:len(end)] <= end)
+
+
+def _rotation_key(path):
+    """('YYYYMMDD-HHMMSS', n) from a rotated file name, so same-second rotations sort in order."""
+    match = _ROTATED_NAME.search(os.path.basename(path))
+    return (match.group(1), int(match.group(2) or 0)) if match else ("", 0)
+
+
+class ActionLog:
+    def __init__(self, path=ACTION_LOG_FILE, max_bytes=MAX_BYTES, keep=KEEP_ROTATED):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self._queue = queue.SimpleQueue()
+        self._writer = None
+        self._lock = threading.Lock()      # Guards starting the writer
+        self._file_lock = threading.Lock()  # Held while the writer touches the files
+        atexit.register(self.flush)
+
+    # --- RECORDING ---
+    def record(self, action, message, pet=None, **details):
+        """Queue one record (returns immediately)."""
+        entry = {"ts": datetime.now().strftime(TS_FORMAT), "action": action, "pet": pet, "message": message}
+        if details:
+            entry["details"] = details
+        self._queue.put(entry)
+        if self._writer is None:
+            self._start()
+
+    def flush(self, timeout=FLUSH_TIMEOUT):
+        """Wait until every record queued so far is on disk."""
+        if self._writer is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _start(self):
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="pawcare-action-log", daemon=True)
+                self._writer.start()
+
+    # --- BACKGROUND WRITER ---
+    def _run(self):
+        while True:
+            batch, waiters = [], []
+            item = self._queue.get()
+            deadline = time.monotonic() + FLUSH_SECONDS
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break  # Someone is waiting: write now
+                batch.append(item)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= BATCH_SIZE or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            try:
+                if batch:
+                    self._write(batch)
+            except OSError as e:
+                print(f"⚠️  Could not write the action log: {e}")
+            finally:
+                for waiter in waiters:
+                    waiter.set()
+
+    def _write(self, batch):
+        with self._file_lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            start = 0
+            for i in range(1, len(batch) + 1):
+                # Split the batch wherever the day changes so each file holds a single day
+                if i < len(batch) and batch[i]["ts"][:10] == batch[start]["ts"][:10]:
+                    continue
+                day = batch[start]["ts"][:10]
+                if self._needs_rotation(day):
+                    self._rotate()
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(r, default=to_jsonable) + "\n" for r in batch[start:i]))
+                    if FSYNC_MODE != "off":
+                        f.flush()
+                        os.fsync(f.fileno())
+                start = i
+
+    def _needs_rotation(self, day):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        if not stat.st_size:
+            return False
+        return stat.st_size >= self.max_bytes or datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d") != day
+
+    def _rotated_path(self):
+        base, ext = os.path.splitext(self.path)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path, n = f"{base}-{stamp}{ext}.gz", 1
+        while os.path.exists(path):  # Several rotations within a second
+            path, n = f"{base}-{stamp}-{n}{ext}.gz", n + 1
+        return path
+
+    def _rotate(self):
+        """Gzip the current file aside and drop the oldest rotated files."""
+        target = self._rotated_path()
+        with open(self.path, "rb") as src, gzip.open(target + ".tmp", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(target + ".tmp", target)
+        os.remove(self.path)
+        rotated = self.rotated_files()
+        for old in rotated[:max(0, len(rotated) - self.keep)]:
+            os.remove(old)
+
+    # --- QUERIES ---
+    def rotated_files(self):
+        """Rotated (gzipped) files, oldest first."""
+        base, ext = os.path.splitext(self.path)
+        return sorted(glob.glob(f"{glob.escape(base)}-*{ext}.gz"), key=_rotation_key)
+
+    @staticmethod
+    def _rotated_stamp(path):
+        """'YYYY-MM-DD HH:MM:SS' a rotated file was closed at (its newest record is no later)."""
+        return datetime.strptime(_rotation_key(path)[0], "%Y%m%d-%H%M%S").strftime(TS_FORMAT)
+
+    def query(self, pet=None, start=None, end=None, action=None):
+        """
+        Yield records (oldest first) for one pet and/or action within
+        [start, end]; start/end are inclusive timestamp prefixes such as
+        '2026-10-16' or '2026-10-16 09:00'. Pending records are flushed first.
+        """
+        self.flush()
+        with self._file_lock:
+            files = [p for p in self.rotated_files()
+                     if start is None or self._rotated_stamp(p) >= start[:19]]  # Skip files closed before start
+            files.append(self.path)
+            # Read everything now so the writer can rotate while the caller iterates
+            matches = []
+            for path in files:
+                if not os.path.exists(path):
+                    continue
+                opener = gzip.open if path.endswith(".gz") else open
+                with opener(path, "rt", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue  # Torn last line after a crash, or a legacy entry
+                        if not isinstance(record, dict) or "ts" not in record:
+                            continue
+                        if end is not None and record["ts"][:len(end)] > end:
+                            break  # Files are in time order
+                        if pet is not None and record.get("pet") != pet:
+                            continue
+                        if action is not None and record.get("action") != action:
+                            continue
+                        if _in_range(record["ts"], start, None):
+                            matches.append(record)
+        yield from matches
+
+    def reset(self):
+        """Delete the current and rotated files."""
+        self.flush()
+        with self._file_lock:
+            for path in self.rotated_files() + [self.path]:
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+# Shared action log used by every module
+action_log = ActionLog()
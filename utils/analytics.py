@@ -0,0 +1,179 @@
+# utils/analytics.py
+"""
+Multi-pet analytics: rolling 7/30/90-day aggregates per pet.
+
+For every pet and window the engine keeps the calorie total, the number of
+days with feedings and the number of days on target, over the last N
+calendar days ending today. New feedings patch those totals in place. When
+the date rolls over, the window slides: days that fall out are subtracted
+and new days are added. So a dashboard over hundreds of pets reads
+precomputed numbers instead of rescanning feedings.
+
+Per-day totals come from the shared feeding index. Weight change is read
+from the cached weight series with bisect (see utils/weight_chart.py).
+"""
+from datetime import date
+from utils.feeding_index import feeding_index
+from utils.weight_chart import series_for
+
+WINDOWS = (7, 30, 90)
+ADHERENCE_TOLERANCE = 0.10  # A day is "on target" within ±10% of target_daily_calories
+
+
+def _ordinal(day_str):
+    return date.fromisoformat(day_str).toordinal()
+
+
+def _day_str(ordinal):
+    return date.fromordinal(ordinal).isoformat()
+
+
+def _on_target(calories, target):
+    return bool(target) and abs(calories - target) <= target * ADHERENCE_TOLERANCE
+
+
+class _Window:
+    """Running totals for one pet over days (anchor - days, anchor]."""
+    __slots__ = ("days", "anchor", "calories", "logged", "on_target")
+
+    def __init__(self, days):
+        self.days = days
+        self.anchor = None
+        self.calories = 0.0
+        self.logged = 0
+        self.on_target = 0
+
+    def _apply(self, totals, target, sign):
+        if totals.meals:
+            self.calories += sign * totals.calories
+            self.logged += sign
+            self.on_target += sign * _on_target(totals.calories, target)
+
+    def slide_to(self, pet_name, anchor, target):
+        """Move the window's last day to `anchor`, touching only the days that changed."""
+        if self.anchor is not None and 0 <= anchor - self.anchor < self.days:
+            leaving = range(self.anchor - self.days + 1, anchor - self.days + 1)
+            entering = range(self.anchor + 1, anchor + 1)
+        else:
+            self.calories, self.logged, self.on_target = 0.0, 0, 0
+            leaving = ()
+            entering = range(anchor - self.days + 1, anchor + 1)
+        for ordinal in leaving:
+            self._apply(feeding_index.day(pet_name, _day_str(ordinal)), target, -1)
+        for ordinal in entering:
+            self._apply(feeding_index.day(pet_name, _day_str(ordinal)), target, +1)
+        self.anchor = anchor
+
+    def covers(self, ordinal):
+        return self.anchor - self.days < ordinal <= self.anchor
+
+
+class _PetState:
+    __slots__ = ("version", "target", "first_day", "windows")
+
+    def __init__(self, version, target, first_day):
+        self.version = version
+        self.target = target
+        self.first_day = first_day
+        self.windows = {days: _Window(days) for days in WINDOWS}
+
+
+class AnalyticsEngine:
+    def __init__(self):
+        self._states = {}   # pet name -> _PetState
+        self._pets_id = None
+
+    def ensure(self, pets):
+        """Forget everything if `pets` is a different dict (e.g. after a reload)."""
+        if self._pets_id != id(pets):
+            self._states.clear()
+            self._pets_id = id(pets)
+
+    def _state(self, pet_name, pet):
+        target = pet.get("target_daily_calories")
+        version = feeding_index.version(pet_name)
+        state = self._states.get(pet_name)
+        if state is None or state.version != version or state.target != target:
+            days = feeding_index.logged_days(pet_name)
+            first_day = min(map(_ordinal, days)) if days else None
+            state = self._states[pet_name] = _PetState(version, target, first_day)
+        return state
+
+    def add_feeding(self, pet_name, entry):
+        """
+        Patch a pet's windows for one new feeding. Call after the feeding
+        index has recorded it. Pets without state yet are skipped — their
+        totals are computed on first use.
+        """
+        state = self._states.get(pet_name)
+        day_str = (entry.get("time") or "")[:10]
+        if state is None or len(day_str) != 10:
+            return
+        ordinal = _ordinal(day_str)
+        calories = entry.get("calories") or 0
+        after = feeding_index.day(pet_name, day_str)
+        first_meal = after.meals == 1
+        was_on_target = not first_meal and _on_target(after.calories - calories, state.target)
+        now_on_target = _on_target(after.calories, state.target)
+        if state.first_day is None or ordinal < state.first_day:
+            state.first_day = ordinal
+        for window in state.windows.values():
+            if window.anchor is None or not window.covers(ordinal):
+                continue
+            window.calories += calories
+            window.logged += first_meal
+            window.on_target += now_on_target - was_on_target
+
+    # --- QUERIES ---
+    def pet_stats(self, pets, pet_name, today=None):
+        """
+        Rolling stats for one pet:
+            {"target": kcal or None,
+             "windows": {7: {"calorie_mean", "days_logged", "days_on_target",
+                             "adherence_pct", "weight_change_pct"}, 30: ..., 90: ...}}
+        calorie_mean is per calendar day since the pet's first feeding (at most
+        the window length); adherence_pct is calorie_mean / target.
+        """
+        self.ensure(pets)
+        pet = pets[pet_name]
+        state = self._state(pet_name, pet)
+        anchor = (today or date.today()).toordinal()
+        series = series_for(pet_name, pet.get("weights", []))
+
+        result = {"target": state.target, "windows": {}}
+        for days, window in state.windows.items():
+            if window.anchor != anchor:
+                window.slide_to(pet_name, anchor, state.target)
+            span = days if state.first_day is None else max(1, min(days, anchor - state.first_day + 1))
+            mean = window.calories / span if window.logged else None
+            result["windows"][days] = {
+                "calorie_mean": mean,
+                "days_logged": window.logged,
+                "days_on_target": window.on_target,
+                "adherence_pct": mean / state.target * 100 if mean is not None and state.target else None,
+                "weight_change_pct": weight_change_pct(series, days),
+            }
+        return result
+
+    def dashboard(self, pets, today=None):
+        """pet_stats for every pet, as {pet_name: stats}."""
+        return {pet_name: self.pet_stats(pets, pet_name, today) for pet_name in pets}
+
+
+def weight_change_pct(series, days):
+    """
+    % change from the weight at the start of the last `days` days (the last
+    reading at or before it, else the first one inside) to the latest weight.
+    None without two readings to compare.
+    """
+    if len(series) < 2:
+        return None
+    _, hi = series.window(None, series.times[-1] - days * 86400)
+    baseline = series.values[hi - 1] if hi > 0 else series.values[0]
+    if not baseline:
+        return None
+    return (series.values[-1] - baseline) / baseline * 100
+
+
+# Shared engine, kept current by the logging functions
+analytics = AnalyticsEngine()
@@ -0,0 +1,269 @@
+# utils/anomalies.py
+"""
+Streaming health alerts: rapid weight change and under-target calories.
+
+Each pet keeps a small running state that is updated in O(1) per logged
+event, never by rescanning its history:
+
+- weight: an EWMA of recent readings plus a least-squares slope over the
+  last SLOPE_READINGS readings (running sums, oldest reading dropped as a
+  new one arrives). A single-reading jump is only judged against an
+  average whose last reading is under ALERT_MAX_AGE_DAYS old
+- calories: the last day already checked. When a feeding lands on a later
+  day (or the dashboard runs on a later day) every day in between is
+  closed, including days nothing was fed: its total, read from the feeding
+  index, is compared with the pet's feeding_schedule total (or
+  target_daily_calories)
+
+Alerts go on a shared AlertQueue. Each reader (dashboard, console, the
+reminder path) drains it with its own cursor, so one reader never hides an
+alert from another.
+"""
+import itertools
+import threading
+from bisect import bisect_left
+from collections import deque
+from datetime import date, timedelta
+from utils import timestamps
+from utils.feeding_index import feeding_index
+from utils.weight_chart import series_for
+
+EWMA_ALPHA = 0.3
+SLOPE_READINGS = 7              # Readings in the rolling weight slope
+MIN_SLOPE_DAYS = 3              # Slope needs readings spanning at least this many days
+RAPID_CHANGE_PCT_PER_WEEK = 2.0
+WEIGHT_JUMP_PCT = 5.0           # Single reading this far from the EWMA
+CALORIE_DEFICIT_PCT = 20.0      # Day closed this far under plan
+ALERT_MAX_AGE_DAYS = 7          # Older events (e.g. imports) update stats but don't alert
+MAX_ALERTS = 500
+
+
+class AlertQueue:
+    """Append-only, bounded alert log with an independent cursor per reader."""
+
+    def __init__(self, maxlen=MAX_ALERTS):
+        self._alerts = deque(maxlen=maxlen)
+        self._seq = itertools.count(1)
+        self._cursors = {}
+        self._raised = set()    # (pet, kind, day) already alerted
+        self._by_pet = {}       # pet name -> its alerts, oldest first (may include evicted ones)
+        self._lock = threading.Lock()
+
+    def push(self, pet_name, kind, message, day):
+        """Queue an alert unless the same kind was already raised for that pet and day."""
+        with self._lock:
+            key = (pet_name, kind, day)
+            if key in self._raised:
+                return None
+            self._raised.add(key)
+            alert = {"seq": next(self._seq), "pet": pet_name, "kind": kind,
+                     "message": message, "day": day}
+            self._alerts.append(alert)
+            self._by_pet.setdefault(pet_name, []).append(alert)
+            return alert
+
+    def drain(self, reader):
+        """Alerts this reader hasn't seen yet, oldest first."""
+        with self._lock:
+            cursor = self._cursors.get(reader, 0)
+            fresh = [a for a in self._alerts if a["seq"] > cursor]
+            if fresh:
+                self._cursors[reader] = fresh[-1]["seq"]
+            return fresh
+
+    def recent(self, pet_name=None, since_day=None):
+        """Alerts still in the queue for one pet (or all) raised on/after since_day."""
+        with self._lock:
+            if pet_name is None:
+                alerts = self._alerts
+            else:
+                alerts = self._by_pet.get(pet_name, [])
+                if alerts:  # Forget alerts the bounded queue has already dropped
+                    del alerts[:bisect_left(alerts, self._alerts[0]["seq"], key=lambda a: a["seq"])]
+            return [a for a in alerts if since_day is None or a["day"] >= since_day]
+
+    def clear(self):
+        with self._lock:
+            self._alerts.clear()
+            self._cursors.clear()
+            self._raised.clear()
+            self._by_pet.clear()
+
+
+class _WeightStats:
+    """EWMA and rolling least-squares slope (kg/day) over the latest readings."""
+    __slots__ = ("ewma", "last_time", "origin", "window", "n", "sx", "sy", "sxx", "sxy")
+
+    def __init__(self):
+        self.ewma = None
+        self.last_time = None
+        self.origin = None       # Epoch that x is measured from (keeps sums small)
+        self.window = deque()
+        self.n = 0
+        self.sx = self.sy = self.sxx = self.sxy = 0.0
+
+    def add(self, epoch, kg):
+        if self.origin is None:
+            self.origin = epoch
+        x = (epoch - self.origin) / 86400
+        self.window.append((x, kg))
+        self.n += 1
+        self.sx += x
+        self.sy += kg
+        self.sxx += x * x
+        self.sxy += x * kg
+        if self.n > SLOPE_READINGS:
+            old_x, old_y = self.window.popleft()
+            self.n -= 1
+            self.sx -= old_x
+            self.sy -= old_y
+            self.sxx -= old_x * old_x
+            self.sxy -= old_x * old_y
+        self.ewma = kg if self.ewma is None else EWMA_ALPHA * kg + (1 - EWMA_ALPHA) * self.ewma
+        self.last_time = epoch
+
+    def slope(self):
+        """kg/day over the window, or None with too few / too close readings."""
+        if self.n < 3 or self.window[-1][0] - self.window[0][0] < MIN_SLOPE_DAYS:
+            return None
+        denominator = self.n * self.sxx - self.sx * self.sx
+        if abs(denominator) < 1e-12:
+            return None
+        return (self.n * self.sxy - self.sx * self.sy) / denominator
+
+
+class _PetState:
+    __slots__ = ("weight", "checked")
+
+    def __init__(self):
+        self.weight = _WeightStats()
+        self.checked = None      # Last day (date) whose calories were compared with the plan
+
+
+def _to_date(day_str):
+    try:
+        return date.fromisoformat(day_str)
+    except (TypeError, ValueError):
+        return None
+
+
+def daily_calorie_plan(pet):
+    """Planned kcal per day: the feeding_schedule total, else target_daily_calories."""
+    schedule = pet.get("feeding_schedule") or []
+    planned = sum(kcal for kcal in schedule if isinstance(kcal, (int, float)))
+    return planned or pet.get("target_daily_calories") or None
+
+
+class AnomalyDetector:
+    def __init__(self, queue):
+        self.queue = queue
+        self._states = {}
+        self._pets_id = None
+
+    def ensure(self, pets):
+        if self._pets_id != id(pets):
+            self._states.clear()
+            self._pets_id = id(pets)
+
+    def _state(self, pet_name, pet, skip=None):
+        """
+        A pet's state, seeded on first use from the tail of its weight history.
+        `skip` is an (epoch, kg) reading that was just appended and is about to
+        be fed in as an event, so it's left out of the seed.
+        """
+        state = self._states.get(pet_name)
+        if state is None:
+            state = self._states[pet_name] = _PetState()
+            series = series_for(pet_name, pet.get("weights", []))
+            end = len(series)
+            if skip is not None and end and (series.times[-1], series.values[-1]) == skip:
+                end -= 1
+            for i in range(max(0, end - 3 * SLOPE_READINGS), end):
+                state.weight.add(series.times[i], series.values[i])
+        return state
+
+    @staticmethod
+    def _recent(epoch, now):
+        return now - epoch <= ALERT_MAX_AGE_DAYS * 86400
+
+    # --- EVENTS ---
+    def add_weight(self, pets, pet_name, entry):
+        """Feed one newly logged weight (call after it was appended)."""
+        self.ensure(pets)
+        epoch = timestamps.parse_epoch(entry.get("timestamp"))
+        kg = entry.get("weight")
+        if epoch is None or not isinstance(kg, (int, float)) or kg <= 0:
+            return
+        stats = self._state(pet_name, pets[pet_name], skip=(epoch, float(kg))).weight
+        if stats.last_time is not None and epoch < stats.last_time:
+            return  # Back-dated: the streaming stats only move forward
+        previous, previous_time = stats.ewma, stats.last_time
+        stats.add(epoch, float(kg))
+        if not self._recent(epoch, timestamps.now_epoch()):
+            return
+
+        day = entry["timestamp"][:10]
+        # Only a jump from a recent average is sudden; slow change over a long gap is the slope's job
+        if previous and self._recent(previous_time, epoch):
+            jump = (kg - previous) / previous * 100
+            if abs(jump) >= WEIGHT_JUMP_PCT:
+                self.queue.push(pet_name, "weight_jump",
+                                f"Weight {kg:.2f}kg is {jump:+.1f}% vs recent average {previous:.2f}kg", day)
+        slope = stats.slope()
+        if slope is not None and stats.ewma:
+            weekly = slope * 7 / stats.ewma * 100
+            if abs(weekly) >= RAPID_CHANGE_PCT_PER_WEEK:
+                direction = "down" if weekly < 0 else "up"
+                self.queue.push(pet_name, "rapid_weight_change",
+                                f"Weight trending {direction} {abs(weekly):.1f}%/week over the last {stats.n} readings", day)
+
+    def add_feeding(self, pets, pet_name, entry):
+        """Feed one newly logged feeding (call after the feeding index has it)."""
+        self.ensure(pets)
+        day = _to_date((entry.get("time") or "")[:10])
+        if day is not None:  # A future-dated feeding doesn't close today early
+            self._close_through(pets, pet_name, min(day, date.today()) - timedelta(days=1))
+
+    def check_day_end(self, pets, today=None):
+        """Close every pet's days up to yesterday, fed or not (run by the dashboard)."""
+        self.ensure(pets)
+        yesterday = (today or date.today()) - timedelta(days=1)
+        for pet_name in pets:
+            self._close_through(pets, pet_name, yesterday)
+
+    def _close_through(self, pets, pet_name, last):
+        """
+        Close every day after the last checked one up to `last` (a date).
+        Tracking starts at the pet's first logged feeding; days too old to
+        alert are skipped.
+        """
+        state = self._state(pet_name, pets[pet_name])
+        if state.checked is not None:
+            first = state.checked + timedelta(days=1)
+        else:
+            logged = [d for d in map(_to_date, feeding_index.logged_days(pet_name)) if d is not None]
+            if not logged:
+                return  # Nothing fed yet, so no day to judge
+            first = min(logged)
+        first = max(first, date.today() - timedelta(days=ALERT_MAX_AGE_DAYS + 1))
+        day = first
+        while day <= last:
+            self._close_day(pets[pet_name], pet_name, day.isoformat())
+            day += timedelta(days=1)
+        if state.checked is None or last > state.checked:
+            state.checked = last
+
+    def _close_day(self, pet, pet_name, day):
+        plan = daily_calorie_plan(pet)
+        if not plan or not self._recent(timestamps.parse_epoch(day), timestamps.now_epoch()):
+            return
+        eaten = feeding_index.day(pet_name, day).calories
+        deficit = plan - eaten
+        if deficit >= plan * CALORIE_DEFICIT_PCT / 100:
+            self.queue.push(pet_name, "under_target_calories",
+                            f"Ate {eaten:.0f} of {plan:.0f} kcal planned on {day} ({deficit:.0f} kcal short)", day)
+
+
+# Shared queue and detector, fed by the logging functions
+alert_queue = AlertQueue()
+detector = AnomalyDetector(alert_queue)
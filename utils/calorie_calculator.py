@@ -25,4 +25,146 @@ def calculate_calories(grams, cal_per_100g):
         return round(calories, 2)
     except Exception as e:
         print(f"⚠️ Unexpected error in calorie calculation: {e}")
-        return 0.0
\ No newline at end of file
+        return 0.0
+
+# --- BATCH API ---
+try:
+    import numpy as np  # Optional: used for large batches when installed
+except ImportError:
+    np = None
+
+NUMPY_MIN_ROWS = 1000  # Smaller batches are faster in plain Python
+_NUMBER_TYPES = {int, float}
+
+
+def _as_sequence(values, length):
+    """Broadcast a scalar to `length` items; pass sequences through."""
+    if isinstance(values, (int, float)) or values is None:
+        return [values] * length
+    return values
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value == value  # NaN != NaN
+
+
+def _float_array(values):
+    """values as a float64 array if every item is an int or float (no bools, None or text), else None."""
+    if isinstance(values, np.ndarray):
+        return values.astype(float) if values.dtype.kind in "fiu" else None
+    if not set(map(type, values)) <= _NUMBER_TYPES:
+        return None
+    return np.asarray(values, dtype=float)
+
+
+def _numpy_inputs(grams, cal_per_100g):
+    """(grams, densities) as float arrays for a large all-numeric batch, or None."""
+    if np is None or len(grams) < NUMPY_MIN_ROWS:
+        return None
+    g = _float_array(grams)
+    if g is None:
+        return None
+    if isinstance(cal_per_100g, (int, float)) or cal_per_100g is None:
+        d = float(cal_per_100g) if _is_number(cal_per_100g) else np.nan  # Broadcast; NaN fails the mask
+    else:
+        d = _float_array(cal_per_100g)
+        if d is None:
+            return None
+    return g, d
+
+
+def calorie_input_mask(grams, cal_per_100g):
+    """
+    Validate many (grams, cal_per_100g) pairs without printing.
+
+    Args:
+        grams: sequence of gram amounts
+        cal_per_100g: one calorie density for all rows, or a sequence
+
+    Returns:
+        list[bool]: True where grams >= 0 and density > 0 (both numbers)
+    """
+    arrays = _numpy_inputs(grams, cal_per_100g)
+    if arrays is not None:
+        g, d = arrays
+        return ((g >= 0) & (d > 0)).tolist()  # NaN compares False, like _is_number
+    densities = _as_sequence(cal_per_100g, len(grams))
+    return [
+        _is_number(g) and _is_number(d) and g >= 0 and d > 0
+        for g, d in zip(grams, densities)
+    ]
+
+
+def calculate_calories_batch(grams, cal_per_100g):
+    """
+    Calculate calories for many feedings in one pass. Large all-numeric
+    batches are multiplied with NumPy when it is installed; either way
+    every value is rounded by Python's round(), so a feeding gets the same
+    calories whatever batch it came in.
+
+    Args:
+        grams: sequence (list, array('d'), NumPy array) of gram amounts
+        cal_per_100g: one calorie density for all rows, or a sequence
+
+    Returns:
+        tuple: (calories, mask) — calories is a list rounded to 2 decimals
+        with None where the inputs were invalid; mask is the validity list
+        from calorie_input_mask().
+    """
+    arrays = _numpy_inputs(grams, cal_per_100g)
+    if arrays is not None:
+        g, d = arrays
+        mask = ((g >= 0) & (d > 0)).tolist()
+        with np.errstate(invalid="ignore"):
+            values = (g / 100 * d).tolist()
+    else:
+        mask = calorie_input_mask(grams, cal_per_100g)
+        densities = _as_sequence(cal_per_100g, len(mask))
+        values = [g / 100 * d if ok else None for g, d, ok in zip(grams, densities, mask)]
+    # float() first: round() on a NumPy scalar would use NumPy's rounding
+    calories = [round(float(v), 2) if ok else None for v, ok in zip(values, mask)]
+    return calories, mask
+
+
+def feeding_calories(feedings, cal_per_100g):
+    """
+    Calories for a whole feedings collection at one density.
+    Reads the grams column directly when feedings use column storage.
+    """
+    if hasattr(feedings, "column_values"):
+        grams = feedings.column_values("grams")
+    else:
+        grams = [f.get("grams") for f in feedings]
+    return calculate_calories_batch(grams, cal_per_100g)
+
+
+def backfill_calories(pet, recompute=False):
+    """
+    Fill in `calories` for a pet's feedings from its calories_per_100g.
+
+    Args:
+        pet (dict): pet record
+        recompute (bool): False = only fill entries with calories None,
+            True = recalculate every entry (e.g. after the density changed)
+
+    Returns:
+        int: number of feedings updated
+    """
+    density = pet.get("calories_per_100g")
+    feedings = pet.get("feedings", [])
+    if not density or not feedings:
+        return 0
+
+    calories, mask = feeding_calories(feedings, density)
+    if hasattr(feedings, "column_values"):
+        current = feedings.column_values("calories")
+        rows = [i for i, ok in enumerate(mask) if ok and (recompute or current[i] != current[i])]
+        feedings.set_floats("calories", rows, [calories[i] for i in rows])
+        return len(rows)
+
+    updated = 0
+    for entry, value, ok in zip(feedings, calories, mask):
+        if ok and (recompute or entry.get("calories") is None):
+            entry["calories"] = value
+            updated += 1
+    return updated
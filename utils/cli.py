@@ -0,0 +1,303 @@
+# utils/cli.py
+"""
+Non-interactive command line for scripts, feeders and smart scales.
+
+    python main.py log feeding --pet Arya --grams 82.4 [--food Breakfast] [--time "2026-02-20 09:00"]
+    python main.py log weight --pet Arya --kg 3.3
+    python main.py log medication --pet Arya --name Metacam --dose 0.33ml
+    python main.py summary [--json] [--pet Arya]
+    python main.py export --format csv|json|jsonl --out logs [--pet Arya] [--from 2026-02-01] [--to 2026-02-28] [--gzip]
+    python main.py import logs_export.csv
+    python main.py batch < commands.txt
+    python main.py remind [--sinks console,file,webhook=URL] [--concurrency 32]
+    python main.py events [--kind feedings] [--pet Arya] [--from 2026-02-01] [--to 2026-02-28] [--json]
+    python main.py actions [--pet Arya] [--action edit_pet] [--from 2026-02-01] [--to "2026-02-28 18:00"] [--json]
+
+`batch` reads one `log ...` command per line from stdin (blank lines and
+lines starting with # are ignored) and commits them in groups of
+--batch-size with one store write per group. `remind` runs the reminder
+service in the foreground until Ctrl+C. `events` lists logged feedings,
+medications and weights across pets in time order. `actions` lists the
+action (audit) log, including rotated files.
+"""
+import argparse
+import json
+import shlex
+import sys
+import time
+from utils.colors import Colors
+
+BATCH_SIZE = 500
+
+
+class CliError(Exception):
+    """Bad command-line input (reported without a traceback)."""
+
+
+class _ArgumentParser(argparse.ArgumentParser):
+    # Raise instead of exiting so batch mode can report the bad line and carry on
+    def error(self, message):
+        raise CliError(message)
+
+
+def _add_log_parsers(subparsers):
+    log = subparsers.add_parser("log", help="Log a feeding, weight or medication")
+    kinds = log.add_subparsers(dest="kind", required=True)
+
+    feeding = kinds.add_parser("feeding", help="Log food")
+    feeding.add_argument("--pet", required=True)
+    feeding.add_argument("--grams", type=float, required=True)
+    feeding.add_argument("--food", default="Food", help="Food name (default: Food)")
+    feeding.add_argument("--time", help="YYYY-MM-DD HH:MM (default: now)")
+    feeding.add_argument("--notes", default="")
+
+    weight = kinds.add_parser("weight", help="Log a weight in kg")
+    weight.add_argument("--pet", required=True)
+    weight.add_argument("--kg", type=float, required=True)
+    weight.add_argument("--time", help="YYYY-MM-DD HH:MM (default: now)")
+
+    medication = kinds.add_parser("medication", help="Log a medication as taken")
+    medication.add_argument("--pet", required=True)
+    medication.add_argument("--name", required=True)
+    medication.add_argument("--dose", required=True)
+    medication.add_argument("--notes", default="")
+    medication.add_argument("--time", help="YYYY-MM-DD HH:MM (default: now)")
+
+
+def build_parser():
+    parser = _ArgumentParser(prog="main.py", description="PawCare command line")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    _add_log_parsers(subparsers)
+
+    summary = subparsers.add_parser("summary", help="Daily summary")
+    summary.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    summary.add_argument("--pet", action="append", help="Only this pet (repeatable)")
+
+    export = subparsers.add_parser("export", help="Export logs")
+    export.add_argument("--format", choices=("csv", "json", "jsonl"), default="csv")
+    export.add_argument("--out", default="logs", help="File name inside exports/ (extension added)")
+    export.add_argument("--pet", action="append", help="Only this pet (repeatable)")
+    export.add_argument("--from", dest="start", help="YYYY-MM-DD (inclusive)")
+    export.add_argument("--to", dest="end", help="YYYY-MM-DD (inclusive)")
+    export.add_argument("--gzip", action="store_true")
+
+    importer = subparsers.add_parser("import", help="Import a CSV/JSON/JSONL log file")
+    importer.add_argument("path")
+
+    batch = subparsers.add_parser("batch", help="Read many 'log ...' commands from stdin")
+    batch.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    remind = subparsers.add_parser("remind", help="Run the reminder service in the foreground")
+    remind.add_argument("--sinks", help="Comma-separated: console, file[=PATH], webhook=URL (default: console)")
+    remind.add_argument("--concurrency", type=int, help="Max notifications in flight")
+
+    events = subparsers.add_parser("events", help="List logged events across pets in time order")
+    events.add_argument("--kind", action="append", choices=("feedings", "medications", "weights"),
+                        help="Only this kind (repeatable)")
+    events.add_argument("--pet", action="append", help="Only this pet (repeatable)")
+    events.add_argument("--from", dest="start", help="YYYY-MM-DD[ HH:MM] (inclusive)")
+    events.add_argument("--to", dest="end", help="YYYY-MM-DD[ HH:MM] (inclusive)")
+    events.add_argument("--json", action="store_true", help="Print one JSON record per line")
+
+    actions = subparsers.add_parser("actions", help="Show the action (audit) log")
+    actions.add_argument("--pet")
+    actions.add_argument("--action", help="Only this action, e.g. log_entry, edit_pet, remove_pet")
+    actions.add_argument("--from", dest="start", help="YYYY-MM-DD[ HH:MM] (inclusive)")
+    actions.add_argument("--to", dest="end", help="YYYY-MM-DD[ HH:MM] (inclusive)")
+    actions.add_argument("--json", action="store_true", help="Print one JSON record per line")
+    return parser
+
+
+# --- COMMANDS ---
+def _log_item(pets, args):
+    """Turn a parsed `log` command into a (pet_name, collection, entry) item."""
+    from utils.logging_utils import build_feeding_entry, build_medication_entry, build_weight_entry
+
+    if args.pet not in pets:
+        raise CliError(f"Pet not found: {args.pet}")
+    try:
+        if args.kind == "feeding":
+            entry = build_feeding_entry(pets[args.pet], args.food, args.grams, args.time, args.notes)
+            return args.pet, "feedings", entry
+        if args.kind == "weight":
+            return args.pet, "weights", build_weight_entry(args.kg, args.time)
+        return args.pet, "medications", build_medication_entry(args.name, args.dose, args.notes, args.time)
+    except ValueError as e:
+        raise CliError(str(e))
+
+
+def _describe(item):
+    pet_name, collection, entry = item
+    if collection == "feedings":
+        kcal = f" ({entry['calories']:.1f} kcal)" if entry["calories"] is not None else ""
+        return f"{entry['grams']}g of {entry['food_name']}{kcal} for {pet_name} at {entry['time']}"
+    if collection == "weights":
+        return f"{entry['weight']} kg for {pet_name} at {entry['timestamp']}"
+    return f"{entry['medication']} {entry['dose']} for {pet_name} at {entry['timestamp']}"
+
+
+def cmd_log(pets, args):
+    from utils.logging_utils import append_log_entry, print_new_alerts
+
+    item = _log_item(pets, args)
+    append_log_entry(pets, *item)
+    print(Colors.GREEN + f"✅ Logged {_describe(item)}" + Colors.RESET)
+    print_new_alerts()
+    return 0
+
+
+def cmd_summary(pets, args):
+    from utils.logging_utils import daily_summary_data, print_daily_summary
+
+    if args.pet:
+        missing = [name for name in args.pet if name not in pets]
+        if missing:
+            raise CliError(f"Pet not found: {', '.join(missing)}")
+        pets = {name: pets[name] for name in args.pet}
+    if args.json:
+        print(json.dumps(daily_summary_data(pets), indent=2, default=str))
+    else:
+        print_daily_summary(pets)
+    return 0
+
+
+def cmd_export(pets, args):
+    from utils.exporters import export_logs
+
+    export_logs(pets, f"{args.out}.{args.format}", args.format, args.pet, args.start, args.end, args.gzip)
+    return 0
+
+
+def cmd_import(pets, args):
+    from utils.importers import run_import
+
+    return 0 if run_import(pets, args.path) is not None else 1
+
+
+def cmd_batch(pets, args, stream=None):
+    """
+    Log every command read from `stream` (stdin by default). Bad lines are
+    reported on stderr and skipped; good ones are committed per batch.
+    """
+    from utils.logging_utils import append_log_entries
+
+    stream = stream or sys.stdin
+    parser = build_parser()
+    pending, logged, errors = [], 0, 0
+    started = time.perf_counter()
+
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            line_args = parser.parse_args(shlex.split(line))
+            if line_args.command != "log":
+                raise CliError("only 'log ...' commands are allowed in batch mode")
+            pending.append(_log_item(pets, line_args))
+        except (CliError, ValueError) as e:
+            errors += 1
+            print(f"line {line_no}: {e}", file=sys.stderr)
+            continue
+        if len(pending) >= args.batch_size:
+            append_log_entries(pets, pending)
+            logged += len(pending)
+            pending = []
+
+    if pending:
+        append_log_entries(pets, pending)
+        logged += len(pending)
+
+    elapsed = time.perf_counter() - started
+    rate = logged / elapsed if elapsed > 0 else float(logged)
+    print(Colors.GREEN + f"✅ Logged {logged} events in {elapsed:.2f}s ({rate:,.0f} events/sec)" + Colors.RESET)
+    if errors:
+        print(Colors.YELLOW + f"⚠️  {errors} line(s) skipped" + Colors.RESET)
+    return 0 if not errors else 1
+
+
+def cmd_remind(pets, args):
+    import asyncio
+    from utils.reminders import ReminderService, make_sinks, DEFAULT_SINKS, MAX_CONCURRENT_SENDS
+
+    try:
+        sinks = make_sinks(args.sinks or DEFAULT_SINKS)
+    except ValueError as e:
+        raise CliError(str(e))
+    service = ReminderService(pets, sinks, args.concurrency or MAX_CONCURRENT_SENDS)
+    print(Colors.CYAN + f"🔔 Watching {len(pets)} pet(s) for reminders. Press Ctrl+C to stop." + Colors.RESET)
+    try:
+        asyncio.run(service.run())
+    except KeyboardInterrupt:
+        pass
+    stats = service.stats
+    print(Colors.GREEN + f"✅ Sent {stats['sent']}, suppressed {stats['suppressed']}, failed {stats['failed']}" + Colors.RESET)
+    return 0
+
+
+_EVENT_DETAILS = {
+    "feedings": lambda e: f"🍽️  {e.get('grams')}g {e.get('food_name') or 'Food'}",
+    "medications": lambda e: f"💊 {e.get('medication')} {e.get('dose')}",
+    "weights": lambda e: f"⚖️  {e.get('weight')} kg",
+}
+
+
+def cmd_events(pets, args):
+    from utils.events import iter_events
+    from utils.storage import TIME_FIELDS
+
+    try:
+        stream = iter_events(pets, args.kind, args.pet, args.start, args.end)
+        for _, pet_name, collection, entry in stream:
+            if args.json:
+                print(json.dumps({"pet": pet_name, "type": collection[:-1], **entry}, default=str))
+            else:
+                print(f"{entry.get(TIME_FIELDS[collection])}  {pet_name:<16} {_EVENT_DETAILS[collection](entry)}")
+    except ValueError as e:
+        raise CliError(str(e))
+    return 0
+
+
+def cmd_actions(pets, args):
+    from utils.action_log import action_log
+
+    shown = 0
+    for record in action_log.query(args.pet, args.start, args.end, args.action):
+        shown += 1
+        if args.json:
+            print(json.dumps(record))
+        else:
+            print(f"{record['ts']}  {record['action']:<22} {record['message']}")
+    if not shown and not args.json:
+        print(Colors.YELLOW + "No matching actions." + Colors.RESET)
+    return 0
+
+
+_COMMANDS = {
+    "log": cmd_log,
+    "summary": cmd_summary,
+    "export": cmd_export,
+    "import": cmd_import,
+    "batch": cmd_batch,
+    "remind": cmd_remind,
+    "events": cmd_events,
+    "actions": cmd_actions,
+}
+
+
+def run_cli(argv):
+    """Entry point used by main.py when arguments are given. Returns an exit code."""
+    try:
+        args = build_parser().parse_args(argv)
+    except CliError as e:
+        print(f"main.py: error: {e}", file=sys.stderr)
+        return 2
+
+    from utils.repository import load_pets
+
+    pets = load_pets()  # Migrated to the current schema on first load
+    try:
+        return _COMMANDS[args.command](pets, args)
+    except CliError as e:
+        print(Colors.RED + f"❌ {e}" + Colors.RESET, file=sys.stderr)
+        return 1
@@ -0,0 +1,284 @@
+# utils/columnar.py
+"""
+Compact, column-based storage for feedings and weights.
+
+A feeding stored as a dict costs several hundred bytes. FeedingColumns and
+WeightColumns keep the same data in typed arrays instead (times as epoch
+seconds, grams/calories/weight as doubles, food names interned), which is
+roughly an order of magnitude smaller. Whole-number values (e.g. 100 grams
+typed on the CLI) share the double columns; a per-row flag turns them back
+into ints on access, so entries round-trip exactly.
+
+Both classes behave like lists of dicts, so existing code that iterates,
+indexes, slices, appends or calls len() keeps working. Items are built on
+access, so changing a returned dict does NOT change the stored row — assign
+it back (`feedings[i] = entry`) instead.
+
+Turn it on with PAWCARE_COMPACT=1 (applied right after loading pets).
+"""
+import math
+import os
+from array import array
+from collections.abc import MutableSequence
+from utils import timestamps
+
+COMPACT_HISTORY = os.environ.get("PAWCARE_COMPACT", "0") == "1"
+
+# Time string shapes we can rebuild exactly from an epoch
+_TIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d")
+_TIME_FORMAT_BY_LEN = {19: 0, 16: 1, 10: 2}
+_NO_FORMAT = 255
+
+_NAN = float("nan")
+_MAX_EXACT_INT = 2 ** 53  # Larger ints don't survive a double and go to "extra"
+
+
+class _EventColumns(MutableSequence):
+    """
+    Shared machinery. Subclasses set:
+      TIME_FIELD    - key holding the timestamp string
+      FLOAT_FIELDS  - keys stored as doubles (None -> NaN; ints flagged per row)
+      TEXT_FIELDS   - keys stored as interned strings
+      SPARSE_FIELDS - keys stored only when non-empty (e.g. notes)
+      FIELD_ORDER   - key order of the rebuilt dicts
+    Anything that doesn't fit a column goes into a per-row "extra" dict.
+    """
+    TIME_FIELD = None
+    FLOAT_FIELDS = ()
+    TEXT_FIELDS = ()
+    SPARSE_FIELDS = ()
+    FIELD_ORDER = ()
+
+    def __init__(self, entries=()):
+        self._times = array("d")
+        self._time_fmt = array("B")
+        self._floats = {field: array("d") for field in self.FLOAT_FIELDS}
+        self._int_flags = array("B")  # Bit n set: FLOAT_FIELDS[n] was an int in this row
+        self._texts = {field: array("I") for field in self.TEXT_FIELDS}
+        self._sparse = {field: {} for field in self.SPARSE_FIELDS}
+        self._extra = {}        # row index -> dict of leftover keys
+        self._strings = []      # interned text values
+        self._string_ids = {}
+        for entry in entries:
+            self.append(entry)
+
+    # --- encoding ---
+    def _intern(self, value):
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = self._string_ids[value] = len(self._strings)
+            self._strings.append(value)
+        return string_id
+
+    def _encode(self, entry):
+        """Split a dict into (time, fmt, floats, int_flags, texts, sparse, extra)."""
+        extra = {}
+        time_str = entry.get(self.TIME_FIELD)
+        fmt = _TIME_FORMAT_BY_LEN.get(len(time_str)) if isinstance(time_str, str) else None
+        epoch = timestamps.parse_epoch(time_str, cache=False) if fmt is not None else None
+        if epoch is None:
+            epoch, fmt = _NAN, _NO_FORMAT
+            if self.TIME_FIELD in entry:
+                extra[self.TIME_FIELD] = time_str
+
+        floats, int_flags = [], 0
+        for bit, field in enumerate(self.FLOAT_FIELDS):
+            value = entry.get(field)
+            if type(value) is float:
+                floats.append(value)
+            elif type(value) is int and -_MAX_EXACT_INT <= value <= _MAX_EXACT_INT:
+                floats.append(float(value))
+                int_flags |= 1 << bit
+            else:
+                floats.append(_NAN)
+                if value is not None:
+                    extra[field] = value  # Strings etc. round-trip exactly
+
+        texts = []
+        for field in self.TEXT_FIELDS:
+            value = entry.get(field)
+            if isinstance(value, str):
+                texts.append(self._intern(value))
+            else:
+                texts.append(self._intern(""))
+                extra[field] = value
+
+        sparse = {field: entry.get(field) for field in self.SPARSE_FIELDS if entry.get(field)}
+        for field in self.SPARSE_FIELDS:
+            if field in entry and not entry[field] and entry[field] != "":
+                extra[field] = entry[field]  # e.g. None — keep as-is
+
+        known = {self.TIME_FIELD, *self.FLOAT_FIELDS, *self.TEXT_FIELDS, *self.SPARSE_FIELDS}
+        for key, value in entry.items():
+            if key not in known:
+                extra[key] = value
+        return epoch, fmt, floats, int_flags, texts, sparse, extra
+
+    def _decode(self, i):
+        entry = {}
+        extra = self._extra.get(i, {})
+        fmt = self._time_fmt[i]
+        int_flags = self._int_flags[i]
+        for field in self.FIELD_ORDER:
+            if field in extra:
+                entry[field] = extra[field]
+            elif field == self.TIME_FIELD:
+                if fmt != _NO_FORMAT:
+                    entry[field] = timestamps.from_epoch(self._times[i]).strftime(_TIME_FORMATS[fmt])
+            elif field in self._floats:
+                value = self._floats[field][i]
+                if math.isnan(value):
+                    entry[field] = None
+                elif int_flags >> self.FLOAT_FIELDS.index(field) & 1:
+                    entry[field] = int(value)
+                else:
+                    entry[field] = value
+            elif field in self._texts:
+                entry[field] = self._strings[self._texts[field][i]]
+            elif field in self._sparse:
+                entry[field] = self._sparse[field].get(i, "")
+        for key, value in extra.items():
+            if key not in entry:
+                entry[key] = value
+        return entry
+
+    # --- list protocol ---
+    def __len__(self):
+        return len(self._times)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._decode(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("event index out of range")
+        return self._decode(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._decode(i)
+
+    def append(self, entry):
+        epoch, fmt, floats, int_flags, texts, sparse, extra = self._encode(entry)
+        i = len(self._times)
+        self._times.append(epoch)
+        self._time_fmt.append(fmt)
+        for field, value in zip(self.FLOAT_FIELDS, floats):
+            self._floats[field].append(value)
+        self._int_flags.append(int_flags)
+        for field, value in zip(self.TEXT_FIELDS, texts):
+            self._texts[field].append(value)
+        for field, value in sparse.items():
+            self._sparse[field][i] = value
+        if extra:
+            self._extra[i] = extra
+
+    def __setitem__(self, index, entry):
+        if isinstance(index, slice):
+            rows = list(self)
+            rows[index] = entry
+            self._rebuild(rows)
+            return
+        if index < 0:
+            index += len(self)
+        epoch, fmt, floats, int_flags, texts, sparse, extra = self._encode(entry)
+        self._times[index] = epoch
+        self._time_fmt[index] = fmt
+        for field, value in zip(self.FLOAT_FIELDS, floats):
+            self._floats[field][index] = value
+        self._int_flags[index] = int_flags
+        for field, value in zip(self.TEXT_FIELDS, texts):
+            self._texts[field][index] = value
+        for field in self.SPARSE_FIELDS:
+            self._sparse[field].pop(index, None)
+        for field, value in sparse.items():
+            self._sparse[field][index] = value
+        self._extra.pop(index, None)
+        if extra:
+            self._extra[index] = extra
+
+    # Inserts and deletes are rare (edits), so they simply rebuild the columns
+    def __delitem__(self, index):
+        rows = list(self)
+        del rows[index]
+        self._rebuild(rows)
+
+    def insert(self, index, entry):
+        rows = list(self)
+        rows.insert(index, entry)
+        self._rebuild(rows)
+
+    def _rebuild(self, rows):
+        self.__init__(rows)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, _EventColumns)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"{type(self).__name__}({len(self)} entries)"
+
+    # --- column access (for vectorized code) ---
+    def column(self, field):
+        """Return the raw typed array for a float column, or the epoch times for TIME_FIELD."""
+        if field == self.TIME_FIELD:
+            return self._times
+        return self._floats[field]
+
+    def column_values(self, field):
+        """Copy of a float column with numbers too big for it (kept in "extra") filled in."""
+        values = array("d", self._floats[field])
+        for i, extra in self._extra.items():
+            value = extra.get(field)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                values[i] = float(value)
+        return values
+
+    def set_floats(self, field, rows, values):
+        """Overwrite one float column at the given row indexes."""
+        column = self._floats[field]
+        bit = 1 << self.FLOAT_FIELDS.index(field)
+        for i, value in zip(rows, values):
+            column[i] = _NAN if value is None else float(value)
+            if type(value) is int:
+                self._int_flags[i] |= bit
+            else:
+                self._int_flags[i] &= ~bit
+            extra = self._extra.get(i)
+            if extra and field in extra:
+                del extra[field]
+                if not extra:
+                    del self._extra[i]
+
+
+class FeedingColumns(_EventColumns):
+    TIME_FIELD = "time"
+    FLOAT_FIELDS = ("grams", "calories")
+    TEXT_FIELDS = ("food_name",)
+    SPARSE_FIELDS = ("notes",)
+    FIELD_ORDER = ("food_name", "grams", "calories", "time", "notes")
+
+
+class WeightColumns(_EventColumns):
+    TIME_FIELD = "timestamp"
+    FLOAT_FIELDS = ("weight",)
+    FIELD_ORDER = ("timestamp", "weight")
+
+
+def compact_pets(pets):
+    """Swap every pet's feedings/weights lists for column storage (in place)."""
+    for pet in pets.values():
+        if isinstance(pet.get("feedings"), list):
+            pet["feedings"] = FeedingColumns(pet["feedings"])
+        if isinstance(pet.get("weights"), list):
+            pet["weights"] = WeightColumns(pet["weights"])
+    return pets
+
+
+def to_jsonable(obj):
+    """json.dump `default=` hook: column storage serializes as a plain list."""
+    if isinstance(obj, _EventColumns):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,196 @@
+# utils/dose_index.py
+"""
+Index of medication doses: what's due, what's overdue, what was missed.
+
+- Each pet's scheduled medications are kept sorted by next_due, so
+  "overdue now" is a bisect rather than a parse of every next_due.
+- Missed doses come from two places. Recorded runs in med["dose_history"]
+  (written by mark_dose_taken when doses were skipped) are kept sorted by
+  start time. Ongoing runs are doses that slipped by on a medication still
+  waiting to be marked taken.
+
+Both kinds are runs of evenly spaced doses, so "missed in [start, end]" is
+counted arithmetically per run instead of by expanding every dose.
+
+The index is rebuilt per pet whenever its medication count changes and is
+told about in-place edits via update()/remove() (marking taken, deleting).
+"""
+import itertools
+from bisect import bisect_left, bisect_right, insort
+from utils import timestamps
+from utils.medication_scheduler import med_interval_hours
+
+
+def _step_seconds(med):
+    interval = med_interval_hours(med)
+    return interval * 3600 if interval else None
+
+
+def dose_state(med, now):
+    """
+    One place for a medication's status at `now` (epoch):
+    "taken", "one_time" (no next_due), "invalid", "overdue" or "upcoming".
+    """
+    if med.get("taken", False):
+        return "taken"
+    next_due = med.get("next_due")
+    if not next_due:
+        return "one_time"
+    due = timestamps.parse_epoch(next_due)
+    if due is None:
+        return "invalid"
+    return "overdue" if due <= now else "upcoming"
+
+
+def _doses_in_range(first, count, step, start, end):
+    """How many of first, first+step, ... (count doses) fall in [start, end]."""
+    if count <= 0 or end < first:
+        return 0
+    if not step:
+        return 1 if start <= first <= end else 0
+    k_lo = max(0, -int((first - start) // step)) if start > first else 0
+    k_hi = min(count - 1, int((end - first) // step))
+    return max(0, k_hi - k_lo + 1)
+
+
+class DoseIndex:
+    def __init__(self):
+        self._due = {}        # pet name -> sorted [(next_due epoch, seq, med)]
+        self._counts = {}     # pet name -> len(medications) when indexed
+        self._history = {}    # id(med) -> (pet name, dose_history records ingested)
+        self._runs = []       # sorted [(start epoch, seq, pet name, med, count, step)]
+        self._longest_run = 0.0
+        self._seq = itertools.count()
+        self._pets_id = None
+
+    # --- MAINTENANCE ---
+    def build(self, pets):
+        self._due.clear()
+        self._counts.clear()
+        self._history.clear()
+        self._runs.clear()
+        self._longest_run = 0.0
+        self._pets_id = id(pets)
+        for pet_name, pet in pets.items():
+            self._index_pet(pet_name, pet)
+
+    def ensure(self, pets):
+        """Rebuild for a different pets dict; re-index pets whose medication count changed."""
+        if self._pets_id != id(pets):
+            self.build(pets)
+            return
+        for pet_name in list(self._due):
+            if pet_name not in pets:
+                self._drop_pet(pet_name)
+        for pet_name, pet in pets.items():
+            if self._counts.get(pet_name) != len(pet.get("medications", [])):
+                self._drop_pet(pet_name)
+                self._index_pet(pet_name, pet)
+
+    def _index_pet(self, pet_name, pet):
+        meds = pet.get("medications", [])
+        self._due[pet_name] = []
+        self._counts[pet_name] = len(meds)
+        for med in meds:
+            self._add_med(pet_name, med)
+
+    def _drop_pet(self, pet_name):
+        self._due.pop(pet_name, None)
+        self._counts.pop(pet_name, None)
+        self._history = {key: value for key, value in self._history.items() if value[0] != pet_name}
+        self._runs = [run for run in self._runs if run[2] != pet_name]
+
+    def _add_med(self, pet_name, med):
+        due = timestamps.parse_epoch(med.get("next_due"))
+        if due is not None:
+            insort(self._due[pet_name], (due, next(self._seq), med), key=lambda item: item[:2])
+        self._ingest_history(pet_name, med)
+
+    def _ingest_history(self, pet_name, med):
+        history = med.get("dose_history") or []
+        seen = self._history.get(id(med), (pet_name, 0))[1]
+        step = _step_seconds(med)
+        for record in history[seen:]:
+            count = record.get("missed") if record.get("taken_at") is None else 0
+            start = timestamps.parse_epoch(record.get("scheduled"))
+            if not count or start is None:
+                continue
+            insort(self._runs, (start, next(self._seq), pet_name, med, count, step), key=lambda run: run[:2])
+            self._longest_run = max(self._longest_run, (count - 1) * (step or 0))
+        self._history[id(med)] = (pet_name, len(history))
+
+    def update(self, pet_name, med):
+        """A medication changed in place (taken, rescheduled) or was just added."""
+        due_list = self._due.setdefault(pet_name, [])
+        if id(med) not in self._history:
+            self._counts[pet_name] = self._counts.get(pet_name, 0) + 1  # New medication
+        for i, (_, _, indexed) in enumerate(due_list):
+            if indexed is med:
+                del due_list[i]
+                break
+        self._add_med(pet_name, med)
+
+    def remove(self, pet_name, med):
+        """A medication was deleted from a pet."""
+        due_list = self._due.get(pet_name, [])
+        self._due[pet_name] = [item for item in due_list if item[2] is not med]
+        self._counts[pet_name] = max(0, self._counts.get(pet_name, 0) - 1)
+        self._history.pop(id(med), None)
+        self._runs = [run for run in self._runs if run[3] is not med]
+
+    # --- LOOKUPS ---
+    def overdue(self, pet_name, now):
+        """Untaken medications of one pet whose next_due is at or before `now`."""
+        due_list = self._due.get(pet_name, [])
+        cut = bisect_right(due_list, now, key=lambda item: item[0])
+        return [med for _, _, med in due_list[:cut] if not med.get("taken", False)]
+
+    def upcoming(self, pet_name, now):
+        """Medications of one pet due after `now`, soonest first."""
+        due_list = self._due.get(pet_name, [])
+        cut = bisect_right(due_list, now, key=lambda item: item[0])
+        return [med for _, _, med in due_list[cut:]]
+
+    def missed(self, start, end, now=None, pet_name=None):
+        """
+        Missed doses with start <= scheduled time <= end (epochs) as a list of
+        (pet_name, med, count), recorded and ongoing runs combined.
+        """
+        now = timestamps.now_epoch() if now is None else now
+        totals = {}
+
+        # Recorded runs that can reach into the window
+        lo = bisect_left(self._runs, start - self._longest_run, key=lambda run: run[0])
+        hi = bisect_right(self._runs, end, key=lambda run: run[0])
+        for first, _, run_pet, med, count, step in self._runs[lo:hi]:
+            if pet_name is not None and run_pet != pet_name:
+                continue
+            n = _doses_in_range(first, count, step, start, end)
+            if n:
+                key = (run_pet, id(med))
+                totals[key] = (run_pet, med, totals.get(key, (None, None, 0))[2] + n)
+
+        # Ongoing: every dose of an untaken med whose following dose has also come due
+        pets = [pet_name] if pet_name is not None else list(self._due)
+        for name in pets:
+            due_list = self._due.get(name, [])
+            cut = bisect_right(due_list, min(end, now), key=lambda item: item[0])
+            for due, _, med in due_list[:cut]:
+                step = _step_seconds(med)
+                if med.get("taken", False) or not step:
+                    continue
+                count = int((now - due) // step)  # Doses already followed by another one
+                n = _doses_in_range(due, count, step, start, end)
+                if n:
+                    key = (name, id(med))
+                    totals[key] = (name, med, totals.get(key, (None, None, 0))[2] + n)
+        return sorted(totals.values(), key=lambda item: (item[0], item[1].get("medication", "")))
+
+    def missed_last_days(self, days, pet_name=None, now=None):
+        """missed() over the last `days` days up to now."""
+        now = timestamps.now_epoch() if now is None else now
+        return self.missed(now - days * 86400, now, now=now, pet_name=pet_name)
+
+
+# Shared index used by the dashboard and the medication menu
+dose_index = DoseIndex()
@@ -0,0 +1,111 @@
+# utils/events.py
+"""
+One time-ordered stream of every logged event across all pets.
+
+    for epoch, pet_name, collection, entry in iter_events(pets, kinds=("feedings",),
+                                                           start="2026-02-01", end="2026-02-28"):
+        ...
+
+Only the epochs are gathered up front (column storage already holds
+them); entries are handed out one at a time. Each pet's feedings,
+medications and weights are (almost always) already in time order, so
+one stable sort over the epochs is a cheap merge of those runs, and
+start/end are cut with bisect so a narrow window skips most rows. A
+history found out of order (e.g. a backdated entry) is just filtered.
+"""
+from bisect import bisect_left
+from datetime import timedelta
+from itertools import repeat
+from operator import getitem, methodcaller
+from utils import timestamps
+from utils.storage import TIME_FIELDS
+
+EVENT_KINDS = tuple(TIME_FIELDS)
+
+# Inclusive end bounds: a date covers the whole day, "YYYY-MM-DD HH:MM" the whole minute
+_END_PADDING = {10: timedelta(days=1), 13: timedelta(hours=1), 16: timedelta(minutes=1), 19: timedelta(seconds=1)}
+
+
+def _bounds(start, end):
+    """[lo, hi) epochs for inclusive timestamp prefixes like '2026-02-01' or '2026-02-01 09:00'."""
+    lo = timestamps.parse_epoch(start, cache=False) if start is not None else None
+    hi = None
+    if end is not None:
+        hi = timestamps.parse_epoch(end, cache=False)
+        if hi is not None:
+            hi += _END_PADDING.get(len(end), timedelta()).total_seconds()
+    if (start is not None and lo is None) or (end is not None and hi is None):
+        raise ValueError(f"Invalid time range: {start!r} to {end!r}")
+    return lo, hi
+
+
+def _epochs(history, field):
+    """Epoch per entry (None where the time is missing or invalid)."""
+    column = getattr(history, "column", None)
+    if column is not None:  # Column storage already holds epochs (NaN when unknown)
+        return [None if t != t else t for t in column(field)]
+    return timestamps.parse_epochs(map(methodcaller("get", field), history))
+
+
+def _in_window(epochs, lo, hi):
+    """Row indexes of timed entries within [lo, hi), and the untimed ones."""
+    if None not in epochs and all(a <= b for a, b in zip(epochs, epochs[1:])):
+        # The usual case: already in time order, so the window is a bisect away
+        first = 0 if lo is None else bisect_left(epochs, lo)
+        last = len(epochs) if hi is None else bisect_left(epochs, hi)
+        return range(first, last), ()
+    rows = [i for i, epoch in enumerate(epochs)
+            if epoch is not None and (lo is None or epoch >= lo) and (hi is None or epoch < hi)]
+    return rows, [i for i, epoch in enumerate(epochs) if epoch is None]
+
+
+def iter_events(pets, kinds=None, pet_names=None, start=None, end=None):
+    """
+    Yield (epoch, pet_name, collection, entry) for every matching event,
+    oldest first across all pets (same-time events keep pet/kind/log order).
+
+    Args:
+        pets (dict): loaded pets
+        kinds (iterable): collections to include (default: all EVENT_KINDS)
+        pet_names (iterable): only these pets (None = all)
+        start, end (str): inclusive time prefixes, e.g. '2026-02-01' or
+            '2026-02-01 09:00' (None = open)
+
+    Entries without a valid time can't be placed on the timeline: they
+    are yielded last (epoch None), and only when no range is given.
+    """
+    kinds = EVENT_KINDS if kinds is None else tuple(kinds)
+    unknown = [kind for kind in kinds if kind not in TIME_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown event kind(s): {', '.join(unknown)}")
+    lo, hi = _bounds(start, end)
+    names = pets.keys() if pet_names is None else [name for name in pet_names if name in pets]
+
+    # One flat column per field, so the sorted walk below runs entirely in C
+    times, event_pets, event_kinds, histories, rows = [], [], [], [], []
+    untimed = []
+    for name in names:
+        for kind in kinds:
+            history = pets[name].get(kind) or []
+            epochs = _epochs(history, TIME_FIELDS[kind])
+            window, missing = _in_window(epochs, lo, hi)
+            if window:
+                n = len(window)
+                times.extend(epochs[window.start:window.stop] if isinstance(window, range) else
+                             [epochs[i] for i in window])
+                rows.extend(window)
+                event_pets.extend(repeat(name, n))
+                event_kinds.extend(repeat(kind, n))
+                histories.extend(repeat(history, n))
+            if missing and lo is None and hi is None:
+                untimed.extend((name, kind, history, i) for i in missing)
+
+    # Each history is a sorted run, which Timsort merges almost for free
+    order = sorted(range(len(times)), key=times.__getitem__)
+
+    def pick(column):
+        return map(column.__getitem__, order)
+    # Entries are looked up as they're yielded (column storage decodes one row at a time)
+    yield from zip(pick(times), pick(event_pets), pick(event_kinds), map(getitem, pick(histories), pick(rows)))
+    for name, kind, history, i in untimed:
+        yield None, name, kind, history[i]
@@ -0,0 +1,161 @@
+# utils/exporters.py
+"""
+Streaming log exporters (CSV, JSON, JSON Lines, optionally gzipped).
+
+Rows are written one at a time straight from each pet's logs, so memory use
+stays flat no matter how much history there is. Every exporter can be
+limited to some pets and/or a date range, and reports rows/sec when done.
+"""
+import csv
+import gzip
+import json
+import os
+import time
+from utils.colors import Colors
+from utils.instrumentation import span, count
+
+EXPORT_DIR = "exports"
+EXPORT_FORMATS = ("csv", "json", "jsonl")
+
+# (collection, label used in CSV/JSONL, field holding the entry's time)
+LOG_KINDS = (
+    ("feedings", "Feeding", "time"),
+    ("medications", "Medication", "timestamp"),
+    ("weights", "Weight", "timestamp"),
+)
+_TIME_FIELDS = {collection: field for collection, _, field in LOG_KINDS}
+
+
+def _in_date_range(time_str, start, end):
+    """start/end are inclusive 'YYYY-MM-DD' strings (None = open)."""
+    if start is None and end is None:
+        return True
+    if not isinstance(time_str, str):
+        return False
+    day = time_str[:10]
+    return (start is None or day >= start) and (end is None or day <= end)
+
+
+def _selected_pets(pets, pet_names):
+    if not pet_names:
+        return list(pets.items())
+    return [(name, pets[name]) for name in pet_names if name in pets]
+
+
+def iter_pet_logs(pet, collection, start=None, end=None):
+    """Yield one pet's entries of one kind inside the date range."""
+    field = _TIME_FIELDS[collection]
+    for entry in pet.get(collection, []):
+        if _in_date_range(entry.get(field), start, end):
+            yield entry
+
+
+def iter_log_rows(pets, pet_names=None, start=None, end=None):
+    """Yield (pet_name, label, timestamp, entry) for every matching log entry."""
+    for pet_name, pet in _selected_pets(pets, pet_names):
+        for collection, label, field in LOG_KINDS:
+            for entry in iter_pet_logs(pet, collection, start, end):
+                yield pet_name, label, entry.get(field), entry
+
+
+def _csv_details(label, entry):
+    if label == "Feeding":
+        return f"{entry.get('grams')}g ({entry.get('calories')} kcal)"
+    if label == "Medication":
+        taken = "✅ Taken" if entry.get("taken") else "❌ Not taken"
+        return f"{entry.get('medication')} {entry.get('dose')} - {taken}"
+    return f"{entry.get('weight')} kg"
+
+
+def _open_output(path, compress):
+    if compress:
+        return gzip.open(path, "wt", newline="", encoding="utf-8")
+    return open(path, "w", newline="", encoding="utf-8")
+
+
+# --- WRITERS (each returns the number of rows written) ---
+def _write_csv(f, pets, pet_names, start, end):
+    writer = csv.writer(f)
+    writer.writerow(["Pet", "Type", "Timestamp", "Details"])
+    rows = 0
+    for pet_name, label, timestamp, entry in iter_log_rows(pets, pet_names, start, end):
+        writer.writerow([pet_name, label, timestamp, _csv_details(label, entry)])
+        rows += 1
+    return rows
+
+
+def _write_jsonl(f, pets, pet_names, start, end):
+    rows = 0
+    for pet_name, label, _, entry in iter_log_rows(pets, pet_names, start, end):
+        record = {"pet": pet_name, "type": label.lower()}
+        record.update(entry)
+        f.write(json.dumps(record, default=str) + "\n")
+        rows += 1
+    return rows
+
+
+def _indent(text, spaces):
+    pad = " " * spaces
+    return "\n".join(pad + line for line in text.split("\n"))
+
+
+def _write_json(f, pets, pet_names, start, end):
+    """
+    Same layout as the old json.dump(..., indent=2) export
+    ({pet: {"feedings": [...], "medications": [...], "weights": [...]}}),
+    written entry by entry.
+    """
+    rows = 0
+    selected = _selected_pets(pets, pet_names)
+    f.write("{")
+    for pet_index, (pet_name, pet) in enumerate(selected):
+        f.write(("," if pet_index else "") + f"\n  {json.dumps(pet_name)}: {{")
+        for kind_index, (collection, _, _) in enumerate(LOG_KINDS):
+            f.write(("," if kind_index else "") + f"\n    {json.dumps(collection)}: [")
+            count = 0
+            for entry in iter_pet_logs(pet, collection, start, end):
+                f.write(("," if count else "") + "\n" + _indent(json.dumps(entry, indent=2, default=str), 6))
+                count += 1
+            f.write("\n    ]" if count else "]")
+            rows += count
+        f.write("\n  }")
+    f.write("\n}" if selected else "}")
+    f.write("\n")
+    return rows
+
+
+_WRITERS = {"csv": _write_csv, "json": _write_json, "jsonl": _write_jsonl}
+
+
+def export_logs(pets, filename, fmt="csv", pet_names=None, start=None, end=None, compress=False):
+    """
+    Stream logs to exports/<filename>.
+
+    Args:
+        pets (dict): loaded pets
+        filename (str): output file name (".gz" is appended when compressing)
+        fmt (str): "csv", "json" or "jsonl"
+        pet_names (list): only export these pets (None = all)
+        start, end (str): inclusive 'YYYY-MM-DD' date range (None = open)
+        compress (bool): gzip the output
+
+    Returns:
+        int: number of log rows written
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if compress and not filename.endswith(".gz"):
+        filename += ".gz"
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    path = os.path.join(EXPORT_DIR, filename)
+
+    started = time.perf_counter()
+    with span(f"export_{fmt}"), _open_output(path, compress) as f:
+        rows = _WRITERS[fmt](f, pets, pet_names, start, end)
+    count("export_rows", rows)
+    elapsed = time.perf_counter() - started
+
+    rate = rows / elapsed if elapsed > 0 else float(rows)
+    print(Colors.GREEN + f"✅ Logs exported to {EXPORT_DIR}/{filename}" + Colors.RESET)
+    print(f"   📦 {rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+    return rows
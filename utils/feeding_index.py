@@ -0,0 +1,190 @@
+# utils/feeding_index.py
+"""
+In-memory index of feedings by (pet, day).
+
+Keeps running calorie/gram totals per day plus each pet's most recent
+meals, so the daily dashboard never has to scan a pet's full feeding
+history. A pet's history is only indexed the first time one of its
+lookups is used, then kept up to date on every new feeding.
+
+"Most recent" goes by the feeding's time, not its place in the list, so
+backdated entries (imports, `--time` on the CLI) don't become the last
+meal. Any save through the repository drops the index, since an edit may
+have changed feedings in place.
+"""
+import heapq
+import itertools
+from bisect import insort
+from operator import itemgetter
+from utils import timestamps
+from utils.repository import repository
+
+RECENT_MEALS = 3
+
+
+class DayTotals:
+    """Running totals for one pet on one day."""
+    __slots__ = ("calories", "grams", "meals")
+
+    def __init__(self):
+        self.calories = 0.0
+        self.grams = 0.0
+        self.meals = 0
+
+    def add(self, entry):
+        self.calories += entry.get("calories") or 0
+        self.grams += entry.get("grams") or 0
+        self.meals += 1
+
+
+_EMPTY_DAY = DayTotals()
+_UNTIMED = float("-inf")  # Feedings without a valid time rank as the oldest
+_RECENT_KEY = itemgetter(0, 1)  # (epoch, log position)
+
+
+def feeding_day(entry):
+    """Return the 'YYYY-MM-DD' part of a feeding's time, or None."""
+    time_str = entry.get("time")
+    if not isinstance(time_str, str) or len(time_str) < 10:
+        return None
+    return time_str[:10]
+
+
+def _meal_epochs(feedings):
+    """Epoch per feeding, _UNTIMED where the time is missing or invalid."""
+    column = getattr(feedings, "column", None)
+    if column is not None:  # Column storage already holds epochs (NaN when unknown)
+        return [_UNTIMED if t != t else t for t in column("time")]
+    return [_UNTIMED if epoch is None else epoch
+            for epoch in timestamps.parse_epochs(entry.get("time") for entry in feedings)]
+
+
+def _latest_meals(feedings, rows):
+    """
+    The RECENT_MEALS latest feedings as [(epoch, position, feeding)], oldest
+    first. Only the latest logged days are parsed; the whole history only
+    when one of their feedings has no valid time.
+    """
+    candidates = []
+    for day in sorted(rows, reverse=True):
+        if timestamps.parse_epoch(day) is None:
+            continue  # Not a date, so it can't be placed
+        candidates.extend(rows[day])
+        if len(candidates) >= RECENT_MEALS:
+            break
+    epochs = [timestamps.parse_epoch(feedings[i].get("time")) for i in candidates]
+    if len(candidates) < RECENT_MEALS or None in epochs:
+        candidates, epochs = range(len(feedings)), _meal_epochs(feedings)
+    items = [(_UNTIMED if epoch is None else epoch, i, feedings[i]) for epoch, i in zip(epochs, candidates)]
+    return heapq.nlargest(RECENT_MEALS, items, key=_RECENT_KEY)[::-1]
+
+
+class FeedingIndex:
+    def __init__(self):
+        self._days = {}      # pet name -> {date: DayTotals}
+        self._recent = {}    # pet name -> latest [(epoch, position, feeding)], oldest first
+        self._counts = {}    # pet name -> number of feedings indexed
+        self._versions = {}  # pet name -> id of its current index build
+        self._next_version = itertools.count()
+        self._pets = {}
+        self._pets_id = None
+        self._generation = None  # repository.generation the index was built at
+
+    def build(self, pets):
+        """Attach to `pets`; each pet is indexed lazily on its first lookup."""
+        self._days.clear()
+        self._recent.clear()
+        self._counts.clear()
+        self._versions.clear()
+        self._pets = pets
+        self._pets_id = id(pets)
+        self._generation = repository.generation
+
+    def reindex_pet(self, pet_name, feedings):
+        """Rebuild one pet's entries (e.g. after past calories were recalculated)."""
+        days = self._days[pet_name] = {}
+        rows = {}  # day -> positions, so finding the latest meals only parses a few times
+        for i, entry in enumerate(feedings):
+            day = feeding_day(entry)
+            if day is not None:
+                if day not in days:
+                    days[day] = DayTotals()
+                    rows[day] = []
+                days[day].add(entry)
+                rows[day].append(i)
+        self._recent[pet_name] = _latest_meals(feedings, rows)
+        self._counts[pet_name] = len(feedings)
+        self._versions[pet_name] = next(self._next_version)
+
+    def add(self, pet_name, entry):
+        """Record one new feeding (call after adding it to the pet, in any position)."""
+        if pet_name in self._days:
+            self._add(pet_name, entry)
+        # Otherwise the pet isn't indexed yet and the entry is picked up on first lookup
+
+    def _add(self, pet_name, entry):
+        day = feeding_day(entry)
+        if day is not None:
+            days = self._days[pet_name]
+            if day not in days:
+                days[day] = DayTotals()
+            days[day].add(entry)
+        epoch = timestamps.parse_epoch(entry.get("time"))
+        item = (_UNTIMED if epoch is None else epoch, self._counts[pet_name], entry)
+        recent = self._recent[pet_name]
+        if len(recent) < RECENT_MEALS or _RECENT_KEY(item) > _RECENT_KEY(recent[0]):
+            insort(recent, item, key=_RECENT_KEY)
+            del recent[:-RECENT_MEALS]
+        self._counts[pet_name] += 1
+
+    def _pet(self, pet_name):
+        """Index a pet's feedings on first use."""
+        if pet_name not in self._days:
+            self.reindex_pet(pet_name, self._pets.get(pet_name, {}).get("feedings", []))
+
+    def ensure(self, pets):
+        """
+        Cheap consistency check: rebuild if `pets` is a different dict or was
+        saved since the index was built, and re-index any indexed pet whose
+        feeding count no longer matches.
+        """
+        if self._pets_id != id(pets) or self._generation != repository.generation:
+            self.build(pets)
+            return
+        for pet_name in list(self._counts):
+            feedings = pets.get(pet_name, {}).get("feedings", [])
+            if self._counts[pet_name] != len(feedings):
+                self.reindex_pet(pet_name, feedings)
+
+    # --- LOOKUPS ---
+    def day(self, pet_name, date_str):
+        """Totals for one pet on one 'YYYY-MM-DD' day (zeros if none)."""
+        self._pet(pet_name)
+        return self._days[pet_name].get(date_str, _EMPTY_DAY)
+
+    def logged_days(self, pet_name):
+        """'YYYY-MM-DD' days that have at least one feeding (unordered)."""
+        self._pet(pet_name)
+        return self._days[pet_name].keys()
+
+    def version(self, pet_name):
+        """
+        Changes whenever a pet is re-indexed from scratch, so derived state
+        (e.g. analytics) knows to recompute instead of patching.
+        """
+        self._pet(pet_name)
+        return self._versions[pet_name]
+
+    def last_meal(self, pet_name):
+        self._pet(pet_name)
+        recent = self._recent[pet_name]
+        return recent[-1][2] if recent else None
+
+    def recent_meals(self, pet_name):
+        """Up to RECENT_MEALS latest feedings by time, oldest first."""
+        self._pet(pet_name)
+        return [entry for _, _, entry in self._recent[pet_name]]
+
+
+# Shared index used by the dashboard and logging functions
+feeding_index = FeedingIndex()
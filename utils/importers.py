@@ -0,0 +1,327 @@
+# utils/importers.py
+"""
+Bulk import of feeding / medication / weight logs.
+
+Understands:
+- legacy CSV   "Pet Name,Log Type,Details,Timestamp,Additional Info" (logs_export.csv)
+- export CSV   "Pet,Type,Timestamp,Details" (written by Export Logs)
+- legacy JSON  {"feedings": [{"pet": ...}], "medications": [...], "weights": [...]} (logs_export.json)
+- export JSON  {pet: {"feedings": [...], "medications": [...], "weights": [...]}}
+- JSON Lines   one {"pet": ..., "type": ..., ...} object per line (Export Logs → JSON Lines)
+
+CSV and JSON Lines are read row by row; JSON documents are parsed whole
+(json has no streaming reader), checked for the layouts above and then
+walked lazily. Rows are committed in batches of IMPORT_BATCH_SIZE with one
+store write per batch, entries already present are skipped, and missing
+calories are filled in from the pet's calories_per_100g. Rows older than a
+pet's latest entry are merged in at their place on the timeline, so old
+records never show up as the last meal or the latest weight.
+"""
+import csv
+import gzip
+import json
+import re
+from itertools import islice
+from utils.colors import Colors
+from utils.calorie_calculator import calculate_calories_batch
+from utils.logging_utils import append_log_entries, save_pets
+from utils import timestamps
+
+IMPORT_BATCH_SIZE = 1000
+
+_GRAMS_RE = re.compile(r"([\d.]+)\s*g\s*\(\s*([\d.]+|None)\s*kcal\)")
+_WEIGHT_RE = re.compile(r"([\d.]+)\s*(kg|lb)?", re.IGNORECASE)
+_MED_DOSE_RE = re.compile(r"^(.*?)\s+(\d.*)$")  # "Metacam 0.33ml" -> name, dose
+_KIND_BY_LABEL = {"feeding": "feedings", "medication": "medications", "weight": "weights"}
+
+
+# --- NORMALIZATION ---
+def _normalize_time(time_str, with_seconds=False):
+    """Re-format any stored timestamp shape to the app's own format."""
+    dt = timestamps.to_datetime(time_str)
+    if dt is None:
+        return None
+    return dt.strftime("%Y-%m-%d %H:%M:%S" if with_seconds else "%Y-%m-%d %H:%M")
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _feeding(grams, calories, time_str, food_name="Food", notes=""):
+    time_str = _normalize_time(time_str, with_seconds=True)
+    grams = _to_float(grams)
+    if time_str is None or grams is None:
+        return None
+    return {
+        "food_name": food_name or "Food",
+        "grams": grams,
+        "calories": _to_float(calories),
+        "time": time_str,
+        "notes": notes or "",
+    }
+
+
+def _weight(weight, time_str):
+    time_str = _normalize_time(time_str)
+    weight = _to_float(weight)
+    if time_str is None or weight is None:
+        return None
+    return {"timestamp": time_str, "weight": weight}
+
+
+def _medication(entry):
+    entry = dict(entry)
+    entry["timestamp"] = _normalize_time(entry.get("timestamp"))
+    if entry["timestamp"] is None or not entry.get("medication"):
+        return None
+    entry.setdefault("dose", "")
+    entry.setdefault("notes", "")
+    return entry
+
+
+def _normalize(pet_name, collection, entry):
+    """Return (pet_name, collection, entry) in the app's schema, or None if unusable."""
+    if collection == "feedings":
+        entry = _feeding(entry.get("grams"), entry.get("calories"),
+                         entry.get("time", entry.get("timestamp")),
+                         entry.get("food_name", "Food"), entry.get("notes", ""))
+    elif collection == "weights":
+        entry = _weight(entry.get("weight"), entry.get("timestamp", entry.get("date")))
+    elif collection == "medications":
+        entry = _medication(entry)
+    else:
+        entry = None
+    if not pet_name or not isinstance(pet_name, str) or entry is None:
+        return None
+    return pet_name, collection, entry
+
+
+# --- PARSERS (each yields (pet_name, collection, raw_entry) or None for bad rows) ---
+def _parse_legacy_csv_row(row):
+    pet_name, label = row.get("Pet Name"), (row.get("Log Type") or "").lower()
+    details, time_str, info = row.get("Details") or "", row.get("Timestamp"), row.get("Additional Info") or ""
+    if label == "feeding":
+        match = _GRAMS_RE.search(details)
+        if match:
+            return pet_name, "feedings", {"grams": match.group(1), "calories": match.group(2), "time": time_str, "notes": info}
+    elif label == "medication":
+        name, _, dose = details.partition("—")
+        return pet_name, "medications", {"timestamp": time_str, "medication": name.strip(), "dose": dose.strip(), "notes": info, "taken": True}
+    elif label == "weight":
+        match = _WEIGHT_RE.search(details)
+        if match:
+            return pet_name, "weights", {"timestamp": time_str, "weight": match.group(1)}
+    return None
+
+
+def _parse_export_csv_row(row):
+    pet_name, label = row.get("Pet"), (row.get("Type") or "").lower()
+    details, time_str = row.get("Details") or "", row.get("Timestamp")
+    if label == "feeding":
+        match = _GRAMS_RE.search(details)
+        if match:
+            return pet_name, "feedings", {"grams": match.group(1), "calories": match.group(2), "time": time_str}
+    elif label == "medication":
+        med, _, status = details.rpartition(" - ")
+        match = _MED_DOSE_RE.match(med or details)
+        name, dose = (match.group(1), match.group(2)) if match else (med or details, "")
+        return pet_name, "medications", {"timestamp": time_str, "medication": name, "dose": dose, "taken": "✅" in status}
+    elif label == "weight":
+        match = _WEIGHT_RE.search(details)
+        if match:
+            return pet_name, "weights", {"timestamp": time_str, "weight": match.group(1)}
+    return None
+
+
+def _iter_csv(f):
+    reader = csv.DictReader(f)
+    fields = set(reader.fieldnames or [])
+    parse = _parse_legacy_csv_row if "Pet Name" in fields else _parse_export_csv_row
+    for row in reader:
+        yield parse(row)
+
+
+def _iter_jsonl(f):
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            yield None
+            continue
+        if not isinstance(record, dict):
+            yield None
+            continue
+        pet_name = record.pop("pet", None)
+        collection = _KIND_BY_LABEL.get(str(record.pop("type", "")).lower())
+        yield (pet_name, collection, record) if collection else None
+
+
+def _is_legacy_json(data):
+    """
+    True for legacy global lists keyed by "pet", False for the export layout
+    {pet: {"feedings": [...], ...}}. Raises ValueError for anything else.
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"expected a JSON object at the top level, found a {type(data).__name__}")
+    legacy = any(key in data and isinstance(data[key], list) for key in _KIND_BY_LABEL.values())
+    groups = [(None, data)] if legacy else data.items()
+    for pet_name, logs in groups:
+        if not isinstance(logs, dict):
+            raise ValueError(f"the entry for {pet_name!r} should be an object with feedings/medications/weights")
+        for collection in _KIND_BY_LABEL.values():
+            if not isinstance(logs.get(collection, []), list):
+                where = f"{pet_name!r}: " if pet_name is not None else ""
+                raise ValueError(f"{where}\"{collection}\" should be a list")
+    return legacy
+
+
+def _iter_json(f):
+    data = json.load(f)
+    if _is_legacy_json(data):  # Checked up front, so a bad file imports nothing
+        for collection in _KIND_BY_LABEL.values():
+            for record in data.get(collection, []):
+                if not isinstance(record, dict):
+                    yield None
+                    continue
+                record = dict(record)
+                yield record.pop("pet", None), collection, record
+    else:
+        for pet_name, logs in data.items():
+            for collection in _KIND_BY_LABEL.values():
+                for record in logs.get(collection, []):
+                    yield (pet_name, collection, record) if isinstance(record, dict) else None
+
+
+def iter_import_rows(path):
+    """Yield normalized (pet_name, collection, entry) rows, or None for unusable rows."""
+    opener = gzip.open if path.endswith(".gz") else open
+    name = path[:-3] if path.endswith(".gz") else path
+    with opener(path, "rt", newline="", encoding="utf-8") as f:
+        if name.endswith(".jsonl"):
+            rows = _iter_jsonl(f)
+        elif name.endswith(".json"):
+            rows = _iter_json(f)
+        else:
+            rows = _iter_csv(f)
+        for row in rows:
+            yield None if row is None else _normalize(*row)
+
+
+# --- DEDUPE ---
+def _dedupe_key(pet_name, collection, entry):
+    if collection == "feedings":
+        return pet_name, collection, timestamps.parse_epoch(entry.get("time")), entry.get("grams")
+    if collection == "weights":
+        return pet_name, collection, timestamps.parse_epoch(entry.get("timestamp")), entry.get("weight")
+    return pet_name, collection, timestamps.parse_epoch(entry.get("timestamp")), entry.get("medication"), entry.get("dose")
+
+
+def _existing_keys(pets):
+    keys = set()
+    for pet_name, pet in pets.items():
+        for collection in ("feedings", "medications", "weights"):
+            for entry in pet.get(collection, []):
+                keys.add(_dedupe_key(pet_name, collection, entry))
+    return keys
+
+
+def _fill_calories(pets, batch):
+    """Compute missing calories per pet with one batch calculation."""
+    by_pet = {}
+    for pet_name, collection, entry in batch:
+        if collection == "feedings" and entry["calories"] is None:
+            by_pet.setdefault(pet_name, []).append(entry)
+    for pet_name, entries in by_pet.items():
+        density = pets[pet_name].get("calories_per_100g")
+        if not density:
+            continue
+        calories, _ = calculate_calories_batch([e["grams"] for e in entries], density)
+        for entry, value in zip(entries, calories):
+            entry["calories"] = value
+
+
+def _new_pet():
+    """Minimal pet record for pets that only exist in an imported file."""
+    return {
+        "species": "Unknown",
+        "breed": "Unknown",
+        "birth_year": "Unknown",
+        "color": "Unknown",
+        "calories_per_100g": None,
+        "feedings": [],
+        "medications": [],
+        "weights": []
+    }
+
+
+def import_logs(pets, path, batch_size=IMPORT_BATCH_SIZE, create_pets=True):
+    """
+    Import a log file into `pets`.
+
+    Returns:
+        dict: counts for "imported", "duplicates", "skipped" and "new_pets"
+    """
+    stats = {"imported": 0, "duplicates": 0, "skipped": 0, "new_pets": 0}
+    seen = _existing_keys(pets)
+    rows = iter_import_rows(path)
+
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            break
+
+        batch, added_pets = [], False
+        for row in chunk:
+            if row is None:
+                stats["skipped"] += 1
+                continue
+            pet_name = row[0]
+            if pet_name not in pets:
+                if not create_pets:
+                    stats["skipped"] += 1
+                    continue
+                pets[pet_name] = _new_pet()
+                stats["new_pets"] += 1
+                added_pets = True
+            key = _dedupe_key(*row)
+            if key in seen:
+                stats["duplicates"] += 1
+                continue
+            seen.add(key)
+            batch.append(row)
+
+        if added_pets:
+            save_pets(pets)  # New pet records must exist before their entries
+        if batch:
+            _fill_calories(pets, batch)
+            append_log_entries(pets, batch)
+            stats["imported"] += len(batch)
+    return stats
+
+
+def run_import(pets, path):
+    """Interactive wrapper: import and print a summary."""
+    try:
+        stats = import_logs(pets, path)
+    except FileNotFoundError:
+        print(Colors.RED + f"❌ File not found: {path}" + Colors.RESET)
+        return None
+    except (ValueError, csv.Error, OSError) as e:  # ValueError covers JSON/Unicode errors and bad layouts
+        print(Colors.RED + f"❌ Could not read {path}: {e}" + Colors.RESET)
+        return None
+
+    print(Colors.GREEN + f"✅ Imported {stats['imported']} log entries from {path}" + Colors.RESET)
+    if stats["duplicates"]:
+        print(f"   ♻️  Skipped {stats['duplicates']} already-logged entries")
+    if stats["skipped"]:
+        print(Colors.YELLOW + f"   ⚠️  Skipped {stats['skipped']} unreadable rows" + Colors.RESET)
+    if stats["new_pets"]:
+        print(f"   🐾 Added {stats['new_pets']} new pet(s) found in the file")
+    return stats
@@ -0,0 +1,178 @@
+# utils/instrumentation.py
+"""
+Opt-in timers, counters and profiling for hot paths.
+
+Everything is off by default. While disabled, @timed hands back the
+undecorated function and span() is a shared no-op context, so normal runs
+pay nothing. Set the environment before starting the app:
+
+- PAWCARE_METRICS=1          count calls and keep latency histograms;
+                             print a report to stderr on exit
+- PAWCARE_METRICS_FILE=PATH  also write the report as JSON
+- PAWCARE_PROFILE=PATH       run the session under cProfile and dump
+                             pstats to PATH on exit (implies metrics)
+"""
+import atexit
+import contextlib
+import functools
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+PROFILE_FILE = os.environ.get("PAWCARE_PROFILE")
+METRICS_FILE = os.environ.get("PAWCARE_METRICS_FILE")
+ENABLED = os.environ.get("PAWCARE_METRICS", "") not in ("", "0") or bool(PROFILE_FILE)
+
+# Histogram bucket upper bounds in milliseconds (a last bucket catches the rest)
+BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+_NO_OP = contextlib.nullcontext()
+
+
+class Histogram:
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, ms):
+        self.count += 1
+        self.total += ms
+        self.min = min(self.min, ms)
+        self.max = max(self.max, ms)
+        self.buckets[bisect_left(BUCKETS_MS, ms)] += 1
+
+    def percentile(self, p):
+        """Upper bound (ms) of the bucket holding the p-th percentile (max for the last bucket)."""
+        if not self.count:
+            return None
+        target, seen = p / 100 * self.count, 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                bound = min(BUCKETS_MS[i], self.max) if i < len(BUCKETS_MS) else self.max
+                return round(bound, 3)
+        return round(self.max, 3)
+
+    def to_dict(self):
+        return {"count": self.count, "total_ms": round(self.total, 3),
+                "mean_ms": round(self.total / self.count, 3) if self.count else None,
+                "min_ms": round(self.min, 3) if self.count else None, "max_ms": round(self.max, 3),
+                "p50_ms": self.percentile(50), "p95_ms": self.percentile(95),
+                "buckets": dict(zip([f"<={b}" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"], self.buckets))}
+
+
+class Metrics:
+    def __init__(self):
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, ms):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.add(ms)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def snapshot(self):
+        with self._lock:
+            return {"timers": {name: h.to_dict() for name, h in sorted(self._histograms.items())},
+                    "counters": dict(sorted(self._counters.items()))}
+
+    def report(self):
+        """Human-readable table of every timer and counter."""
+        data = self.snapshot()
+        lines = [f"{'timer':<30} {'calls':>7} {'total':>11} {'mean':>9} {'p50':>8} {'p95':>8} {'max':>9}"]
+        for name, h in data["timers"].items():
+            lines.append(f"{name:<30} {h['count']:>7} {h['total_ms']:>9.1f}ms {h['mean_ms']:>7.2f}ms "
+                         f"{h['p50_ms']:>6.1f}ms {h['p95_ms']:>6.1f}ms {h['max_ms']:>7.1f}ms")
+        for name, value in data["counters"].items():
+            lines.append(f"{name:<30} {value:>7}")
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+metrics = Metrics()
+
+
+# --- HOOKS ---
+def timed(name=None):
+    """Decorator: record the call's duration under `name` (default: the function name)."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                metrics.observe(label, (time.perf_counter() - started) * 1000)
+        return wrapper
+    return decorate
+
+
+class _Span:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        metrics.observe(self.name, (time.perf_counter() - self.started) * 1000)
+        return False
+
+
+def span(name):
+    """Context manager timing a block under `name` (no-op while disabled)."""
+    return _Span(name) if ENABLED else _NO_OP
+
+
+def count(name, n=1):
+    if ENABLED:
+        metrics.count(name, n)
+
+
+# --- EXIT REPORT / PROFILER ---
+_profiler = None
+
+
+def _dump():
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler.dump_stats(PROFILE_FILE)
+        print(f"cProfile stats written to {PROFILE_FILE} (python -m pstats {PROFILE_FILE})", file=sys.stderr)
+    print("\n" + metrics.report(), file=sys.stderr)
+    if METRICS_FILE:
+        import json
+        with open(METRICS_FILE, "w") as f:
+            json.dump(metrics.snapshot(), f, indent=2)
+
+
+if ENABLED:
+    if PROFILE_FILE:
+        import cProfile  # Only loaded when profiling was asked for
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    atexit.register(_dump)
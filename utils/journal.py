@@ -0,0 +1,332 @@
+# utils/journal.py
+"""
+Append-only journal for pets.json.
+
+Instead of rewriting the whole pets.json for every feeding, medication or
+weight, new entries are appended to data/pets.journal as one JSON line each.
+Edits to existing pets are journaled the same way: a "put" record replaces
+the changed parts of one pet and a "delete" record removes it.
+Loading reads the pets.json snapshot and replays the journal on top of it.
+Once the journal grows past JOURNAL_COMPACT_BYTES, a background thread folds
+it back into the snapshot.
+
+Durability (PAWCARE_FSYNC):
+- "group"  (default) journal lines reach the file immediately; one fsync
+  covers everything written within GROUP_COMMIT_MS
+- "always" fsync after every journal write
+- "off"    never fsync (fastest; a power cut can lose recent writes)
+Snapshots are always replaced atomically (temp file + rename), so a crash
+mid-save leaves the previous snapshot intact.
+"""
+import atexit
+import json
+import os
+import threading
+from utils.columnar import to_jsonable
+
+SNAPSHOT_FILE = "data/pets.json"
+JOURNAL_FILE = "data/pets.journal"
+JOURNAL_COMPACT_BYTES = 512 * 1024
+
+FSYNC_MODE = os.environ.get("PAWCARE_FSYNC", "group").lower()
+GROUP_COMMIT_MS = float(os.environ.get("PAWCARE_GROUP_COMMIT_MS", "50"))
+
+# Reserved key in pets.json holding bookkeeping (never a pet name)
+META_KEY = "_meta"
+
+# Log collections stored on every pet; everything else is the pet's profile
+COLLECTIONS = ("feedings", "medications", "weights")
+
+
+def _fsync_file(f):
+    if FSYNC_MODE != "off":
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(directory):
+    """Make a rename in `directory` durable (no-op where directories can't be opened)."""
+    if FSYNC_MODE == "off" or os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def replace_atomic(path, write):
+    """
+    Call write(f) on a temp file next to `path`, fsync it, then rename it
+    over `path`. Readers see either the old file or the new one, never half.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        write(f)
+        _fsync_file(f)
+    os.replace(tmp_path, path)
+    _fsync_dir(directory)
+
+
+def write_json_atomic(path, data, indent=2):
+    """Write JSON to `path` atomically and durably."""
+    replace_atomic(path, lambda f: json.dump(data, f, indent=indent, default=to_jsonable))
+
+
+def _read_journal_lines(journal_file):
+    """Yield decoded journal records, skipping blank or unreadable lines."""
+    if not os.path.exists(journal_file):
+        return
+    with open(journal_file, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Torn or corrupted line — skip it
+
+
+def _apply_record(pets, record):
+    """Apply one journal record to the in-memory pets dict."""
+    op = record.get("op")
+    if op == "delete":
+        pets.pop(record.get("pet"), None)
+        return
+    if op == "put":
+        pet = pets.setdefault(record["pet"], {})
+        parts = record["parts"]
+        if "profile" in parts:
+            for key in [k for k in pet if k not in COLLECTIONS]:
+                del pet[key]
+            pet.update(parts["profile"])
+        for collection in COLLECTIONS:
+            if collection in parts:
+                pet[collection] = parts[collection]
+        return
+    pet = pets.get(record.get("pet"))
+    if pet is None:
+        return  # Pet was removed after this entry was written
+    pet.setdefault(record["collection"], []).append(record["entry"])
+
+
+class PetJournal:
+    """
+    Snapshot + append-only journal pair.
+
+    Every journal record carries a sequence number. The snapshot remembers
+    the last sequence number folded into it (in its "_meta" block), so a
+    crash between writing the snapshot and trimming the journal never
+    replays an entry twice.
+    """
+
+    def __init__(self, snapshot_file=SNAPSHOT_FILE, journal_file=JOURNAL_FILE,
+                 compact_bytes=JOURNAL_COMPACT_BYTES):
+        self.snapshot_file = snapshot_file
+        self.journal_file = journal_file
+        self.compact_bytes = compact_bytes
+        self.seq = 0
+        self.meta = {}        # Snapshot bookkeeping besides journal_seq (e.g. schema version)
+        self._generation = 0  # Bumped whenever the snapshot is replaced
+        self._lock = threading.RLock()
+        self._compactor = None
+        self._unsynced = False  # Journal bytes written but not yet fsynced
+        self._sync_timer = None
+        atexit.register(self.sync)
+
+    @property
+    def version(self):
+        """Changes on every write (journal line, snapshot or reset), so readers can cache a load."""
+        with self._lock:
+            return self._generation, self.seq
+
+    # --- LOADING ---
+    def _read_snapshot(self):
+        """Return (pets, meta) from the snapshot file."""
+        if not os.path.exists(self.snapshot_file):
+            return {}, {}
+        with open(self.snapshot_file, "r") as f:
+            pets = json.load(f)
+        return pets, pets.pop(META_KEY, None) or {}
+
+    def _trim_torn_tail(self):
+        """Drop a half-written last line so new appends start on a clean line."""
+        if not os.path.exists(self.journal_file):
+            return
+        with open(self.journal_file, "rb+") as f:
+            data = f.read()
+            if not data or data.endswith(b"\n"):
+                return
+            f.truncate(data.rfind(b"\n") + 1)
+
+    def load(self):
+        """
+        Load the snapshot and replay the journal on top of it.
+        Raises json.JSONDecodeError if the snapshot itself is corrupted; the
+        damaged file is first moved to <snapshot>.corrupt so the next save
+        can't overwrite it.
+        """
+        with self._lock:
+            try:
+                pets, meta = self._read_snapshot()
+            except json.JSONDecodeError:
+                os.replace(self.snapshot_file, f"{self.snapshot_file}.corrupt")
+                raise
+            self.meta = {k: v for k, v in meta.items() if k != "journal_seq"}
+            folded_seq = meta.get("journal_seq", 0)
+            self._trim_torn_tail()
+            last_seq = folded_seq
+            for record in _read_journal_lines(self.journal_file):
+                seq = record.get("seq", 0)
+                if seq <= folded_seq:
+                    continue
+                _apply_record(pets, record)
+                last_seq = max(last_seq, seq)
+            self.seq = last_seq
+            return pets
+
+    # --- WRITING ---
+    def save(self, pets):
+        """Write a full snapshot and empty the journal."""
+        with self._lock:
+            data = dict(pets)
+            data[META_KEY] = {**self.meta, "journal_seq": self.seq}
+            write_json_atomic(self.snapshot_file, data)
+            if os.path.exists(self.journal_file):
+                # Safe even if this truncation is lost: the snapshot's journal_seq skips old lines
+                open(self.journal_file, "w").close()
+            self._unsynced = False
+            self._generation += 1
+
+    def append(self, pet_name, collection, entry):
+        """Append one entry to the journal (one short line, no snapshot rewrite)."""
+        self.append_many([(pet_name, collection, entry)])
+
+    def append_many(self, items):
+        """Append many (pet_name, collection, entry) items with a single write."""
+        self._write_records([{"pet": pet_name, "collection": collection, "entry": entry}
+                             for pet_name, collection, entry in items])
+
+    def write_changes(self, pets, changes):
+        """
+        Journal edits to existing pets with a single write. `changes` maps
+        pet name -> parts to store ("profile" and/or collection names), or
+        None for a deleted pet.
+        """
+        records = []
+        for pet_name, parts in changes.items():
+            if parts is None:
+                records.append({"pet": pet_name, "op": "delete"})
+                continue
+            pet = pets[pet_name]
+            data = {}
+            for part in parts:
+                if part == "profile":
+                    data["profile"] = {k: v for k, v in pet.items() if k not in COLLECTIONS}
+                else:
+                    data[part] = pet.get(part, [])
+            records.append({"pet": pet_name, "op": "put", "parts": data})
+        self._write_records(records)
+
+    def _write_records(self, records):
+        if not records:
+            return
+        with self._lock:
+            lines = []
+            for record in records:
+                self.seq += 1
+                lines.append(json.dumps({"seq": self.seq, **record}, default=to_jsonable) + "\n")
+            os.makedirs(os.path.dirname(self.journal_file) or ".", exist_ok=True)
+            with open(self.journal_file, "a") as f:
+                f.write("".join(lines))
+                if FSYNC_MODE == "always":
+                    _fsync_file(f)
+            if FSYNC_MODE == "group":
+                self._schedule_sync()
+            size = os.path.getsize(self.journal_file)
+        if size >= self.compact_bytes:
+            self.compact_in_background()
+
+    # --- GROUP COMMIT ---
+    def _schedule_sync(self):
+        """Make sure one fsync runs within GROUP_COMMIT_MS (called with the lock held)."""
+        self._unsynced = True
+        if self._sync_timer is None:
+            self._sync_timer = threading.Timer(GROUP_COMMIT_MS / 1000, self.sync)
+            self._sync_timer.daemon = True
+            self._sync_timer.start()
+
+    def sync(self):
+        """fsync journal writes that are still pending (group commit / exit / before reads)."""
+        with self._lock:
+            timer, self._sync_timer = self._sync_timer, None
+            if timer is not None and timer is not threading.current_thread():
+                timer.cancel()
+            if not self._unsynced:
+                return
+            self._unsynced = False
+            if os.path.exists(self.journal_file):
+                with open(self.journal_file, "ab") as f:
+                    _fsync_file(f)
+
+    def reset(self):
+        """Delete snapshot and journal (used by 'Delete All Data')."""
+        with self._lock:
+            self._unsynced = False  # Nothing left worth syncing
+            for path in (self.snapshot_file, self.journal_file):
+                if os.path.exists(path):
+                    os.remove(path)
+            self.seq = 0
+            self.meta = {}
+            self._generation += 1
+
+    # --- COMPACTION ---
+    def compact(self):
+        """
+        Fold the journal into the snapshot.
+
+        The expensive part (reading and re-serializing everything) happens
+        without holding the lock, so appends keep flowing; only the atomic
+        write of the finished text is done under it. The swap is
+        skipped if the snapshot was rewritten by someone else meanwhile.
+        """
+        with self._lock:
+            generation = self._generation
+
+        try:
+            pets, meta = self._read_snapshot()
+        except json.JSONDecodeError:
+            return False
+        folded_seq = meta.get("journal_seq", 0)
+        for record in _read_journal_lines(self.journal_file):
+            seq = record.get("seq", 0)
+            if seq <= folded_seq:
+                continue
+            _apply_record(pets, record)
+            folded_seq = max(folded_seq, seq)
+
+        pets[META_KEY] = {**meta, "journal_seq": folded_seq}
+        text = json.dumps(pets, indent=2, default=to_jsonable)
+
+        with self._lock:
+            if generation != self._generation:
+                return False
+            replace_atomic(self.snapshot_file, lambda f: f.write(text))
+            # Keep only entries appended while we were folding
+            remaining = [r for r in _read_journal_lines(self.journal_file) if r.get("seq", 0) > folded_seq]
+            replace_atomic(self.journal_file,
+                           lambda f: f.writelines(json.dumps(record, default=to_jsonable) + "\n" for record in remaining))
+            self._unsynced = False  # The rewritten journal was fsynced
+            self._generation += 1
+        return True
+
+    def compact_in_background(self):
+        """Start a compaction thread unless one is already running."""
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self.compact, name="pawcare-compactor", daemon=True)
+            self._compactor.start()
@@ -1,46 +1,147 @@
 import os
-import json
 import datetime
+import heapq
 from datetime import datetime, timedelta
+from itertools import islice
 from utils.colors import Colors
-
-# --- DATA FILE PATHS ---
-PETS_FILE = "data/pets.json"
-LOGS_FILE = "data/logs.json"
-USER_PREFS_FILE = "data/user_prefs.json"
+from utils.calorie_calculator import calculate_calories
+from utils.storage import get_store, TIME_FIELDS
+from utils.repository import repository, save_pets
+from utils.feeding_index import feeding_index
+from utils.instrumentation import timed
+from utils.action_log import action_log
+from utils.migrations import LEGACY_LOGS_FILE, MERGED_LOGS_FILE  # Old global log, merged into the store
+from utils.analytics import analytics, WINDOWS, ADHERENCE_TOLERANCE
+from utils.anomalies import alert_queue, detector
+from utils.dose_index import dose_index, dose_state
+from utils import timestamps
+from utils.weight_chart import series_for, sparkline, render_chart
+from utils.medication_scheduler import (
+    mark_dose_taken,
+    reschedule_medication,
+    unschedule_medication,
+    med_interval_hours,
+    count_occurrences,
+    iter_occurrences,
+    iter_upcoming_doses,
+)
+
+# --- UPCOMING MEDICATIONS DISPLAY ---
+UPCOMING_HORIZONS = (7, 30, 90)  # Days offered in the medication menu
+DOSES_SHOWN_PER_MED = 10
+NEXT_DOSES_SHOWN = 5
+
+# --- DASHBOARD ---
+SPARKLINE_DAYS = 30  # Weight sparkline window on the daily summary
+MISSED_DOSE_DAYS = 7  # Missed doses listed on the daily summary
 
 # --- HELPER FUNCTIONS ---
-def load_pets():
-    if not os.path.exists(PETS_FILE):
-        return {}
-    try:
-        with open(PETS_FILE, 'r') as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        return {}
+def _timeline_keys(collection, entries):
+    """Epoch per entry for ordering; an untimed entry keeps the time of the one before it."""
+    keys, last = [], float("-inf")
+    for epoch in timestamps.parse_epochs(entry.get(TIME_FIELDS[collection]) for entry in entries):
+        last = last if epoch is None else epoch
+        keys.append(last)
+    return keys
+
+def _add_log_entries(pets, items):
+    """
+    Add (pet_name, collection, entry) items to their pets and persist them.
+    Entries later than everything already logged are appended (journal
+    lines / row inserts). A backdated entry (imports, --time) is merged in
+    at its place on the timeline instead, and that collection is rewritten,
+    so the latest feeding/weight is always the last one.
+    """
+    feeding_index.ensure(pets)  # CLI/import paths never went through the dashboard's build()
+    groups = {}
+    for pet_name, collection, entry in items:
+        groups.setdefault((pet_name, collection), []).append(entry)
+    appended, merged = [], False
+    for (pet_name, collection), entries in groups.items():
+        history = pets[pet_name].setdefault(collection, [])
+        keys = _timeline_keys(collection, history[-1:] + entries)
+        history.extend(entries)
+        if all(a <= b for a, b in zip(keys, keys[1:])):
+            appended.extend((pet_name, collection, entry) for entry in entries)
+            continue
+        keys = _timeline_keys(collection, history)
+        order = sorted(range(len(history)), key=keys.__getitem__)  # Stable: equal times keep log order
+        history[:] = [history[i] for i in order]
+        repository.mark_dirty(pet_name, collection)
+        merged = True
+    if appended:
+        get_store().append_entries(appended)
+        for pet_name, collection in {(pet_name, collection) for pet_name, collection, _ in appended}:
+            repository.mark_stored(pet_name, collection)
+    if merged:
+        save_pets(pets)  # Rewrites the merged collections; also tells the indexes to rebuild
+
+    for pet_name, collection, entry in items:
+        log_action(f"Logged {collection[:-1]} for {pet_name}", pet=pet_name, action="log_entry",
+                   collection=collection, entry=entry)
+        if collection == "feedings":
+            feeding_index.add(pet_name, entry)
+            analytics.add_feeding(pet_name, entry)
+            detector.add_feeding(pets, pet_name, entry)
+        elif collection == "weights":
+            detector.add_weight(pets, pet_name, entry)
+
+@timed()
+def append_log_entry(pets, pet_name, collection, entry):
+    """
+    Add a feeding/medication/weight entry to a pet and persist it.
+    Only the new entry is written (journal line / single-row insert),
+    unless it is backdated (see _add_log_entries).
+    """
+    _add_log_entries(pets, [(pet_name, collection, entry)])
 
-def save_pets(pets):
-    os.makedirs("data", exist_ok=True)
-    with open(PETS_FILE, 'w') as f:
-        json.dump(pets, f, indent=2)
+@timed()
+def append_log_entries(pets, items):
+    """
+    Batch version of append_log_entry for (pet_name, collection, entry)
+    items: one store write for the whole batch.
+    """
+    _add_log_entries(pets, items)
+
+# --- HEALTH ALERTS ---
+ALERT_DAYS_SHOWN = 7  # Dashboard lists alerts raised within this many days
+
+def print_new_alerts(reader="console"):
+    """Print alerts raised since this reader last looked (e.g. right after logging)."""
+    for alert in alert_queue.drain(reader):
+        print(Colors.YELLOW + f"⚠️  {alert['pet']}: {alert['message']}" + Colors.RESET)
+
+def recent_alerts(pet_name):
+    """The latest alert of each kind raised for a pet in the last ALERT_DAYS_SHOWN days."""
+    since = (datetime.now() - timedelta(days=ALERT_DAYS_SHOWN)).strftime("%Y-%m-%d")
+    latest = {}
+    for alert in alert_queue.recent(pet_name, since):
+        latest[alert["kind"]] = alert
+    return list(latest.values())
 
 def load_user_prefs():
-    if not os.path.exists(USER_PREFS_FILE):
-        return {"unit": "kg"}
-    try:
-        with open(USER_PREFS_FILE, 'r') as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        return {"unit": "kg"}
+    return repository.prefs()  # Read from disk once, then cached
 
 def save_user_prefs(prefs):
-    os.makedirs("data", exist_ok=True)
-    with open(USER_PREFS_FILE, 'w') as f:
-        json.dump(prefs, f, indent=2)
+    repository.save_prefs(prefs)
+
+def _clean_hhmm(text):
+    """'8:00' -> '08:00'; None if not a valid HH:MM time."""
+    try:
+        return datetime.strptime(text.strip(), "%H:%M").strftime("%H:%M")
+    except ValueError:
+        return None
+
+def is_valid_time(text):
+    return _clean_hhmm(text) is not None
 
 def color_text(text, color):
     return f"{color}{text}{Colors.RESET}"
 
+def log_action(message, pet=None, action="edit", **details):
+    """Record a mutation in the action log (queued; never blocks the menu)."""
+    action_log.record(action, message, pet=pet, **details)
+
 # --- NEW HELPER: Select Pet by Number ---
 def select_pet(pets):
     """
@@ -75,24 +176,64 @@ def select_pet(pets):
         print(Colors.RED + "❌ Please enter a number." + Colors.RESET)
         return None
 
-# --- NEW HELPER: Normalize feeding_schedule to floats ---
-def normalize_feeding_schedule(pets):
+# --- LOG ENTRY BUILDERS (non-interactive, used by the menus and the CLI) ---
+def _entry_time(when, fmt):
+    """`when` may be None (now), a datetime, or a 'YYYY-MM-DD HH:MM[:SS]' string."""
+    if when is None:
+        return datetime.now().strftime(fmt)
+    if isinstance(when, datetime):
+        return when.strftime(fmt)
+    dt = timestamps.to_datetime(when)
+    if dt is None:
+        raise ValueError(f"Invalid date/time '{when}'. Use YYYY-MM-DD HH:MM.")
+    return dt.strftime(fmt)
+
+def build_feeding_entry(pet, food_name, grams, meal_time=None, notes=""):
     """
-    Ensures feeding_schedule is a list of floats, not strings.
-    Fixes legacy data corruption (e.g., ["250", "300"] → [250.0, 300.0]).
+    Create a feeding entry with calories from the pet's calories_per_100g.
+    Raises ValueError on invalid input.
     """
-    for pet_name, pet in pets.items():
-        schedule = pet.get("feeding_schedule")
-        if isinstance(schedule, list):
-            cleaned = []
-            for item in schedule:
-                try:
-                    cleaned.append(float(item))
-                except (ValueError, TypeError):
-                    continue  # Skip invalid entries
-            pet["feeding_schedule"] = cleaned
+    if not food_name:
+        raise ValueError("Food name cannot be empty.")
+    grams = float(grams)
+    if grams <= 0:
+        raise ValueError("Grams must be positive.")
+    calories_per_100g = pet.get("calories_per_100g")
+    total_calories = calculate_calories(grams, calories_per_100g) if calories_per_100g else None
+    return {
+        "food_name": food_name,
+        "grams": grams,
+        "calories": round(total_calories, 2) if total_calories is not None else None,
+        "time": _entry_time(meal_time, "%Y-%m-%d %H:%M:%S"),
+        "notes": notes or ""
+    }
+
+def build_medication_entry(medication, dose, notes="", when=None):
+    """Create a 'taken' medication log entry. Raises ValueError on invalid input."""
+    if not medication:
+        raise ValueError("Medication name cannot be empty!")
+    if not dose:
+        raise ValueError("Dose cannot be empty!")
+    return {
+        "timestamp": _entry_time(when, "%Y-%m-%d %H:%M"),
+        "medication": medication,
+        "dose": dose,
+        "notes": notes or "",
+        "taken": True
+    }
+
+def build_weight_entry(weight, when=None):
+    """Create a weight entry (kg). Raises ValueError on invalid input."""
+    weight = float(weight)
+    if weight <= 0:
+        raise ValueError("Weight must be positive.")
+    return {
+        "timestamp": _entry_time(when, "%Y-%m-%d %H:%M"),
+        "weight": weight
+    }
 
 # --- LOGGING FUNCTIONS ---
+@timed()  # Includes time spent at the prompts
 def log_feeding_entry(pets):
     """
     Log a feeding entry for a selected pet (by number), with option to use
@@ -125,7 +266,7 @@ def log_feeding_entry(pets):
     calories_per_100g = pets[pet_name].get("calories_per_100g")
     total_calories = None
     if calories_per_100g:
-        total_calories = (grams / 100) * calories_per_100g
+        total_calories = calculate_calories(grams, calories_per_100g)
         print(f"💡 Auto-calculated: {total_calories:.1f} kcal")
 
     # Ask user: current time or custom?
@@ -154,22 +295,17 @@ def log_feeding_entry(pets):
     notes = input("Add notes (optional): ").strip() or ""
 
     # Create log entry
-    log_entry = {
-        "food_name": food_name,
-        "grams": grams,
-        "calories": round(total_calories, 2) if total_calories is not None else None,
-        "time": meal_time,
-        "notes": notes
-    }
+    log_entry = build_feeding_entry(pets[pet_name], food_name, grams, meal_time, notes)
 
     # Add to pet's feedings list
-    pets[pet_name].setdefault("feedings", []).append(log_entry)
-    save_pets(pets)
+    append_log_entry(pets, pet_name, "feedings", log_entry)
 
     # Confirm
     cal_str = f" ({total_calories:.1f} kcal)" if total_calories is not None else " (calories unknown)"
     print(Colors.GREEN + f"✅ Logged: {grams}g of {food_name}{cal_str} at {meal_time}" + Colors.RESET)
+    print_new_alerts()
 
+@timed()
 def log_medication_entry(pets):
     """
     Log a medication entry for a selected pet (by number).
@@ -194,18 +330,12 @@ def log_medication_entry(pets):
 
     notes = input("📝 Optional notes: ").strip() or ""
 
-    entry = {
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M"),
-        "medication": medication,
-        "dose": dose,
-        "notes": notes,
-        "taken": True
-    }
+    entry = build_medication_entry(medication, dose, notes)
 
-    pets[pet_name].setdefault("medications", []).append(entry)
-    save_pets(pets)
+    append_log_entry(pets, pet_name, "medications", entry)
     print(Colors.GREEN + "✅ Medication logged as taken!" + Colors.RESET)
 
+@timed()
 def log_weight_entry(pets):
     """
     Log a weight entry for a selected pet (by number).
@@ -227,16 +357,54 @@ def log_weight_entry(pets):
         print(Colors.RED + "❌ Invalid number." + Colors.RESET)
         return
 
-    entry = {
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M"),
-        "weight": weight
-    }
+    entry = build_weight_entry(weight)
 
-    pets[pet_name].setdefault("weights", []).append(entry)
-    save_pets(pets)
+    append_log_entry(pets, pet_name, "weights", entry)
     print(Colors.GREEN + "✅ Weight logged!" + Colors.RESET)
+    print_new_alerts()
 
 # --- VIEWING & ANALYTICS ---
+def medication_buckets(pet_name, now):
+    """(overdue, upcoming) medications for a pet at `now` (epoch), from the dose index."""
+    return dose_index.overdue(pet_name, now), dose_index.upcoming(pet_name, now)
+
+def _missed_dose_summary(pet_name, days, now):
+    return [{"medication": med.get("medication"), "dose": med.get("dose"), "count": count}
+            for _, med, count in dose_index.missed_last_days(days, pet_name, now)]
+
+@timed()
+def daily_summary_data(pets):
+    """
+    The daily dashboard as plain data (one dict per pet), for scripts and
+    `main.py summary --json`.
+    """
+    today_str = datetime.now().strftime("%Y-%m-%d")
+    now = timestamps.now_epoch()
+    feeding_index.ensure(pets)
+    dose_index.ensure(pets)
+    detector.check_day_end(pets)
+    summary = []
+    for pet_name, pet in pets.items():
+        today = feeding_index.day(pet_name, today_str)
+        overdue, upcoming = medication_buckets(pet_name, now)
+        weights = pet.get("weights", [])
+        summary.append({
+            "pet": pet_name,
+            "species": pet.get("species"),
+            "weight": pet.get("weight"),
+            "target_daily_calories": pet.get("target_daily_calories"),
+            "today": {"date": today_str, "calories": round(today.calories, 2),
+                      "grams": round(today.grams, 2), "meals": today.meals},
+            "last_meal": feeding_index.last_meal(pet_name),
+            "overdue_medications": [{"medication": m["medication"], "dose": m["dose"], "next_due": m["next_due"]} for m in overdue],
+            "upcoming_medications": [{"medication": m["medication"], "dose": m["dose"], "next_due": m["next_due"]} for m in upcoming],
+            f"missed_doses_{MISSED_DOSE_DAYS}d": _missed_dose_summary(pet_name, MISSED_DOSE_DAYS, now),
+            "latest_weight": weights[-1] if weights else None,
+            "alerts": [{"kind": a["kind"], "message": a["message"], "day": a["day"]} for a in recent_alerts(pet_name)],
+        })
+    return summary
+
+@timed()
 def print_daily_summary(pets):
     """
     Display a rich, visual daily summary for each pet — like a pet health dashboard.
@@ -251,6 +419,12 @@ def print_daily_summary(pets):
         print("="*80)
         return
 
+    feeding_index.ensure(pets)
+    dose_index.ensure(pets)
+    detector.check_day_end(pets)
+    now = timestamps.now_epoch()
+    unit = load_user_prefs().get("unit", "kg")
+
     for pet_name, pet in pets.items():
         print(f"\n{Colors.BOLD}{pet_name.upper()}{Colors.RESET}")
         print("-" * 80)
@@ -258,7 +432,6 @@ def print_daily_summary(pets):
         # 🐾 BASIC INFO
         species = pet.get("species", "unknown").capitalize()
         weight = pet.get("weight", "N/A")
-        unit = load_user_prefs().get("unit", "kg")
         weight_display = f"{weight} {unit.upper()}" if weight != "N/A" else "N/A"
         print(f"   🐾 Species: {species} | ⚖️  Current Weight: {weight_display}")
 
@@ -266,7 +439,8 @@ def print_daily_summary(pets):
         schedule = pet.get("feeding_schedule", [])
         target_cal = pet.get("target_daily_calories", 0)
         feedings = pet.get("feedings", [])
-        total_calories = sum(f.get("calories", 0) for f in feedings)
+        today = feeding_index.day(pet_name, today_str)
+        total_calories = today.calories
 
         # Schedule visualization
         if schedule:
@@ -286,42 +460,21 @@ def print_daily_summary(pets):
             print(f"      {color}{bar}{Colors.RESET} {percent:.0f}%")
         else:
             print(f"   📊 Calorie Intake: {total_calories:.1f} kcal (Target not set)")
+        if today.meals:
+            print(f"      🥣 Today: {today.meals} meal{'s' if today.meals != 1 else ''}, {today.grams:.1f}g")
 
         # Last feeding
-        if feedings:
-            last = feedings[-1]
-            time_str = last.get("time", last.get("timestamp", "unknown"))
-            food = last.get("food_name", last.get("food_name", "Food"))
+        last = feeding_index.last_meal(pet_name)
+        if last:
+            time_str = last.get("time", "unknown")
+            food = last.get("food_name", "Food")
             cal_str = f" ({last.get('calories', 0):.0f} kcal)" if last.get("calories") else ""
             print(f"   ⏱️  Last meal: {format_time_for_display(time_str)} — {food}{cal_str}")
         else:
             print(f"   ⏱️  Last meal: ⚠️  No feedings logged today")
 
         # 💊 MEDICATIONS
-        meds = pet.get("medications", [])
-        overdue = []
-        upcoming = []
-        taken = 0
-
-        for med in meds:
-            next_due = med.get("next_due")
-            if not next_due:
-                continue
-            try:
-                if " " in next_due:
-                    due_dt = datetime.strptime(next_due, "%Y-%m-%d %H:%M")
-                else:
-                    due_dt = datetime.strptime(next_due, "%Y-%m-%d")
-            except ValueError:
-                continue
-
-            now = datetime.now()
-            if due_dt <= now and not med.get("taken", False):
-                overdue.append(med)
-            elif due_dt > now:
-                upcoming.append(med)
-            if med.get("taken", False):
-                taken += 1
+        overdue, upcoming = medication_buckets(pet_name, now)
 
         # Show medication status
         if overdue:
@@ -342,6 +495,11 @@ def print_daily_summary(pets):
                 if med.get("notes"):
                     print(f"         📝 {med['notes']}")
 
+        missed = _missed_dose_summary(pet_name, MISSED_DOSE_DAYS, now)
+        if missed:
+            missed_str = ", ".join(f"{m['medication']} ×{m['count']}" for m in missed)
+            print(f"   💊 {Colors.RED}❗ Missed (last {MISSED_DOSE_DAYS} days): {missed_str}{Colors.RESET}")
+
         # 📈 WEIGHT TRENDS (last 5 entries)
         weights = pet.get("weights", [])
         if weights:
@@ -354,16 +512,22 @@ def print_daily_summary(pets):
             else:
                 change_str = ""
 
-            print(f"   📈 Weight Trend: {last_weight:.1f}kg{change_str} ({len(weights)} entries)")
+            spark = sparkline(series_for(pet_name, weights), start=timestamps.now_epoch() - SPARKLINE_DAYS * 86400)
+            spark_str = f" {spark}" if spark.strip() else ""
+            print(f"   📈 Weight Trend: {last_weight:.1f}kg{change_str} ({len(weights)} entries){spark_str}")
         else:
             print(f"   📈 Weight Trend: ⚠️  No weight logs")
 
+        # ⚠️ HEALTH ALERTS (rapid weight change / under-target days)
+        for alert in recent_alerts(pet_name):
+            print(Colors.YELLOW + f"   ⚠️  {alert['message']}" + Colors.RESET)
+
         # 📅 LAST 3 FEEDINGS (if any)
         if len(feedings) >= 3:
-            recent = feedings[-3:]
+            recent = feeding_index.recent_meals(pet_name)
             print(f"   🕒 Recent meals:")
             for f in recent:
-                time_str = format_time_for_display(f.get("time", f.get("timestamp", "unknown")))
+                time_str = format_time_for_display(f.get("time", "unknown"))
                 food_name = f.get("food_name", "Food")
                 cal_str = f" ({f.get('calories', 0):.0f} kcal)" if f.get("calories") else ""
                 print(f"      ➤ {time_str} — {food_name}{cal_str}")
@@ -384,30 +548,151 @@ def print_daily_summary(pets):
     print("="*80)
 
 
-def plot_weekly_weight_trend(pets):
-    import matplotlib.pyplot as plt
-    import matplotlib.dates as mdates
+# --- MULTI-PET ANALYTICS ---
+def _fmt_pct(value):
+    if value is None:
+        return "—"
+    return f"{value:+.1f}%"
+
+def print_analytics_dashboard(pets):
+    """
+    Compare all pets side by side: rolling calorie means, adherence to
+    target_daily_calories and % weight change over 7/30/90 days.
+    """
+    if not pets:
+        print(Colors.YELLOW + "⚠️  No pets recorded." + Colors.RESET)
+        return
+    feeding_index.ensure(pets)
+    stats = analytics.dashboard(pets)
+
+    print("\n" + "="*80)
+    print(color_text("📊 MULTI-PET ANALYTICS (rolling 7 / 30 / 90 days)", Colors.CYAN + Colors.BOLD))
+    print("="*80)
+
+    kcal_header = " ".join(f"{f'{days}d kcal':>9}" for days in WINDOWS)
+    print(f"{'Pet':<16}{'Target':>7} {kcal_header} {'7d adh.':>8} {'30d adh.':>8}")
+    print("-" * 80)
+    for pet_name, pet_stats in stats.items():
+        windows = pet_stats["windows"]
+        target = pet_stats["target"]
+        means = " ".join(f"{w['calorie_mean']:>9.0f}" if w["calorie_mean"] is not None else f"{'—':>9}"
+                         for w in windows.values())
+        adherence = [windows[days]["adherence_pct"] for days in (7, 30)]
+        adherence = " ".join(f"{a:>7.0f}%" if a is not None else f"{'—':>8}" for a in adherence)
+        print(f"{pet_name[:15]:<16}{target if target else '—':>7} {means} {adherence}")
+
+    print("-" * 80)
+    weight_header = " ".join(f"{f'{days}d weight':>11}" for days in WINDOWS)
+    print(f"{'Pet':<16}{weight_header} {'Days on target (7/30/90)':>27}")
+    print("-" * 80)
+    for pet_name, pet_stats in stats.items():
+        windows = pet_stats["windows"]
+        changes = " ".join(f"{_fmt_pct(w['weight_change_pct']):>11}" for w in windows.values())
+        on_target = " / ".join(str(w["days_on_target"]) for w in windows.values())
+        print(f"{pet_name[:15]:<16}{changes} {on_target:>27}")
+
+    print("="*80)
+    print(f"💡 kcal = mean per day; adherence = mean ÷ target; on target = within ±{ADHERENCE_TOLERANCE:.0%} of target.")
+    print("="*80)
+
+# --- WEIGHT TREND PLOTTING ---
+# "terminal" (default) draws ASCII charts; "matplotlib" opens a plot window
+WEIGHT_PLOT_BACKEND = os.environ.get("PAWCARE_PLOT", "terminal").lower()
+
+_pyplot = None  # (pyplot, dates) once imported, False if matplotlib is unavailable
+
+def _load_pyplot():
+    """Import matplotlib once, on first use; remember a failed import too."""
+    global _pyplot
+    if _pyplot is None:
+        try:
+            import matplotlib.pyplot as plt
+            import matplotlib.dates as mdates
+            _pyplot = (plt, mdates)
+        except ImportError:
+            _pyplot = False
+    return _pyplot or None
+
+def _ask_window_days():
+    days = input("Days to show (blank = all history): ").strip()
+    if not days:
+        return None
+    try:
+        days = int(days)
+        if days <= 0:
+            raise ValueError
+        return days
+    except ValueError:
+        print(Colors.YELLOW + "⚠️  Invalid number — showing all history." + Colors.RESET)
+        return None
 
+def print_weight_charts(pets, days=None):
+    """ASCII weight chart per pet for the last `days` days (None = everything)."""
+    start = timestamps.now_epoch() - days * 86400 if days else None
+    print("\n" + "="*70)
+    title = f"⚖️  WEIGHT TREND (kg) — last {days} days" if days else "⚖️  WEIGHT TREND (kg)"
+    print(color_text(title, Colors.BLUE + Colors.BOLD))
+    print("="*70)
+    shown = 0
+    for pet_name, pet in pets.items():
+        weights = pet.get("weights", [])
+        if not weights:
+            continue
+        series = series_for(pet_name, weights)
+        lines = render_chart(series, start=start)
+        print(f"\n🐾 {color_text(pet_name, Colors.BOLD)} ({len(series)} entries)")
+        if not lines:
+            print("   No weights in this period.")
+            continue
+        for line in lines:
+            print(line)
+        shown += 1
+    if not shown and not any(pet.get("weights") for pet in pets.values()):
+        print(Colors.YELLOW + "⚠️  No weight logs yet." + Colors.RESET)
+    print("="*70)
+
+def _plot_with_matplotlib(pets, plt, mdates, days=None):
+    start = timestamps.now_epoch() - days * 86400 if days else None
     plt.figure(figsize=(10, 6))
     for pet_name, pet in pets.items():
         weights = pet.get("weights", [])
         if not weights:
             continue
-        dates = [datetime.strptime(w["timestamp"], "%Y-%m-%d %H:%M") for w in weights]
-        values = [w["weight"] for w in weights]
-        plt.plot(dates, values, marker="o", label=pet_name)
-
-    plt.title("Weekly Weight Trend (kg)", fontsize=16)
+        # Plot one min/max pair per pixel-ish bucket instead of every raw point
+        t0, t1, rows = series_for(pet_name, weights).buckets(400, start=start)
+        if t0 is None:
+            continue
+        step = ((t1 - t0) or 1.0) / len(rows)
+        dates, values = [], []
+        for i, row in enumerate(rows):
+            if row is not None:
+                when = timestamps.from_epoch(t0 + step * (i + 0.5))
+                dates += [when, when]
+                values += [row[0], row[1]]
+        plt.plot(dates, values, marker="o", markersize=2, label=pet_name)
+
+    plt.title("Weight Trend (kg)", fontsize=16)
     plt.xlabel("Date", fontsize=12)
     plt.ylabel("Weight (kg)", fontsize=12)
     plt.xticks(rotation=45)
-    plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%m/%d'))
-    plt.gca().xaxis.set_major_locator(mdates.DayLocator(interval=1))
+    locator = mdates.AutoDateLocator()
+    plt.gca().xaxis.set_major_locator(locator)
+    plt.gca().xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
     plt.legend()
     plt.tight_layout()
     plt.grid(True)
     plt.show()
 
+def plot_weekly_weight_trend(pets):
+    days = _ask_window_days()
+    if WEIGHT_PLOT_BACKEND == "matplotlib":
+        pyplot = _load_pyplot()
+        if pyplot is not None:
+            _plot_with_matplotlib(pets, *pyplot, days=days)
+            return
+        print(Colors.YELLOW + "⚠️  matplotlib is not installed — drawing in the terminal." + Colors.RESET)
+    print_weight_charts(pets, days)
+
 def format_frequency_display(frequency, interval_hours, dosing_time):
     if frequency == "one_time":
         return "One-time"
@@ -435,49 +720,42 @@ def format_medication_status(med):
     - ⏳ Upcoming (if due in future or today but not yet passed)
     - One-time (if no next_due)
     """
-    next_due_str = med.get("next_due")
-    taken = med.get("taken", False)
-    dosing_time = med.get("dosing_time")
-
-    if taken:
-        return "✅ Taken"
-
-    if not next_due_str:
-        return "One-time"
-
-    try:
-        if " " in next_due_str:
-            next_due = datetime.strptime(next_due_str, "%Y-%m-%d %H:%M")
-        else:
-            next_due = datetime.strptime(next_due_str, "%Y-%m-%d")
-    except ValueError:
-        return "Invalid date"
-
-    now = datetime.now()
-
-    # If due as a date only (no time), assume 00:00
-    if " " not in next_due_str:
-        next_due = next_due.replace(hour=0, minute=0, second=0, microsecond=0)
-
-    if next_due < now:
-        return "🚨 OVERDUE"
-    else:
-        return "⏳ Upcoming"
-
-def view_upcoming_medications(pets):
+    return _STATUS_LABELS[dose_state(med, timestamps.now_epoch())]
+
+_STATUS_LABELS = {
+    "taken": "✅ Taken",
+    "one_time": "One-time",
+    "invalid": "Invalid date",
+    "overdue": "🚨 OVERDUE",
+    "upcoming": "⏳ Upcoming",
+}
+
+@timed()
+def view_upcoming_medications(pets, days=7):
     """
-    Display ALL upcoming medication doses due within the next 7 days.
+    Display ALL upcoming medication doses due within the next `days` days.
     Groups all doses by medication entry (not by dose).
-    Shows count + list of dates per med.
+    Shows count + the first few dates per med.
+
+    Dose counts are computed arithmetically and dates are streamed lazily,
+    so hourly medications over a 90-day horizon stay cheap.
     """
     print("\n" + "="*60)
-    print(color_text("📅 UPCOMING MEDICATIONS (Next 7 Days)", Colors.BLUE + Colors.BOLD))
+    print(color_text(f"📅 UPCOMING MEDICATIONS (Next {days} Days)", Colors.BLUE + Colors.BOLD))
     print("="*60)
 
     found = False
     total_doses = 0
     today = datetime.now()
-    end_date = today + timedelta(days=7)
+    end_date = today + timedelta(days=days)
+
+    # Next few doses across every pet, in time order
+    next_doses = list(islice(iter_upcoming_doses(pets, today, end_date), NEXT_DOSES_SHOWN))
+    if next_doses:
+        print(color_text("  ⏭️  Next up:", Colors.CYAN))
+        for dose_time, pet_name, med in next_doses:
+            print(f"     ➤ {dose_time.strftime('%Y-%m-%d %H:%M')} — {pet_name}: {med['medication']} ({med['dose']})")
+        print()
 
     # Group meds by pet + medication + dose (to deduplicate identical entries)
     grouped = {}
@@ -487,49 +765,12 @@ def view_upcoming_medications(pets):
             continue
 
         for med in pet["medications"]:
-            # Skip if no next_due
-            next_due_str = med.get("next_due")
-            if not next_due_str:
+            next_due = timestamps.to_datetime(med.get("next_due"))
+            if next_due is None:
                 continue
 
-            # Derive interval in hours
-            interval_hours = med.get("interval_hours")
-            if not interval_hours:
-                freq = med.get("frequency")
-                if freq == "every_day":
-                    interval_hours = 24
-                elif freq == "every_3_days":
-                    interval_hours = 72
-                elif freq == "weekly":
-                    interval_hours = 168
-                else:
-                    interval_hours = None
-
-            # Generate all upcoming doses within next 7 days
-            upcoming_doses = []
-            try:
-                if " " in next_due_str:
-                    next_due = datetime.strptime(next_due_str, "%Y-%m-%d %H:%M")
-                else:
-                    next_due = datetime.strptime(next_due_str, "%Y-%m-%d")
-            except ValueError:
-                continue
-
-            if next_due < today:
-                continue
-
-            if interval_hours is None:
-                # One-time or unknown
-                if today <= next_due <= end_date:
-                    upcoming_doses.append(next_due)
-            else:
-                # Recurring: generate all doses until end_date
-                current_due = next_due
-                while current_due <= end_date:
-                    upcoming_doses.append(current_due)
-                    current_due += timedelta(hours=interval_hours)
-
-            if not upcoming_doses:
+            interval_hours = med_interval_hours(med)
+            if count_occurrences(next_due, interval_hours, today, end_date) == 0:
                 continue
 
             # Create a unique key for grouping: pet + med name + dose + frequency
@@ -546,7 +787,7 @@ def view_upcoming_medications(pets):
                 grouped[unique_key] = {
                     "pet": pet_name,
                     "med": med,
-                    "doses": [],
+                    "series": set(),
                     "freq_display": format_frequency_display(
                         med.get("frequency"),
                         med.get("interval_hours"),
@@ -555,34 +796,32 @@ def view_upcoming_medications(pets):
                     "status": format_medication_status(med)
                 }
 
-            grouped[unique_key]["doses"].extend(upcoming_doses)
+            # Identical entries share one (first dose, interval) series
+            grouped[unique_key]["series"].add((next_due, interval_hours))
 
     # Now print grouped results
     for key, group in grouped.items():
         med = group["med"]
-        doses = group["doses"]
         pet_name = group["pet"]
         freq_display = group["freq_display"]
         status = group["status"]
+        series = group["series"]
 
-        # Sort doses chronologically
-        doses.sort()
-
-        # Filter doses to only those within next 7 days (should already be, but just in case)
-        doses = [d for d in doses if d >= today and d <= end_date]
-        if not doses:
+        dose_count = sum(count_occurrences(first, interval, today, end_date) for first, interval in series)
+        if not dose_count:
             continue
 
         found = True
-        total_doses += len(doses)
+        total_doses += dose_count
 
         # Print main medication header
         print(color_text(f"  🐾 {pet_name} — {med['medication']} ({med['dose']})", Colors.GREEN))
         print(f"     ➤ Frequency: {freq_display} | {color_text(status, Colors.YELLOW if status == '⏳ Upcoming' else Colors.RED if status == '🚨 OVERDUE' else Colors.GREEN)}")
-        print(f"     ➤ Upcoming doses: {len(doses)} total")
+        print(f"     ➤ Upcoming doses: {dose_count} total")
 
-        # Print each upcoming dose in compact format
-        for dose_time in doses:
+        # Print the first few doses in compact format (merged if several series)
+        streams = [iter_occurrences(first, interval, today, end_date) for first, interval in sorted(series)]
+        for dose_time in islice(heapq.merge(*streams), DOSES_SHOWN_PER_MED):
             days_ahead = (dose_time.date() - today.date()).days
             if days_ahead == 0:
                 day_str = "TODAY"
@@ -594,6 +833,8 @@ def view_upcoming_medications(pets):
                 day_str = f"on {dose_time.strftime('%b %d')}"  # fallback
 
             print(f"        ➤ {day_str} — {dose_time.strftime('%Y-%m-%d %H:%M')}")
+        if dose_count > DOSES_SHOWN_PER_MED:
+            print(f"        … and {dose_count - DOSES_SHOWN_PER_MED} more")
 
         if med.get("notes"):
             print(f"     ➤ Note: {med['notes']}")
@@ -602,15 +843,29 @@ def view_upcoming_medications(pets):
         print()
 
     if not found:
-        print(color_text("   🎯 No upcoming medications within 7 days.", Colors.YELLOW))
+        print(color_text(f"   🎯 No upcoming medications within {days} days.", Colors.YELLOW))
     else:
-        print(color_text(f"\n✅ Total upcoming doses: {total_doses} in next 7 days", Colors.GREEN))
+        print(color_text(f"\n✅ Total upcoming doses: {total_doses} in next {days} days", Colors.GREEN))
 
     print("="*60)
     input("Press Enter to return to main menu...")
 
 
 # --- MANAGEMENT FUNCTIONS ---
+def view_missed_doses(pets, days=7):
+    """List doses missed in the last `days` days for every pet (from the dose index)."""
+    print("\n" + "="*60)
+    print(color_text(f"❗ MISSED DOSES (Last {days} Days)", Colors.RED + Colors.BOLD))
+    print("="*60)
+
+    dose_index.ensure(pets)
+    missed = dose_index.missed_last_days(days)
+    if not missed:
+        print(Colors.GREEN + "🟢 No missed doses. Great job!" + Colors.RESET)
+    for pet_name, med, count in missed:
+        print(f"   ➤ {pet_name}: {med['medication']} ({med['dose']}) — {count} dose{'s' if count != 1 else ''} missed")
+    print("="*60)
+
 def manage_medications(pets):
     """
     Full medication management menu with reorganized options:
@@ -619,6 +874,7 @@ def manage_medications(pets):
     3. Mark medication as taken
     4. Edit notes on medication
     5. Delete medication entry
+    6. View missed doses
     0. Back to main menu
     """
     if not pets:
@@ -709,6 +965,9 @@ def manage_medications(pets):
 
             pets[pet_name]["medications"].append(new_med)
             save_pets(pets)
+            log_action(f"Added medication {medication} for {pet_name}", pet=pet_name, action="add_medication", medication=new_med)
+            reschedule_medication(pet_name, new_med)
+            dose_index.update(pet_name, new_med)
             print(Colors.GREEN + "✅ Medication added!" + Colors.RESET)
         return
 
@@ -738,10 +997,11 @@ def manage_medications(pets):
     print("   3. Mark medication as taken")
     print("   4. Edit notes on medication")
     print("   5. Delete medication entry")
+    print("   6. View missed doses")
     print("   0. Back to main menu")
     print("-" * 60)
 
-    choice = input("Choose an option (0-5): ").strip()
+    choice = input("Choose an option (0-6): ").strip()
 
     if choice == "1":
         pet_name = input("Enter pet name: ").strip()
@@ -809,11 +1069,16 @@ def manage_medications(pets):
 
         pets[pet_name]["medications"].append(new_med)
         save_pets(pets)
+        log_action(f"Added medication {medication} for {pet_name}", pet=pet_name, action="add_medication", medication=new_med)
+        reschedule_medication(pet_name, new_med)
+        dose_index.update(pet_name, new_med)
         print(Colors.GREEN + "✅ Medication added!" + Colors.RESET)
 
     elif choice == "2":
-        # Call the existing view function directly
-        view_upcoming_medications(pets)
+        horizons = "/".join(str(d) for d in UPCOMING_HORIZONS)
+        days = input(f"Show how many days ahead? ({horizons}) [7]: ").strip()
+        days = int(days) if days.isdigit() and int(days) in UPCOMING_HORIZONS else 7
+        view_upcoming_medications(pets, days)
 
     elif choice == "3":
         try:
@@ -824,10 +1089,16 @@ def manage_medications(pets):
             item = all_meds[idx]
             pet_name = item["pet"]
             med = item["med"]
-            med["taken"] = True
-            med["taken_at"] = datetime.now().strftime("%Y-%m-%d %H:%M")
+            mark_dose_taken(med)
             save_pets(pets)
-            print(Colors.GREEN + "✅ Marked as taken!" + Colors.RESET)
+            log_action(f"Marked {med['medication']} taken for {pet_name}", pet=pet_name, action="dose_taken",
+                       medication=med["medication"])
+            reschedule_medication(pet_name, med)
+            dose_index.update(pet_name, med)
+            if med.get("taken"):
+                print(Colors.GREEN + "✅ Marked as taken!" + Colors.RESET)
+            else:
+                print(Colors.GREEN + f"✅ Marked as taken! Next dose due {format_time_for_display(med['next_due'])}" + Colors.RESET)
         except ValueError:
             print(Colors.RED + "❌ Invalid input." + Colors.RESET)
 
@@ -844,6 +1115,8 @@ def manage_medications(pets):
             new_notes = input(f"Current notes: \"{old_notes}\"\nNew notes (leave blank to clear): ").strip()
             med["notes"] = new_notes
             save_pets(pets)
+            log_action(f"Updated notes on {med['medication']} for {pet_name}", pet=pet_name, action="edit_medication",
+                       medication=med["medication"], old=old_notes, new=new_notes)
             print(Colors.GREEN + "✅ Notes updated!" + Colors.RESET)
         except ValueError:
             print(Colors.RED + "❌ Invalid input." + Colors.RESET)
@@ -859,14 +1132,24 @@ def manage_medications(pets):
             med = item["med"]
             pets[pet_name]["medications"].remove(med)
             save_pets(pets)
+            log_action(f"Deleted medication {med['medication']} for {pet_name}", pet=pet_name, action="delete_medication",
+                       medication=med)
+            unschedule_medication(pet_name, med)
+            dose_index.remove(pet_name, med)
             print(Colors.GREEN + "✅ Medication deleted!" + Colors.RESET)
         except ValueError:
             print(Colors.RED + "❌ Invalid input." + Colors.RESET)
 
+    elif choice == "6":
+        horizons = "/".join(str(d) for d in UPCOMING_HORIZONS)
+        days = input(f"Look back how many days? ({horizons}) [7]: ").strip()
+        days = int(days) if days.isdigit() and int(days) in UPCOMING_HORIZONS else 7
+        view_missed_doses(pets, days)
+
     elif choice == "0":
         return
     else:
-        print(Colors.RED + "❌ Invalid option. Please choose 0–5." + Colors.RESET)
+        print(Colors.RED + "❌ Invalid option. Please choose 0–6." + Colors.RESET)
 
     # Prompt to return after action
     input("\nPress Enter to return to main menu...")
@@ -1013,11 +1296,20 @@ def manage_feeding_schedule(pets):
 
     # Ask for reminders
     reminder = input("🔔 Enable feeding reminders? (y/N): ").strip().lower() == 'y'
+    times = pet.get("feeding_times", [])
+    if reminder:
+        raw = input(f"⏰ Meal times, comma-separated HH:MM (Enter for {', '.join(times) or 'evenly 08:00-20:00'}): ").strip()
+        if raw:
+            times = sorted({t for t in map(_clean_hhmm, raw.split(",")) if t})
 
     # Save
     pet["feeding_schedule"] = schedule
     pet["feeding_reminders"] = reminder
+    if times:
+        pet["feeding_times"] = times
     save_pets(pets)
+    log_action(f"Set feeding schedule for {pet_name}", pet=pet_name, action="set_feeding_schedule",
+               schedule=schedule, reminders=reminder, times=times)
 
     # Display final
     display_schedule = [f"{cal:.1f}" for cal in schedule]
@@ -1084,6 +1376,7 @@ def delete_feeding_schedule(pets):
         pet["feeding_schedule"] = []
         pet["feeding_reminders"] = False
         save_pets(pets)
+        log_action(f"Deleted feeding schedule for {pet_name}", pet=pet_name, action="delete_feeding_schedule")
         print(Colors.GREEN + f"✅ Feeding schedule and reminders deleted for {pet_name}." + Colors.RESET)
     else:
         print(Colors.YELLOW + "❌ Deletion cancelled." + Colors.RESET)
@@ -1127,7 +1420,8 @@ def view_feeding_schedule(pets):
         except (ValueError, TypeError):
             pass  # Skip if schedule is invalid
 
-    print(f"   🔔 Feeding reminders: {'ON' if reminders else 'OFF'}")
+    times = f" at {', '.join(pet['feeding_times'])}" if reminders and pet.get("feeding_times") else ""
+    print(f"   🔔 Feeding reminders: {'ON' if reminders else 'OFF'}{times}")
 
     print("="*50)
     input("Press Enter to return...")
@@ -1150,10 +1444,11 @@ def delete_all_data():
     if confirm != 'y':
         print(Colors.YELLOW + "❌ Deletion cancelled." + Colors.RESET)
         return
-    files = [PETS_FILE, LOGS_FILE, USER_PREFS_FILE]
-    for f in files:
-        if os.path.exists(f):
-            os.remove(f)
+    repository.reset()  # pets.json + journal (or pets.db) and prefs
+    for path in (LEGACY_LOGS_FILE, MERGED_LOGS_FILE):
+        if os.path.exists(path):
+            os.remove(path)
+    log_action("Deleted all data", action="delete_all_data")  # The action log itself is kept
     print(Colors.GREEN + "✅ All data deleted!" + Colors.RESET)
 
 def reset_user_prefs():
@@ -1162,43 +1457,22 @@ def reset_user_prefs():
         print(Colors.YELLOW + "❌ Reset cancelled." + Colors.RESET)
         return
     save_user_prefs({"unit": "kg"})
+    log_action("Reset preferences", action="reset_prefs")
     print(Colors.GREEN + "✅ Preferences reset to default (kg)." + Colors.RESET)
 
-def export_logs_to_csv(pets, filename):
-    import csv
-    os.makedirs("exports", exist_ok=True)
-    with open(f"exports/{filename}", 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(["Pet", "Type", "Timestamp", "Details"])
-        for pet_name, pet in pets.items():
-            for log in pet.get("feedings", []):
-                writer.writerow([pet_name, "Feeding", log["time"], f"{log['grams']}g ({log['calories']} kcal)"])
-            for log in pet.get("medications", []):
-                taken = "✅ Taken" if log.get("taken") else "❌ Not taken"
-                writer.writerow([pet_name, "Medication", log["timestamp"], f"{log['medication']} {log['dose']} - {taken}"])
-            for log in pet.get("weights", []):
-                writer.writerow([pet_name, "Weight", log["timestamp"], f"{log['weight']} kg"])
-    print(Colors.GREEN + f"✅ Logs exported to exports/{filename}" + Colors.RESET)
-
-def export_logs_to_json(pets, filename):
-    import json
-    os.makedirs("exports", exist_ok=True)
-    export_data = {}
-    for pet_name, pet in pets.items():
-        export_data[pet_name] = {
-            "feedings": pet.get("feedings", []),
-            "medications": pet.get("medications", []),
-            "weights": pet.get("weights", [])
-        }
-    with open(f"exports/{filename}", 'w') as f:
-        json.dump(export_data, f, indent=2, default=str)
-    print(Colors.GREEN + f"✅ Logs exported to exports/{filename}" + Colors.RESET)
+def export_logs_to_csv(pets, filename, pet_names=None, start=None, end=None, compress=False):
+    from utils.exporters import export_logs  # csv/gzip are only needed when exporting
+    return export_logs(pets, filename, "csv", pet_names, start, end, compress)
+
+def export_logs_to_json(pets, filename, pet_names=None, start=None, end=None, compress=False):
+    from utils.exporters import export_logs  # csv/gzip are only needed when exporting
+    return export_logs(pets, filename, "json", pet_names, start, end, compress)
+
+def export_logs_to_jsonl(pets, filename, pet_names=None, start=None, end=None, compress=False):
+    from utils.exporters import export_logs  # csv/gzip are only needed when exporting
+    return export_logs(pets, filename, "jsonl", pet_names, start, end, compress)
 
 # --- BONUS: Helper to format time for display ---
 def format_time_for_display(time_str):
-    """Convert 'YYYY-MM-DD HH:MM:SS' to 'MMM D, h:mm A' (e.g., Apr 5, 8:30 AM)"""
-    try:
-        dt = datetime.strptime(time_str, "%Y-%m-%d %H:%M:%S")
-        return dt.strftime("%b %d, %I:%M %p").replace(" 0", " ")  # Remove leading zero
-    except:
-        return time_str
\ No newline at end of file
+    """Convert 'YYYY-MM-DD HH:MM[:SS]' to 'MMM D, h:mm A' (e.g., Apr 5, 8:30 AM)"""
+    return timestamps.format_display(time_str)
\ No newline at end of file
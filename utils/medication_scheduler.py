@@ -1,6 +1,279 @@
 # utils/medication_scheduler.py
 """
-This file is kept for legacy import safety.
-All medication scheduling logic is now in utils/logging_utils.py.
+Medication reminder scheduler.
+
+Every recurring medication with a `next_due` sits in a min-heap keyed by its
+due time. A background thread sleeps until the earliest dose, fires the
+reminder, and queues that medication's following dose. Marking a dose as
+taken advances `next_due` and re-queues it. Each add/fire/update is
+O(log n), so thousands of schedules never need to be polled.
 """
-from utils.logging_utils import start_medication_scheduler
\ No newline at end of file
+import heapq
+import itertools
+import threading
+from datetime import datetime, timedelta
+from utils import timestamps
+from utils.colors import Colors
+
+FREQUENCY_HOURS = {"every_day": 24, "every_3_days": 72, "weekly": 168}
+MAX_SLEEP_SECONDS = 60  # Wake up at least this often (clock changes, stop requests)
+
+
+def med_interval_hours(med):
+    """Dosing interval in hours, or None for one-time medications."""
+    interval = med.get("interval_hours")
+    if interval:
+        return interval
+    return FREQUENCY_HOURS.get(med.get("frequency"))
+
+
+def mark_dose_taken(med, when=None):
+    """
+    Record the current dose as taken.
+
+    Recurring medications get `next_due` advanced past `when` (skipping any
+    doses that were missed entirely) and stay pending for that next dose.
+    One-time medications are simply flagged as taken.
+
+    Every call also appends to med["dose_history"]: one
+    {"scheduled", "taken_at"} record for the dose taken, preceded by a
+    {"scheduled", "taken_at": None, "missed": n} record when n earlier
+    doses were skipped (n doses every interval from "scheduled").
+    """
+    when = when or datetime.now()
+    med["taken_at"] = when.strftime("%Y-%m-%d %H:%M")
+    history = med.setdefault("dose_history", [])
+
+    interval = med_interval_hours(med)
+    due = timestamps.to_datetime(med.get("next_due"))
+    if not interval or due is None:
+        if due is not None:
+            history.append({"scheduled": due.strftime("%Y-%m-%d %H:%M"), "taken_at": med["taken_at"]})
+        med["taken"] = True
+        return
+
+    step = timedelta(hours=interval)
+    doses_passed = int((when - due) // step) + 1 if when >= due else 1
+    if doses_passed > 1:
+        history.append({"scheduled": due.strftime("%Y-%m-%d %H:%M"), "taken_at": None, "missed": doses_passed - 1})
+    taken_dose = due + step * (doses_passed - 1)
+    history.append({"scheduled": taken_dose.strftime("%Y-%m-%d %H:%M"), "taken_at": med["taken_at"]})
+    med["next_due"] = (due + step * doses_passed).strftime("%Y-%m-%d %H:%M")
+    med["taken"] = False
+
+
+# --- DOSE OCCURRENCES (closed form) ---
+def _first_index(first_due, step, start):
+    """Index k of the first dose first_due + k*step that is >= start."""
+    if start <= first_due:
+        return 0
+    return -((first_due - start) // step)  # ceil((start - first_due) / step)
+
+
+def count_occurrences(first_due, interval_hours, start, end):
+    """
+    Number of doses first_due + k*interval (k >= 0) with start <= dose <= end,
+    computed arithmetically. All times are datetimes; interval None = one dose.
+    """
+    if not interval_hours:
+        return 1 if start <= first_due <= end else 0
+    if end < first_due:
+        return 0
+    step = timedelta(hours=interval_hours)
+    first = _first_index(first_due, step, start)
+    last = (end - first_due) // step
+    return max(0, last - first + 1)
+
+
+def iter_occurrences(first_due, interval_hours, start, end):
+    """Lazily yield dose datetimes in [start, end], earliest first."""
+    if not interval_hours:
+        if start <= first_due <= end:
+            yield first_due
+        return
+    step = timedelta(hours=interval_hours)
+    current = first_due + step * _first_index(first_due, step, start)
+    while current <= end:
+        yield current
+        current += step
+
+
+def iter_upcoming_doses(pets, start, end):
+    """
+    Yield (dose_datetime, pet_name, med) for every medication of every pet
+    in [start, end], merged into one time-ordered stream. Nothing is
+    materialized, so wide horizons and hourly meds stay cheap.
+    """
+    streams = []
+    for pet_name, pet in pets.items():
+        for med in pet.get("medications", []):
+            first_due = timestamps.to_datetime(med.get("next_due"))
+            if first_due is None:
+                continue
+            occurrences = iter_occurrences(first_due, med_interval_hours(med), start, end)
+            streams.append(_tag(occurrences, len(streams), pet_name, med))
+    for due, _, pet_name, med in heapq.merge(*streams):
+        yield due, pet_name, med
+
+
+def _tag(occurrences, stream_id, pet_name, med):
+    # stream_id breaks ties so heapq.merge never compares med dicts
+    for due in occurrences:
+        yield due, stream_id, pet_name, med
+
+
+def print_reminder(pet_name, med, due_epoch):
+    """Default reminder sink: a line on the console."""
+    due_str = timestamps.from_epoch(due_epoch).strftime("%H:%M")
+    print("\n" + Colors.MAGENTA + f"🔔 Reminder: {pet_name}'s {med['medication']} ({med['dose']}) is due at {due_str}" + Colors.RESET)
+
+
+class MedicationScheduler:
+    def __init__(self, on_due=print_reminder):
+        self.on_due = on_due
+        self._heap = []          # (due_epoch, seq, key, pet_name, med)
+        self._live = {}          # key -> seq of its current heap entry
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+    @staticmethod
+    def _key(pet_name, med):
+        return (pet_name, id(med))
+
+    # --- QUEUE MAINTENANCE ---
+    def schedule(self, pet_name, med, due_epoch=None):
+        """(Re)queue a medication at `due_epoch` (defaults to its next_due)."""
+        if due_epoch is None:
+            due_epoch = timestamps.parse_epoch(med.get("next_due"))
+        key = self._key(pet_name, med)
+        with self._cond:
+            if due_epoch is None or not med.get("reminder_enabled"):
+                self._live.pop(key, None)
+                return
+            seq = next(self._seq)
+            self._live[key] = seq  # Any older heap entry for this key is now stale
+            heapq.heappush(self._heap, (due_epoch, seq, key, pet_name, med))
+            if self._heap[0][1] == seq:
+                self._cond.notify()  # New earliest dose — wake the sleeper
+
+    def remove(self, pet_name, med):
+        with self._cond:
+            self._live.pop(self._key(pet_name, med), None)
+
+    def rebuild(self, pets):
+        """Queue every medication of every pet (replaces the current queue)."""
+        with self._cond:
+            self._heap.clear()
+            self._live.clear()
+        for pet_name, pet in pets.items():
+            for med in pet.get("medications", []):
+                self.schedule(pet_name, med)
+
+    def _peek(self):
+        """Earliest live heap entry, discarding stale ones. Caller holds the lock."""
+        while self._heap:
+            entry = self._heap[0]
+            if self._live.get(entry[2]) == entry[1]:
+                return entry
+            heapq.heappop(self._heap)
+        return None
+
+    def __len__(self):
+        with self._cond:
+            return len(self._live)
+
+    def next_due(self):
+        """(due_epoch, pet_name, med) of the earliest queued dose, or None."""
+        with self._cond:
+            entry = self._peek()
+            return None if entry is None else (entry[0], entry[3], entry[4])
+
+    def pop_due(self, now_epoch):
+        """
+        Remove and return every dose due at or before `now_epoch` as
+        (due_epoch, pet_name, med). Recurring medications are re-queued for
+        their following dose so the reminder repeats until one is taken.
+        """
+        fired = []
+        with self._cond:
+            while True:
+                entry = self._peek()
+                if entry is None or entry[0] > now_epoch:
+                    break
+                due, seq, key, pet_name, med = heapq.heappop(self._heap)
+                del self._live[key]
+                fired.append((due, pet_name, med))
+        for due, pet_name, med in fired:
+            interval = med_interval_hours(med)
+            if interval:
+                following = due + interval * 3600
+                # Don't replay a backlog of old doses — jump to the next future one
+                if following <= now_epoch:
+                    following += ((now_epoch - following) // (interval * 3600) + 1) * interval * 3600
+                self.schedule(pet_name, med, following)
+        return fired
+
+    # --- BACKGROUND THREAD ---
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stopping:
+                    return
+                entry = self._peek()
+                delay = MAX_SLEEP_SECONDS if entry is None else entry[0] - timestamps.now_epoch()
+                if delay > 0:
+                    self._cond.wait(timeout=min(delay, MAX_SLEEP_SECONDS))
+                    continue
+            for due, pet_name, med in self.pop_due(timestamps.now_epoch()):
+                try:
+                    self.on_due(pet_name, med, due)
+                except Exception as e:
+                    print(Colors.RED + f"⚠️  Reminder failed: {e}" + Colors.RESET)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="pawcare-med-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+
+
+# --- SHARED SCHEDULER ---
+_scheduler = None
+
+
+def start_medication_scheduler(pets, on_due=print_reminder, run_thread=True):
+    """
+    Queue every medication in `pets` and start the reminder thread.
+    With run_thread=False the queue is only filled; the caller (e.g. the
+    asyncio reminder service) pops due doses itself.
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = MedicationScheduler(on_due)
+    _scheduler.rebuild(pets)
+    if run_thread:
+        _scheduler.start()
+    return _scheduler
+
+
+def get_scheduler():
+    """The running scheduler, or None if reminders weren't started."""
+    return _scheduler
+
+
+def reschedule_medication(pet_name, med):
+    """Tell the running scheduler (if any) that a medication changed."""
+    if _scheduler is not None:
+        _scheduler.schedule(pet_name, med)
+
+
+def unschedule_medication(pet_name, med):
+    if _scheduler is not None:
+        _scheduler.remove(pet_name, med)
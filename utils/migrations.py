@@ -0,0 +1,193 @@
+# utils/migrations.py
+"""
+Versioned schema for the stored pets, with one-time migrations.
+
+The store's metadata (the "_meta" block of pets.json, or the meta table
+of pets.db) records the schema version and when each migration ran:
+
+    "_meta": {"journal_seq": 12, "schema_version": 3, "migrations": [
+        {"version": 1, "name": "feeding_schedule_floats", "applied": "2026-10-16 23:10"}, ...]}
+
+migrate() runs right after loading. Data already at SCHEMA_VERSION is
+left untouched without being scanned, so the rest of the code can rely on
+the canonical schema instead of falling back to legacy field names:
+
+- feedings carry "time"; medications and weights carry "timestamp"
+- profiles use "calories_per_100g", "target_daily_calories" and
+  "feeding_reminders"
+- feeding_schedule is a list of floats (kcal per meal); meal clock
+  times live in "feeding_times"
+- every log entry lives in its pet's collections (the old global
+  data/logs.json is merged in and kept as logs.json.merged)
+
+To change the schema, append (version, name, function) to MIGRATIONS;
+the function fixes a pets dict in place. A migration that also touches
+files outside the store returns a callable for that step instead, which
+migrate() runs only once the migrated pets are saved.
+"""
+import json
+import os
+from datetime import datetime
+from utils import timestamps
+from utils.action_log import action_log
+
+LEGACY_LOGS_FILE = "data/logs.json"
+MERGED_LOGS_FILE = "data/logs.json.merged"  # What's left of it after the merge
+
+
+# --- MIGRATIONS ---
+def normalize_feeding_schedule(pets):
+    """
+    feeding_schedule items to floats (["250", "300"] -> [250.0, 300.0]).
+    "HH:MM" items (written by older editors) move to feeding_times; anything
+    else unparseable is dropped.
+    """
+    for pet in pets.values():
+        schedule = pet.get("feeding_schedule")
+        if not isinstance(schedule, list):
+            continue
+        cleaned, times = [], []
+        for item in schedule:
+            try:
+                cleaned.append(float(item))
+            except (ValueError, TypeError):
+                try:
+                    times.append(datetime.strptime(str(item).strip(), "%H:%M").strftime("%H:%M"))
+                except ValueError:
+                    continue  # Skip invalid entries
+        pet["feeding_schedule"] = cleaned
+        if times and not pet.get("feeding_times"):
+            pet["feeding_times"] = sorted(set(times))
+
+
+# (legacy name, canonical name, legacy value wins when both are set)
+_PROFILE_RENAMES = (
+    ("calorie_density", "calories_per_100g", False),
+    ("calorie_target", "target_daily_calories", False),
+    ("feeding_reminder_enabled", "feeding_reminders", True),  # Reminders used to prefer the legacy flag
+)
+# collection -> (canonical time field, legacy names it replaces)
+_TIME_RENAMES = {
+    "feedings": ("time", ("timestamp",)),
+    "medications": ("timestamp", ("time", "date")),
+    "weights": ("timestamp", ("time", "date")),
+}
+
+
+def _rename_time(entry, field, legacy_names):
+    for legacy in legacy_names:
+        if legacy in entry:
+            value = entry.pop(legacy)
+            if entry.get(field) is None:
+                entry[field] = value
+
+
+def canonical_field_names(pets):
+    """Rename legacy profile and log-entry fields to the canonical ones."""
+    for pet in pets.values():
+        for legacy, canonical, legacy_wins in _PROFILE_RENAMES:
+            if legacy in pet:
+                value = pet.pop(legacy)
+                if legacy_wins or pet.get(canonical) is None:
+                    pet[canonical] = value
+        for collection, (field, legacy_names) in _TIME_RENAMES.items():
+            for entry in pet.get(collection) or []:
+                _rename_time(entry, field, legacy_names)
+
+
+# collection -> fields that, with the time, identify a log entry
+_DEDUPE_FIELDS = {
+    "feedings": ("grams",),
+    "medications": ("medication", "dose"),
+    "weights": ("weight",),
+}
+
+
+def _entry_key(collection, field, entry):
+    return (timestamps.parse_epoch(entry.get(field)),) + tuple(entry.get(k) for k in _DEDUPE_FIELDS[collection])
+
+
+def _rename_merged_logs():
+    os.replace(LEGACY_LOGS_FILE, MERGED_LOGS_FILE)
+
+
+def merge_legacy_logs(pets):
+    """
+    Move data/logs.json (global feedings/medications/weights lists keyed by
+    "pet") into each pet's collections. Entries for unknown pets, or already
+    present, are left out; an unreadable file is left where it is.
+
+    Returns the step that renames it to logs.json.merged, to run once the
+    merged pets are saved (a crash before that just merges it again).
+    """
+    if not os.path.exists(LEGACY_LOGS_FILE):
+        return
+    try:
+        with open(LEGACY_LOGS_FILE, "r") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return
+    if not isinstance(data, dict):
+        return
+    for collection, (field, legacy_names) in _TIME_RENAMES.items():
+        touched = set()
+        seen = {}  # pet name -> keys of its entries, built on first use
+        for item in data.get(collection) or []:
+            if not isinstance(item, dict) or item.get("pet") not in pets:
+                continue
+            entry = {k: v for k, v in item.items() if k != "pet"}
+            _rename_time(entry, field, legacy_names)
+            when = timestamps.to_datetime(entry.get(field))
+            if when is not None:
+                entry[field] = when.strftime("%Y-%m-%d %H:%M")  # e.g. from ISO "2026-02-20T19:39:45.679699"
+            history = pets[item["pet"]].setdefault(collection, [])
+            keys = seen.get(item["pet"])
+            if keys is None:
+                keys = seen[item["pet"]] = {_entry_key(collection, field, e) for e in history}
+            key = _entry_key(collection, field, entry)
+            if key not in keys:
+                keys.add(key)
+                history.append(entry)
+                touched.add(item["pet"])
+        for pet_name in touched:
+            # Stable sort: entries merged in land at their place on the timeline
+            pets[pet_name][collection].sort(key=lambda e: timestamps.parse_epoch(e.get(field)) or 0)
+    return _rename_merged_logs
+
+
+MIGRATIONS = (
+    (1, "feeding_schedule_floats", normalize_feeding_schedule),
+    (2, "canonical_field_names", canonical_field_names),
+    (3, "merge_legacy_logs", merge_legacy_logs),
+)
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+# --- RUNNER ---
+def migrate(store, pets):
+    """
+    Bring freshly loaded pets up to SCHEMA_VERSION in place, record the
+    migrations in the store's metadata and save, then run the migrations'
+    post-save steps. Returns the versions applied (empty on a normal startup).
+    """
+    meta = store.load_meta()
+    version = meta.get("schema_version", 0)
+    if version >= SCHEMA_VERSION:
+        return []
+    applied = list(meta.get("migrations", []))
+    stamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+    done, after_save = [], []
+    for number, name, fn in MIGRATIONS:
+        if number <= version:
+            continue
+        step = fn(pets)
+        if step is not None:
+            after_save.append(step)
+        applied.append({"version": number, "name": name, "applied": stamp})
+        done.append(number)
+        action_log.record("migrate", f"Upgraded data to schema v{number} ({name})")
+    # Pets and meta in one write: a crash can't record the new version over unmigrated rows
+    store.save_pets(pets, {**meta, "schema_version": SCHEMA_VERSION, "migrations": applied})
+    for step in after_save:
+        step()
+    return done
@@ -28,8 +28,8 @@ def _validate_and_clean_times(times_list):
 def edit_pet(pet):
     """
     Edit a single pet dictionary safely.
-    Allows editing: name, weight, calorie_target,
-    calorie_density, feeding_schedule, medication_times,
+    Allows editing: name, weight, target_daily_calories,
+    calories_per_100g, feeding_times, medication_times,
     and individual reminder toggles.
     """
 
@@ -61,7 +61,7 @@ def edit_pet(pet):
 
     # --- Daily calorie target ---
     while True:
-        new_cal = input(f"Daily calorie target [{pet['calorie_target']}]: ").strip()
+        new_cal = input(f"Daily calorie target [{pet.get('target_daily_calories')}]: ").strip()
         if not new_cal:
             break
         try:
@@ -69,15 +69,15 @@ def edit_pet(pet):
             if new_cal_val <= 0:
                 print("⚠️ Must be positive.")
                 continue
-            if new_cal_val != pet['calorie_target']:
-                changes['calorie_target'] = (pet['calorie_target'], new_cal_val)
+            if new_cal_val != pet.get('target_daily_calories'):
+                changes['target_daily_calories'] = (pet.get('target_daily_calories'), new_cal_val)
             break
         except ValueError:
             print("⚠️ Invalid number. Try again.")
 
     # --- Calorie density per 100g ---
     while True:
-        new_density = input(f"Calorie density per 100g [{pet['calorie_density']}]: ").strip()
+        new_density = input(f"Calorie density per 100g [{pet.get('calories_per_100g')}]: ").strip()
         if not new_density:
             break
         try:
@@ -85,8 +85,8 @@ def edit_pet(pet):
             if new_density_val <= 0:
                 print("⚠️ Must be positive.")
                 continue
-            if new_density_val != pet['calorie_density']:
-                changes['calorie_density'] = (pet['calorie_density'], new_density_val)
+            if new_density_val != pet.get('calories_per_100g'):
+                changes['calories_per_100g'] = (pet.get('calories_per_100g'), new_density_val)
             break
         except ValueError:
             print("⚠️ Invalid number. Try again.")
@@ -95,7 +95,7 @@ def edit_pet(pet):
     edit_schedule = input("\nDo you want to edit feeding times? (yes/no): ").strip().lower()
 
     if edit_schedule in ['yes', 'y']:
-        schedule = pet.get("feeding_schedule", [])
+        schedule = pet.get("feeding_times", [])
         print("Current feeding times (24h format):", schedule if schedule else "None")
 
         new_times = input(
@@ -108,7 +108,7 @@ def edit_pet(pet):
 
             if cleaned_times:
                 if cleaned_times != schedule:
-                    changes['feeding_schedule'] = (schedule, cleaned_times)
+                    changes['feeding_times'] = (schedule, cleaned_times)
             else:
                 print("⚠️ No valid times entered. Schedule unchanged.")
 
@@ -134,12 +134,12 @@ def edit_pet(pet):
                 print("⚠️ No valid times entered. Medication schedule unchanged.")
 
     # --- FEEDING REMINDER ---
-    current_feed_reminder = pet.get("feeding_reminder_enabled", True)
+    current_feed_reminder = pet.get("feeding_reminders", False)
     feed_reminder_input = input(f"Enable feeding reminders? [{'Yes' if current_feed_reminder else 'No'}]: ").strip().lower()
     if feed_reminder_input in ["yes", "y"]:
-        changes['feeding_reminder_enabled'] = (current_feed_reminder, True)
+        changes['feeding_reminders'] = (current_feed_reminder, True)
     elif feed_reminder_input in ["no", "n"]:
-        changes['feeding_reminder_enabled'] = (current_feed_reminder, False)
+        changes['feeding_reminders'] = (current_feed_reminder, False)
     # Else: keep current
 
     # --- MEDICATION REMINDER ---
@@ -190,6 +190,6 @@ def edit_pet(pet):
 
     for field, (_, new_val) in changes.items():
         pet[field] = new_val
-        log_action(f"Updated {field} for {pet['name']} to {new_val}")
+        log_action(f"Updated {field} for {pet['name']} to {new_val}", pet=pet['name'], field=field)
 
     print(f"\n✅ {pet['name']}'s details updated successfully!\n")
\ No newline at end of file
@@ -1,26 +1,9 @@
 # utils/pet_manager.py
-import json
-import os
 from utils.colors import Colors
-
-PETS_FILE = "data/pets.json"
-
-def load_pets() -> dict:
-    """Load pets from JSON file. Return empty dict if file doesn't exist or is invalid."""
-    if not os.path.exists(PETS_FILE):
-        return {}
-    try:
-        with open(PETS_FILE, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, Exception):
-        print(Colors.RED + "⚠️  Corrupted pets data. Starting fresh." + Colors.RESET)
-        return {}
-
-def save_pets(pets: dict) -> None:
-    """Save pets to JSON file. Create directory if needed."""
-    os.makedirs("data", exist_ok=True)
-    with open(PETS_FILE, "w") as f:
-        json.dump(pets, f, indent=2)
+from utils.calorie_calculator import backfill_calories
+from utils.feeding_index import feeding_index
+from utils.logging_utils import log_action
+from utils.repository import repository, load_pets, save_pets  # Re-exported for main.py
 
 def add_pet(pets: dict) -> None:
     """Interactive pet addition via console prompts."""
@@ -57,6 +40,7 @@ def add_pet(pets: dict) -> None:
         "medications": [],
         "weights": []
     }
+    log_action(f"Added pet {name}", pet=name, action="add_pet", species=species)
 
     print(Colors.GREEN + f"✅ Pet '{name}' added successfully!" + Colors.RESET)
 
@@ -84,6 +68,7 @@ def edit_pet(pets: dict) -> None:
         return
 
     pet = pets[pet_name]
+    before = {k: v for k, v in pet.items() if k not in ("feedings", "medications", "weights")}
     print(f"\nEditing: {pet_name}")
     print(f"Current: {pet}")
 
@@ -92,9 +77,25 @@ def edit_pet(pets: dict) -> None:
     pet["birth_year"] = input(f"Birth year (current: {pet['birth_year']}): ").strip() or pet["birth_year"]
     pet["color"] = input(f"Color (current: {pet['color']}): ").strip() or pet["color"]
 
+    old_density = pet["calories_per_100g"]
     cal_input = input(f"Calories per 100g (current: {pet['calories_per_100g']}): ").strip()
     pet["calories_per_100g"] = float(cal_input) if cal_input else pet["calories_per_100g"]
 
+    if pet["calories_per_100g"] and pet.get("feedings"):
+        if pet["calories_per_100g"] != old_density:
+            recalc = input("Recalculate calories for all past feedings with the new value? (y/N): ").strip().lower()
+            updated = backfill_calories(pet, recompute=(recalc == 'y'))
+        else:
+            updated = backfill_calories(pet)  # Fill in any feedings logged without calories
+        if updated:
+            feeding_index.reindex_pet(pet_name, pet["feedings"])
+            repository.mark_dirty(pet_name, "feedings")
+            print(Colors.CYAN + f"💡 Updated calories on {updated} feeding(s)." + Colors.RESET)
+
+    changed = {k: [old, pet[k]] for k, old in before.items() if pet.get(k) != old}
+    if changed:
+        log_action(f"Edited {pet_name}: {', '.join(changed)}", pet=pet_name, action="edit_pet", changes=changed)
+
     print(Colors.GREEN + "✅ Pet updated!" + Colors.RESET)
 
 def remove_pet(pets: dict) -> None:
@@ -126,4 +127,5 @@ def remove_pet(pets: dict) -> None:
         return
 
     del pets[pet_name]
+    log_action(f"Removed pet {pet_name}", pet=pet_name, action="remove_pet")
     print(Colors.GREEN + f"✅ Pet '{pet_name}' and all data removed." + Colors.RESET)
\ No newline at end of file
@@ -0,0 +1,283 @@
+# utils/reminders.py
+"""
+Asyncio reminder service for feedings and medications.
+
+One event loop watches every pet:
+
+- medications come from the shared MedicationScheduler heap (so the
+  medication menu's reschedule/unschedule calls still apply)
+- feeding times sit in a second heap, one entry per pet and meal time,
+  re-read from the pets every RESYNC_SECONDS
+
+The loop sleeps until the earliest due reminder (at most TICK_SECONDS),
+drops reminders that fall in a pet's quiet hours or snooze (compiled
+windows, see utils/suppression.py), and hands the
+rest to the sinks. At most `concurrency` notifications are in flight at a
+time, so a slow sink or thousands of pets due at once never stall the loop.
+
+Runs in a background thread next to the menu (start_reminder_service) or
+standalone: `python main.py remind`.
+"""
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import threading
+from datetime import timedelta
+from utils import timestamps
+from utils.colors import Colors
+from utils.medication_scheduler import start_medication_scheduler
+from utils.suppression import SuppressionIndex
+
+TICK_SECONDS = 30          # Longest sleep (new medications are noticed within this)
+RESYNC_SECONDS = 300       # Feeding times are re-read from the pets this often
+MAX_CONCURRENT_SENDS = int(os.environ.get("PAWCARE_REMINDER_CONCURRENCY", "32"))
+SINK_TIMEOUT_SECONDS = 5
+YIELD_EVERY = 500          # Pets/reminders processed between yields to the event loop
+REMINDER_LOG_FILE = "data/reminders.log"
+DEFAULT_SINKS = os.environ.get("PAWCARE_REMINDER_SINKS", "console")
+MEAL_WINDOW = ("08:00", "20:00")  # Meals without feeding_times are spread across this span
+
+
+# --- PET SETTINGS ---
+def feeding_reminders_enabled(pet):
+    return pet.get("feeding_reminders", False)
+
+
+def feeding_times(pet):
+    """
+    Meal times (minutes after midnight) to remind about: the pet's
+    feeding_times if set, else its feeding_schedule meals spread evenly
+    across MEAL_WINDOW.
+    """
+    times = [m for m in map(timestamps.minute_of_day, pet.get("feeding_times") or []) if m is not None]
+    if times:
+        return sorted(set(times))
+    meals = len(pet.get("feeding_schedule") or [])
+    if not meals:
+        return []
+    first, last = timestamps.minute_of_day(MEAL_WINDOW[0]), timestamps.minute_of_day(MEAL_WINDOW[1])
+    if meals == 1:
+        return [first]
+    return [first + round(i * (last - first) / (meals - 1)) for i in range(meals)]
+
+
+def _next_at(minute_of_day, after_epoch):
+    """Epoch of the first minute_of_day strictly after `after_epoch`."""
+    day = timestamps.from_epoch(after_epoch).replace(hour=0, minute=0, second=0, microsecond=0)
+    due = timestamps.to_epoch(day + timedelta(minutes=minute_of_day))
+    return due if due > after_epoch else due + 86400
+
+
+# --- SINKS ---
+class ConsoleSink:
+    async def send(self, note):
+        print("\n" + Colors.MAGENTA + f"🔔 Reminder: {note['message']}" + Colors.RESET)
+
+
+class FileSink:
+    """Appends each notification to a JSON-lines file."""
+
+    def __init__(self, path=REMINDER_LOG_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _write(self, note):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(note) + "\n")
+
+    async def send(self, note):
+        await asyncio.to_thread(self._write, note)
+
+
+class WebhookSink:
+    """POSTs each notification as JSON to a local HTTP endpoint (stand-in for a push service)."""
+
+    def __init__(self, url, timeout=SINK_TIMEOUT_SECONDS):
+        self.url = url
+        self.timeout = timeout
+
+    def _post(self, note):
+        import urllib.request  # Only needed when a webhook is configured
+        request = urllib.request.Request(self.url, data=json.dumps(note).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    async def send(self, note):
+        await asyncio.to_thread(self._post, note)
+
+
+def make_sinks(spec=DEFAULT_SINKS):
+    """
+    Build sinks from a comma-separated spec, e.g.
+    "console,file,webhook=http://127.0.0.1:8765/reminders" (file=PATH also works).
+    """
+    sinks = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, value = part.partition("=")
+        if name == "console":
+            sinks.append(ConsoleSink())
+        elif name == "file":
+            sinks.append(FileSink(value or REMINDER_LOG_FILE))
+        elif name == "webhook" and value:
+            sinks.append(WebhookSink(value))
+        else:
+            raise ValueError(f"Unknown reminder sink: {part}")
+    return sinks
+
+
+# --- SERVICE ---
+class ReminderService:
+    def __init__(self, pets, sinks=None, concurrency=MAX_CONCURRENT_SENDS):
+        self.pets = pets
+        self.sinks = sinks if sinks is not None else [ConsoleSink()]
+        self.concurrency = max(1, concurrency)
+        self.stats = {"sent": 0, "suppressed": 0, "failed": 0}
+        self._meds = start_medication_scheduler(pets, run_thread=False)
+        self._feedings = []       # (due_epoch, seq, pet_name, minute_of_day)
+        self._suppression = SuppressionIndex()
+        self._seq = itertools.count()
+        self._checked_until = None
+        self._synced_at = None
+        self._resync_requested = False
+        self._loop = None
+        self._stop = None
+
+    def retarget(self, pets):
+        """Watch a different pets dict (e.g. after a reload). Safe from any thread."""
+        self._meds.rebuild(pets)
+        self.pets = pets
+        self._resync_requested = True
+
+    # --- DUE REMINDERS ---
+    async def _resync(self, now):
+        """Rebuild the feeding heap from the pets' current settings."""
+        heap = []
+        for i, (pet_name, pet) in enumerate(list(self.pets.items())):
+            if i and i % YIELD_EVERY == 0:
+                await asyncio.sleep(0)
+            if not feeding_reminders_enabled(pet):
+                continue
+            for minute in feeding_times(pet):
+                heap.append((_next_at(minute, self._checked_until), next(self._seq), pet_name, minute))
+        heapq.heapify(heap)
+        self._feedings = heap
+        self._suppression.forget()  # Drops removed pets; the rest recompile on next use
+        self._synced_at = now
+        self._resync_requested = False
+
+    async def _due(self, now):
+        """Notifications due in (checked_until, now], suppressed ones left out."""
+        notes = []
+        for due, pet_name, med in self._meds.pop_due(now):
+            pet = self.pets.get(pet_name)
+            if pet is None or not pet.get("medication_reminder_enabled", True):
+                continue
+            due_str = timestamps.from_epoch(due).strftime("%H:%M")
+            notes.append((pet, due, {"kind": "medication", "pet": pet_name,
+                                     "due": timestamps.from_epoch(due).strftime("%Y-%m-%d %H:%M"),
+                                     "message": f"{pet_name}'s {med['medication']} ({med['dose']}) is due at {due_str}"}))
+        while self._feedings and self._feedings[0][0] <= now:
+            due, _, pet_name, minute = self._feedings[0]
+            heapq.heapreplace(self._feedings, (due + 86400, next(self._seq), pet_name, minute))
+            pet = self.pets.get(pet_name)
+            if pet is None or not feeding_reminders_enabled(pet):
+                continue
+            due_dt = timestamps.from_epoch(due)
+            notes.append((pet, due, {"kind": "feeding", "pet": pet_name,
+                                     "due": due_dt.strftime("%Y-%m-%d %H:%M"),
+                                     "message": f"Time to feed {pet_name} ({due_dt.strftime('%H:%M')})"}))
+
+        sendable = []
+        for i, (pet, due, note) in enumerate(notes):
+            if i and i % YIELD_EVERY == 0:
+                await asyncio.sleep(0)
+            if self._suppression.is_suppressed(note["pet"], pet, due):
+                self.stats["suppressed"] += 1
+            else:
+                sendable.append(note)
+        return sendable
+
+    def _next_wake(self, now):
+        candidates = [now + TICK_SECONDS]
+        upcoming = self._meds.next_due()
+        if upcoming is not None:
+            candidates.append(upcoming[0])
+        if self._feedings:
+            candidates.append(self._feedings[0][0])
+        return min(candidates)
+
+    # --- DELIVERY ---
+    async def _deliver(self, note, semaphore):
+        try:
+            for sink in self.sinks:
+                try:
+                    await asyncio.wait_for(sink.send(note), SINK_TIMEOUT_SECONDS)
+                    self.stats["sent"] += 1
+                except Exception as e:
+                    self.stats["failed"] += 1
+                    print(Colors.RED + f"⚠️  Reminder sink {type(sink).__name__} failed: {e}" + Colors.RESET)
+        finally:
+            semaphore.release()
+
+    async def run(self):
+        """Send reminders until stop() is called."""
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        in_flight = set()
+        self._checked_until = timestamps.now_epoch()
+        await self._resync(self._checked_until)
+
+        while not self._stop.is_set():
+            now = timestamps.now_epoch()
+            if self._resync_requested or now - self._synced_at >= RESYNC_SECONDS:
+                await self._resync(now)
+            for note in await self._due(now):
+                await semaphore.acquire()  # Back-pressure: wait while `concurrency` sends are running
+                task = asyncio.create_task(self._deliver(note, semaphore))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            self._checked_until = now
+            delay = self._next_wake(now) - timestamps.now_epoch()
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=max(0.05, delay))
+            except asyncio.TimeoutError:
+                pass
+        if in_flight:
+            await asyncio.gather(*in_flight)
+
+    def stop(self):
+        """Ask run() to finish (safe from any thread)."""
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+
+# --- SHARED SERVICE ---
+_service = None
+_service_lock = threading.Lock()
+
+
+def start_reminder_service(pets, sinks=None):
+    """
+    Run the reminder service in a background thread (one per process).
+    Calling it again with another pets dict just retargets the running service.
+    """
+    global _service
+    with _service_lock:
+        if _service is not None:
+            _service.retarget(pets)
+            return _service
+        _service = ReminderService(pets, sinks if sinks is not None else make_sinks())
+        threading.Thread(target=asyncio.run, args=(_service.run(),),
+                         name="pawcare-reminders", daemon=True).start()
+        return _service
+
+
+def get_reminder_service():
+    """The running service, or None if reminders weren't started."""
+    return _service
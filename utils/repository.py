@@ -0,0 +1,202 @@
+# utils/repository.py
+"""
+One shared in-memory copy of the pets and the user preferences.
+
+Modules load and save through `repository` instead of keeping their own
+copies:
+
+- pets are loaded once; save() writes only what changed since the last
+  load/save — added or removed pets, and for edited pets only the edited
+  parts (profile, feedings, medications, weights)
+- user_prefs.json is read once and then served from memory
+
+Edits are found by comparing cheap fingerprints on save, so saving costs
+the same however long the histories are:
+
+- profile: the whole profile (it's small)
+- medications: every medication, with its dose_history reduced to its
+  length and last record (history is only ever appended to)
+- feedings, weights: the length and the last entry
+
+So entries added, removed or changed at the end are always picked up.
+Edits further back in feedings or weights (e.g. recalculating calories)
+must be flagged with mark_dirty(). New log entries need neither:
+append_log_entry writes them to the store and calls mark_stored().
+"""
+import json
+import os
+import pickle
+import threading
+from utils.journal import COLLECTIONS, write_json_atomic
+from utils.instrumentation import timed
+from utils import storage, timestamps
+
+USER_PREFS_FILE = "data/user_prefs.json"
+DEFAULT_PREFS = {"unit": "kg"}
+
+# Parts of a pet compared by fingerprint on every save
+_FINGERPRINTED = ("profile",) + COLLECTIONS
+
+
+def _hash(data):
+    # pickle is the fastest exact serializer; at worst it sees a change where
+    # there is none (e.g. reordered keys), which only costs an extra write
+    return hash(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+
+
+def _without_history(med):
+    doses = med.get("dose_history")
+    return {**med, "dose_history": (len(doses), doses[-1])} if doses else med
+
+
+def _fingerprint(pet, part):
+    if part == "profile":
+        return _hash({k: v for k, v in pet.items() if k not in COLLECTIONS})
+    history = pet.get(part) or []
+    if part == "medications":
+        return _hash(list(map(_without_history, history)))
+    return len(history), _hash(history[-1]) if len(history) else None
+
+
+class PetRepository:
+    def __init__(self, prefs_file=USER_PREFS_FILE):
+        self.prefs_file = prefs_file
+        self._pets = None
+        self._order = []          # Pet names in stored order
+        self._fingerprints = {}   # pet name -> {part: fingerprint} as last stored
+        self._dirty = {}          # pet name -> parts flagged with mark_dirty()
+        self._prefs = None
+        self._lock = threading.RLock()
+        self.generation = 0       # Bumped on load/reset, mark_dirty() and saves that wrote something
+
+    # --- PETS ---
+    @property
+    def pets(self):
+        """The shared pets dict (loaded on first use)."""
+        with self._lock:
+            if self._pets is None:
+                self.load()
+            return self._pets
+
+    @timed("load_pets")
+    def load(self):
+        """(Re)read pets from the store; this becomes the shared dict."""
+        with self._lock:
+            self._adopt(storage.load_pets())
+            return self._pets
+
+    def _adopt(self, pets):
+        self.generation += 1
+        self._pets = pets
+        self._order = list(pets)
+        self._fingerprints = {name: {part: _fingerprint(pet, part) for part in _FINGERPRINTED}
+                              for name, pet in pets.items()}
+        self._dirty = {}
+
+    def mark_dirty(self, pet_name, *parts):
+        """Flag parts of a pet (default: the whole pet) to be written on the next save()."""
+        with self._lock:
+            self._dirty.setdefault(pet_name, set()).update(parts or ("profile",) + COLLECTIONS)
+            self.generation += 1  # Edited in place: indexes over it must rebuild
+
+    def mark_stored(self, pet_name, *parts):
+        """Parts of a pet already written straight to the store (e.g. appended log entries)."""
+        with self._lock:
+            stored = self._fingerprints.get(pet_name)
+            if stored is not None and self._pets is not None and pet_name in self._pets:
+                pet = self._pets[pet_name]
+                stored.update((part, _fingerprint(pet, part)) for part in parts)
+
+    def changes(self):
+        """{pet name: parts to write, or None if removed} since the last load/save."""
+        with self._lock:
+            pets = self._pets or {}
+            changes = {name: None for name in self._order if name not in pets}
+            for name, pet in pets.items():
+                stored = self._fingerprints.get(name)
+                if stored is None:
+                    changes[name] = ("profile",) + COLLECTIONS  # New pet
+                    continue
+                parts = set(self._dirty.get(name, ()))
+                parts.update(part for part in _FINGERPRINTED if _fingerprint(pet, part) != stored[part])
+                if parts:
+                    changes[name] = tuple(sorted(parts))
+            return changes
+
+    @timed("save_pets")
+    def save(self, pets=None):
+        """
+        Write what changed. A different dict than the shared one (or pets
+        reordered, e.g. by a rename) is saved in full and becomes the shared dict.
+        """
+        with self._lock:
+            if pets is not None and pets is not self._pets:
+                storage.save_pets(pets)
+                self._adopt(pets)
+                return
+            if self._pets is None:
+                return
+            changes = self.changes()
+            if not changes:
+                return
+            kept = [name for name in self._order if name in self._pets]
+            expected = kept + [name for name in self._pets if name not in self._fingerprints]
+            if list(self._pets) != expected:
+                storage.save_pets(self._pets)
+                self._adopt(self._pets)
+                return
+            storage.get_store().save_changes(self._pets, changes)
+            self.generation += 1
+            for name, parts in changes.items():
+                if parts is None:
+                    self._fingerprints.pop(name, None)
+                else:
+                    pet = self._pets[name]
+                    self._fingerprints[name] = {part: _fingerprint(pet, part) for part in _FINGERPRINTED}
+            self._order = list(self._pets)
+            self._dirty = {}
+
+    def reset(self):
+        """Delete all stored pets and prefs, and forget the in-memory copies."""
+        with self._lock:
+            storage.get_store().reset()
+            if os.path.exists(self.prefs_file):
+                os.remove(self.prefs_file)
+            self._pets = None
+            self.generation += 1
+            self._order, self._fingerprints, self._dirty = [], {}, {}
+            self._prefs = None
+            timestamps.clear_cache()  # None of the old timestamps will be asked for again
+
+    # --- PREFERENCES ---
+    def prefs(self):
+        """User preferences, read from disk only the first time."""
+        with self._lock:
+            if self._prefs is None:
+                self._prefs = dict(DEFAULT_PREFS)
+                if os.path.exists(self.prefs_file):
+                    try:
+                        with open(self.prefs_file, "r") as f:
+                            self._prefs = json.load(f)
+                    except json.JSONDecodeError:
+                        pass
+            return dict(self._prefs)
+
+    def save_prefs(self, prefs):
+        with self._lock:
+            write_json_atomic(self.prefs_file, prefs)
+            self._prefs = dict(prefs)
+
+
+# Shared repository used by every module
+repository = PetRepository()
+
+
+def load_pets() -> dict:
+    """Load pets from the store into the shared repository and return them."""
+    return repository.load()
+
+
+def save_pets(pets: dict) -> None:
+    """Save pets through the shared repository (only changed parts are written)."""
+    repository.save(pets)
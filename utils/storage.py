@@ -0,0 +1,408 @@
+# utils/storage.py
+"""
+Pluggable storage for pets and their logs.
+
+Every module loads and saves pets through get_store(), so the backend can be
+switched in one place:
+
+- "json"   (default) data/pets.json snapshot + append-only journal
+- "sqlite" data/pets.db with one indexed table per log type
+
+Pick the backend with the PAWCARE_STORAGE environment variable. Durability
+follows PAWCARE_FSYNC on both backends (see utils/journal.py); on SQLite
+"group" means WAL with synchronous=NORMAL, "off" means synchronous=OFF.
+"""
+import json
+import os
+import sys
+from utils.colors import Colors
+from utils.journal import PetJournal, SNAPSHOT_FILE, JOURNAL_FILE, COLLECTIONS, FSYNC_MODE
+from utils.columnar import COMPACT_HISTORY, compact_pets
+from utils.migrations import migrate
+
+STORAGE_BACKEND = os.environ.get("PAWCARE_STORAGE", "json").lower()
+DB_FILE = "data/pets.db"
+
+# Field holding each log entry's time, per collection (see journal.COLLECTIONS)
+TIME_FIELDS = {"feedings": "time", "medications": "timestamp", "weights": "timestamp"}
+
+
+class PetStore:
+    """Interface shared by all storage backends."""
+
+    def load_pets(self) -> dict:
+        """Return the full pets dict."""
+        raise NotImplementedError
+
+    def save_pets(self, pets: dict, meta: dict = None) -> None:
+        """Persist the full pets dict, and the bookkeeping too if given, in one write."""
+        raise NotImplementedError
+
+    def load_meta(self) -> dict:
+        """Bookkeeping stored with the pets (schema version, applied migrations)."""
+        raise NotImplementedError
+
+    def save_meta(self, meta: dict) -> None:
+        """Replace the stored bookkeeping (may only be written by the next save_pets)."""
+        raise NotImplementedError
+
+    def save_changes(self, pets: dict, changes: dict) -> None:
+        """
+        Persist only what changed. `changes` maps pet name -> parts to write
+        ("profile" and/or collection names), or None for a removed pet.
+        Backends without partial writes fall back to a full save.
+        """
+        self.save_pets(pets)
+
+    def append_entry(self, pet_name, collection, entry) -> None:
+        """Persist one new log entry for a pet."""
+        raise NotImplementedError
+
+    def append_entries(self, items) -> None:
+        """Persist many (pet_name, collection, entry) items in one write."""
+        for pet_name, collection, entry in items:
+            self.append_entry(pet_name, collection, entry)
+
+    def iter_entries(self, pet_name, collection, start=None, end=None):
+        """
+        Yield a pet's log entries with start <= time < end.
+        `start`/`end` are timestamp strings (e.g. "2026-02-20"), compared as text.
+        """
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        """Delete all stored pets and logs."""
+        raise NotImplementedError
+
+
+def _in_range(time_str, start, end):
+    if start is not None and (time_str is None or time_str < start):
+        return False
+    if end is not None and (time_str is None or time_str >= end):
+        return False
+    return True
+
+
+# --- JSON BACKEND ---
+class JsonPetStore(PetStore):
+    """pets.json snapshot plus append-only journal (see utils/journal.py)."""
+
+    def __init__(self, snapshot_file=SNAPSHOT_FILE, journal_file=JOURNAL_FILE):
+        self.journal = PetJournal(snapshot_file, journal_file)
+        self._loaded = (None, None)  # (journal version, pets) read by the last iter_entries
+
+    def _current(self):
+        """Stored pets, re-read only after something was written since the last read."""
+        version, pets = self._loaded
+        if version != self.journal.version:
+            pets = self.journal.load()
+            self._loaded = (self.journal.version, pets)
+        return pets
+
+    def load_pets(self):
+        return self.journal.load()
+
+    def save_pets(self, pets, meta=None):
+        if meta is not None:
+            self.journal.meta = dict(meta)  # Goes into the same snapshot
+        self.journal.save(pets)
+
+    def load_meta(self):
+        return dict(self.journal.meta)  # Read by load_pets() from the snapshot's _meta
+
+    def save_meta(self, meta):
+        self.journal.meta = dict(meta)  # Written with the next snapshot
+
+    def save_changes(self, pets, changes):
+        self.journal.write_changes(pets, changes)
+
+    def append_entry(self, pet_name, collection, entry):
+        self.journal.append(pet_name, collection, entry)
+
+    def append_entries(self, items):
+        self.journal.append_many(items)
+
+    def iter_entries(self, pet_name, collection, start=None, end=None):
+        pet = self._current().get(pet_name, {})
+        field = TIME_FIELDS[collection]
+        for entry in pet.get(collection, []):
+            if _in_range(entry.get(field), start, end):
+                yield entry
+
+    def reset(self):
+        self.journal.reset()
+
+
+# --- SQLITE BACKEND ---
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pets (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    profile TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS feedings (
+    id INTEGER PRIMARY KEY,
+    pet TEXT NOT NULL,
+    time TEXT,
+    food_name TEXT,
+    grams REAL,
+    calories REAL,
+    notes TEXT,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS weights (
+    id INTEGER PRIMARY KEY,
+    pet TEXT NOT NULL,
+    timestamp TEXT,
+    weight REAL,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS medications (
+    id INTEGER PRIMARY KEY,
+    pet TEXT NOT NULL,
+    timestamp TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_feedings_pet_time ON feedings (pet, time);
+CREATE INDEX IF NOT EXISTS idx_weights_pet_time ON weights (pet, timestamp);
+CREATE INDEX IF NOT EXISTS idx_medications_pet_time ON medications (pet, timestamp);
+"""
+
+# PRAGMAs applied per PAWCARE_FSYNC mode ("always" keeps SQLite's FULL default)
+_SQLITE_SYNC_PRAGMAS = {
+    "group": ("PRAGMA journal_mode=WAL", "PRAGMA synchronous=NORMAL"),
+    "off": ("PRAGMA synchronous=OFF",),
+}
+
+# Columns stored natively for feedings/weights; anything else goes in "extra"
+_FEEDING_COLUMNS = ("food_name", "grams", "calories", "time", "notes")
+_WEIGHT_COLUMNS = ("timestamp", "weight")
+
+
+class SqlitePetStore(PetStore):
+    """
+    SQLite database with indexed per-log-type tables.
+    Appending an entry is a single-row INSERT, and range queries only read
+    the matching rows.
+    """
+
+    def __init__(self, db_file=DB_FILE, import_from=SNAPSHOT_FILE):
+        self.db_file = db_file
+        self.import_from = import_from
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            is_new = not os.path.exists(self.db_file)
+            os.makedirs(os.path.dirname(self.db_file) or ".", exist_ok=True)
+            import sqlite3  # Only paid for when the SQLite backend is used
+            self._conn = sqlite3.connect(self.db_file)
+            for pragma in _SQLITE_SYNC_PRAGMAS.get(FSYNC_MODE, ()):
+                self._conn.execute(pragma)
+            self._conn.executescript(_SQLITE_SCHEMA)
+            if is_new and self.import_from and os.path.exists(self.import_from):
+                # First run on SQLite: bring existing JSON data across once
+                json_store = JsonPetStore(self.import_from)
+                pets = json_store.load_pets()
+                self.save_pets(pets, json_store.load_meta())
+        return self._conn
+
+    # --- row <-> entry conversion ---
+    @staticmethod
+    def _split(entry, columns):
+        values = [entry.get(col) for col in columns]
+        extra = {k: v for k, v in entry.items() if k not in columns}
+        return values, (json.dumps(extra) if extra else None)
+
+    @staticmethod
+    def _join(columns, values, extra):
+        entry = dict(zip(columns, values))
+        if extra:
+            entry.update(json.loads(extra))
+        return entry
+
+    def _insert(self, conn, pet_name, collection, entry):
+        if collection == "feedings":
+            values, extra = self._split(entry, _FEEDING_COLUMNS)
+            conn.execute(
+                "INSERT INTO feedings (pet, food_name, grams, calories, time, notes, extra) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (pet_name, *values, extra),
+            )
+        elif collection == "weights":
+            values, extra = self._split(entry, _WEIGHT_COLUMNS)
+            conn.execute(
+                "INSERT INTO weights (pet, timestamp, weight, extra) VALUES (?, ?, ?, ?)",
+                (pet_name, *values, extra),
+            )
+        elif collection == "medications":
+            conn.execute(
+                "INSERT INTO medications (pet, timestamp, data) VALUES (?, ?, ?)",
+                (pet_name, entry.get("timestamp"), json.dumps(entry)),
+            )
+        else:
+            raise ValueError(f"Unknown collection: {collection}")
+
+    def _rows(self, conn, pet_name, collection, start=None, end=None):
+        field = TIME_FIELDS[collection]
+        if collection == "feedings":
+            select = "SELECT food_name, grams, calories, time, notes, extra FROM feedings"
+            to_entry = lambda row: self._join(_FEEDING_COLUMNS, row[:-1], row[-1])
+        elif collection == "weights":
+            select = "SELECT timestamp, weight, extra FROM weights"
+            to_entry = lambda row: self._join(_WEIGHT_COLUMNS, row[:-1], row[-1])
+        else:
+            select = "SELECT data FROM medications"
+            to_entry = lambda row: json.loads(row[0])
+
+        clauses, params = ["pet = ?"], [pet_name]
+        if start is not None:
+            clauses.append(f"{field} >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append(f"{field} < ?")
+            params.append(end)
+        order = f"{field}, id" if (start is not None or end is not None) else "id"
+        query = f"{select} WHERE {' AND '.join(clauses)} ORDER BY {order}"
+        for row in conn.execute(query, params):
+            yield to_entry(row)
+
+    # --- PetStore API ---
+    def load_pets(self):
+        conn = self._connect()
+        pets = {}
+        for name, profile in conn.execute("SELECT name, profile FROM pets ORDER BY position").fetchall():
+            pet = json.loads(profile)
+            for collection in COLLECTIONS:
+                pet[collection] = list(self._rows(conn, name, collection))
+            pets[name] = pet
+        return pets
+
+    def save_pets(self, pets, meta=None):
+        conn = self._connect()
+        with conn:  # One transaction, so pets and meta can't disagree after a crash
+            if meta is not None:
+                self._write_meta(conn, meta)
+            for table in ("pets",) + COLLECTIONS:
+                conn.execute(f"DELETE FROM {table}")
+            for position, (name, pet) in enumerate(pets.items()):
+                profile = {k: v for k, v in pet.items() if k not in COLLECTIONS}
+                conn.execute(
+                    "INSERT INTO pets (name, position, profile) VALUES (?, ?, ?)",
+                    (name, position, json.dumps(profile)),
+                )
+                for collection in COLLECTIONS:
+                    for entry in pet.get(collection, []):
+                        self._insert(conn, name, collection, entry)
+
+    def load_meta(self):
+        return {key: json.loads(value) for key, value in self._connect().execute("SELECT key, value FROM meta")}
+
+    def save_meta(self, meta):
+        conn = self._connect()
+        with conn:
+            self._write_meta(conn, meta)
+
+    @staticmethod
+    def _write_meta(conn, meta):
+        conn.execute("DELETE FROM meta")
+        conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)",
+                         [(key, json.dumps(value)) for key, value in meta.items()])
+
+    def save_changes(self, pets, changes):
+        conn = self._connect()
+        with conn:  # One transaction; only the changed pets' rows are touched
+            for name, parts in changes.items():
+                if parts is None:
+                    for table in ("pets",) + COLLECTIONS:
+                        column = "name" if table == "pets" else "pet"
+                        conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (name,))
+                    continue
+                pet = pets[name]
+                if "profile" in parts:
+                    profile = json.dumps({k: v for k, v in pet.items() if k not in COLLECTIONS})
+                    updated = conn.execute("UPDATE pets SET profile = ? WHERE name = ?", (profile, name))
+                    if updated.rowcount == 0:
+                        conn.execute(
+                            "INSERT INTO pets (name, position, profile) "
+                            "VALUES (?, (SELECT COALESCE(MAX(position), -1) + 1 FROM pets), ?)",
+                            (name, profile),
+                        )
+                for collection in COLLECTIONS:
+                    if collection in parts:
+                        conn.execute(f"DELETE FROM {collection} WHERE pet = ?", (name,))
+                        for entry in pet.get(collection, []):
+                            self._insert(conn, name, collection, entry)
+
+    def append_entry(self, pet_name, collection, entry):
+        conn = self._connect()
+        with conn:
+            self._insert(conn, pet_name, collection, entry)
+
+    def append_entries(self, items):
+        conn = self._connect()
+        with conn:  # One transaction for the whole batch
+            for pet_name, collection, entry in items:
+                self._insert(conn, pet_name, collection, entry)
+
+    def iter_entries(self, pet_name, collection, start=None, end=None):
+        yield from self._rows(self._connect(), pet_name, collection, start, end)
+
+    def reset(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        for path in (self.db_file, f"{self.db_file}-wal", f"{self.db_file}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+        self.import_from = None  # Don't re-import old JSON after a wipe
+        JsonPetStore().reset()
+
+
+# --- SHARED STORE ---
+_store = None
+
+
+def get_store() -> PetStore:
+    """Return the process-wide store for the configured backend."""
+    global _store
+    if _store is None:
+        if STORAGE_BACKEND == "sqlite":
+            _store = SqlitePetStore()
+        else:
+            _store = JsonPetStore()
+    return _store
+
+
+def _is_corrupt_data(error):
+    if isinstance(error, json.JSONDecodeError):
+        return True
+    sqlite3 = sys.modules.get("sqlite3")  # Not imported unless the SQLite backend ran
+    return sqlite3 is not None and isinstance(error, sqlite3.DatabaseError)
+
+
+def load_pets() -> dict:
+    """
+    Load pets from the configured store, migrating older data to the
+    current schema once. Return empty dict if missing or invalid.
+    """
+    store = get_store()
+    try:
+        pets = store.load_pets()
+    except Exception as e:
+        if not _is_corrupt_data(e):
+            raise
+        print(Colors.RED + "⚠️  Corrupted pets data. Starting fresh (a damaged pets.json is kept as pets.json.corrupt)." + Colors.RESET)
+        return {}
+    migrate(store, pets)
+    if COMPACT_HISTORY:
+        compact_pets(pets)
+    return pets
+
+
+def save_pets(pets: dict) -> None:
+    """Save all pets to the configured store."""
+    get_store().save_pets(pets)
@@ -0,0 +1,66 @@
+# utils/suppression.py
+"""
+Compiled quiet-hours / snooze windows for reminder checks.
+
+A pet's quiet_hours ({"start": "HH:MM", "end": "HH:MM"}, possibly wrapping
+midnight) are compiled once into a 1440-entry minute-of-day bitmap, shared
+by every pet with the same hours. snooze_until is parsed once into an
+epoch. A pet is recompiled only when those settings change, so "is this
+reminder suppressed?" is a couple of dict lookups and one index:
+
+    (epoch // 60) % 1440   # naive epochs count local wall-clock time
+"""
+from functools import lru_cache
+from utils import timestamps
+
+MINUTES_PER_DAY = 1440
+
+
+@lru_cache(maxsize=None)
+def quiet_bitmap(start, end):
+    """
+    bytes of MINUTES_PER_DAY flags, 1 inside [start, end) (wrapping past
+    midnight when end < start). None for missing/invalid/empty windows.
+    """
+    first, last = timestamps.minute_of_day(start), timestamps.minute_of_day(end)
+    if first is None or last is None or first == last:
+        return None
+    bits = bytearray(MINUTES_PER_DAY)
+    if first < last:
+        bits[first:last] = b"\x01" * (last - first)
+    else:
+        bits[first:] = b"\x01" * (MINUTES_PER_DAY - first)
+        bits[:last] = b"\x01" * last
+    return bytes(bits)
+
+
+class SuppressionIndex:
+    def __init__(self):
+        self._compiled = {}   # pet name -> (settings key, quiet bitmap, snooze epoch)
+
+    @staticmethod
+    def _settings(pet):
+        quiet = pet.get("quiet_hours") or {}
+        return quiet.get("start"), quiet.get("end"), pet.get("snooze_until")
+
+    def _entry(self, pet_name, pet):
+        key = self._settings(pet)
+        entry = self._compiled.get(pet_name)
+        if entry is None or entry[0] != key:
+            start, end, snooze = key
+            entry = self._compiled[pet_name] = (key, quiet_bitmap(start, end), timestamps.parse_epoch(snooze))
+        return entry
+
+    def is_suppressed(self, pet_name, pet, epoch):
+        """True if a reminder at `epoch` falls in the pet's snooze or quiet hours."""
+        _, bits, snooze = self._entry(pet_name, pet)
+        if snooze is not None and epoch < snooze:
+            return True
+        return bits is not None and bits[int(epoch // 60) % MINUTES_PER_DAY] == 1
+
+    def forget(self, pet_name=None):
+        """Drop compiled windows for one pet (or all, e.g. after a reload)."""
+        if pet_name is None:
+            self._compiled.clear()
+        else:
+            self._compiled.pop(pet_name, None)
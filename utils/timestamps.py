@@ -0,0 +1,120 @@
+# utils/timestamps.py
+"""
+Parse-once timestamp codec.
+
+Stored timestamps come in a few shapes ("2026-02-20", "2026-02-20 09:00",
+"2026-02-20 09:00:00", ISO "2026-02-20T19:39:45.679699"). Instead of every
+renderer guessing the format with strptime, each string is parsed once into
+epoch seconds and cached (up to MAX_CACHED strings; the caches are also
+emptied when the stored data is reset). Epochs are "naive" (local
+wall-clock time counted from 1970-01-01), so they sort and subtract
+correctly without timezone work.
+"""
+from datetime import datetime, timedelta
+from itertools import repeat
+
+EPOCH = datetime(1970, 1, 1)
+
+MAX_CACHED = 500_000  # Per cache; a full cache starts over rather than growing forever
+
+_epoch_cache = {}    # timestamp string -> epoch seconds (None if unparseable)
+_display_cache = {}  # timestamp string -> "Apr 5, 8:30 AM"
+_MISSING = object()
+
+
+def _parse(time_str):
+    try:
+        # fromisoformat accepts all of our stored shapes and is far faster than strptime
+        dt = datetime.fromisoformat(time_str)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.replace(tzinfo=None)
+    return (dt - EPOCH).total_seconds()
+
+
+def parse_epoch(time_str, cache=True):
+    """
+    Return epoch seconds for a stored timestamp string, or None if invalid.
+    Pass cache=False for one-off conversions (e.g. columnar storage) that
+    shouldn't keep the string alive in the cache.
+    """
+    if not cache:
+        return _epoch_cache.get(time_str) if time_str in _epoch_cache else _parse(time_str)
+    try:
+        return _epoch_cache[time_str]
+    except KeyError:
+        if len(_epoch_cache) >= MAX_CACHED:
+            _epoch_cache.clear()
+        epoch = _epoch_cache[time_str] = _parse(time_str)
+        return epoch
+    except TypeError:
+        return None  # Unhashable / not a string
+
+
+def parse_epochs(time_strs):
+    """parse_epoch() over many strings; cached ones are looked up in one C-level pass."""
+    time_strs = list(time_strs)
+    try:
+        epochs = list(map(_epoch_cache.get, time_strs, repeat(_MISSING)))
+    except TypeError:  # Something unhashable in there: go one by one
+        return [parse_epoch(time_str) for time_str in time_strs]
+    if _MISSING in epochs:
+        epochs = [parse_epoch(s) if e is _MISSING else e for s, e in zip(time_strs, epochs)]
+    return epochs
+
+
+def to_datetime(time_str):
+    """Return a datetime for a stored timestamp string, or None if invalid."""
+    epoch = parse_epoch(time_str)
+    return None if epoch is None else from_epoch(epoch)
+
+
+def from_epoch(epoch):
+    return EPOCH + timedelta(seconds=epoch)
+
+
+def to_epoch(dt):
+    return (dt - EPOCH).total_seconds()
+
+
+def now_epoch():
+    return to_epoch(datetime.now())
+
+
+def minute_of_day(hhmm):
+    """'HH:MM' -> minutes after midnight, or None if invalid."""
+    try:
+        t = datetime.strptime(hhmm, "%H:%M")
+    except (TypeError, ValueError):
+        return None
+    return t.hour * 60 + t.minute
+
+
+def has_time(time_str):
+    """True if the stored string carries a time of day (not just a date)."""
+    return isinstance(time_str, str) and len(time_str) > 10
+
+
+def format_display(time_str):
+    """'2025-04-05 08:30[:00]' -> 'Apr 5, 8:30 AM'; anything else is returned unchanged."""
+    try:
+        return _display_cache[time_str]
+    except KeyError:
+        pass
+    except TypeError:
+        return time_str
+    epoch = parse_epoch(time_str)
+    if epoch is None or not has_time(time_str):
+        text = time_str
+    else:
+        text = from_epoch(epoch).strftime("%b %d, %I:%M %p").replace(" 0", " ")  # Remove leading zero
+    if len(_display_cache) >= MAX_CACHED:
+        _display_cache.clear()
+    _display_cache[time_str] = text
+    return text
+
+
+def clear_cache():
+    _epoch_cache.clear()
+    _display_cache.clear()
@@ -0,0 +1,216 @@
+# utils/weight_chart.py
+"""
+Terminal weight charts and sparklines.
+
+Weights are turned into a time-sorted WeightSeries (epoch times + values in
+typed arrays), cached per pet and extended in place as new weights are
+logged. Rendering downsamples the requested time window into one min/max
+bucket per character column, so the drawing work depends only on the chart
+size.
+
+Bucket boundaries are found with bisect, and bucket min/max come from
+per-block summaries (BLOCK points each), so a render touches roughly
+width * (2 * BLOCK + n / (BLOCK * width)) values however long the history is.
+"""
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from utils import timestamps
+from utils.repository import repository
+
+CHART_WIDTH = 60
+CHART_HEIGHT = 10
+SPARKLINE_WIDTH = 20
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+BLOCK = 256  # Points summarized per block min/max
+
+
+class WeightSeries:
+    """Time-sorted (epoch, kg) points with per-block min/max summaries."""
+
+    def __init__(self):
+        self.times = array("d")
+        self.values = array("d")
+        self._block_min = array("d")
+        self._block_max = array("d")
+
+    def __len__(self):
+        return len(self.times)
+
+    def extend(self, points):
+        """
+        Add (epoch, kg) points. Returns False (and adds nothing) if any point
+        is older than the series' last point — the caller rebuilds instead.
+        """
+        points = list(points)
+        last = self.times[-1] if self.times else -math.inf
+        for t, _ in points:
+            if t < last:
+                return False
+            last = t
+        first_dirty = len(self.times) // BLOCK
+        for t, v in points:
+            self.times.append(t)
+            self.values.append(v)
+        self._summarize_from(first_dirty)
+        return True
+
+    def _summarize_from(self, block):
+        del self._block_min[block:]
+        del self._block_max[block:]
+        for start in range(block * BLOCK, len(self.values), BLOCK):
+            chunk = self.values[start:start + BLOCK]
+            self._block_min.append(min(chunk))
+            self._block_max.append(max(chunk))
+
+    # --- QUERIES ---
+    def window(self, start=None, end=None):
+        """Index range [lo, hi) of points with start <= time <= end (epochs, None = open)."""
+        lo = 0 if start is None else bisect_left(self.times, start)
+        hi = len(self.times) if end is None else bisect_right(self.times, end)
+        return lo, max(lo, hi)
+
+    def minmax(self, lo, hi):
+        """(min, max) of values[lo:hi] using block summaries for the middle part."""
+        first_block = -(-lo // BLOCK)
+        last_block = hi // BLOCK
+        if last_block - first_block < 2:
+            chunk = self.values[lo:hi]
+            return min(chunk), max(chunk)
+        parts = [self.values[lo:first_block * BLOCK], self.values[last_block * BLOCK:hi]]
+        low = min(self._block_min[first_block:last_block])
+        high = max(self._block_max[first_block:last_block])
+        for part in parts:
+            if part:
+                low, high = min(low, min(part)), max(high, max(part))
+        return low, high
+
+    def buckets(self, n, start=None, end=None):
+        """
+        Split the time window into n equal-time buckets. Returns (t0, t1, rows)
+        where rows[i] is (min, max, last) for bucket i, or None if it's empty.
+        """
+        lo, hi = self.window(start, end)
+        if lo == hi:
+            return None, None, [None] * n
+        t0 = self.times[lo] if start is None else start
+        t1 = self.times[hi - 1] if end is None else end
+        span = (t1 - t0) or 1.0
+        rows = []
+        a = lo
+        for i in range(n):
+            edge = t0 + span * (i + 1) / n
+            b = hi if i == n - 1 else max(a, bisect_right(self.times, edge, a, hi))
+            if b > a:
+                low, high = self.minmax(a, b)
+                rows.append((low, high, self.values[b - 1]))
+            else:
+                rows.append(None)
+            a = b
+        return t0, t1, rows
+
+
+def _points(weights):
+    """(epoch, kg) pairs for the usable weight entries."""
+    for w in weights:
+        epoch = timestamps.parse_epoch(w.get("timestamp"), cache=False)
+        value = w.get("weight")
+        if epoch is not None and isinstance(value, (int, float)) and not math.isnan(value):
+            yield epoch, float(value)
+
+
+def _column_points(weights):
+    """Same as _points, read straight from WeightColumns arrays."""
+    for t, v in zip(weights.column("timestamp"), weights.column_values("weight")):
+        if not (math.isnan(t) or math.isnan(v)):
+            yield t, v
+
+
+# --- SERIES CACHE ---
+_series_cache = {}  # pet name -> (weights, count, last entry, WeightSeries)
+_cache_generation = None  # repository.generation the cache was filled under
+
+
+def series_for(pet_name, weights):
+    """
+    Cached WeightSeries for a pet's weights list. New entries appended since
+    the last call are added incrementally; anything else triggers a rebuild.
+    The whole cache is dropped whenever the repository loads or saves pets.
+    """
+    global _cache_generation
+    if _cache_generation != repository.generation:
+        _series_cache.clear()
+        _cache_generation = repository.generation
+    count = len(weights)
+    last = weights[-1] if count else None
+    cached = _series_cache.get(pet_name)
+    series = None
+    if cached is not None and cached[0] is weights and cached[1] <= count:
+        _, cached_count, cached_last, series = cached
+        if cached_count and weights[cached_count - 1] != cached_last:
+            series = None  # Edited in place
+        elif cached_count < count and not series.extend(_points(weights[cached_count:])):
+            series = None  # Back-dated entry
+    if series is None:
+        reader = _column_points if hasattr(weights, "column") else _points
+        points = sorted(reader(weights), key=lambda point: point[0])  # Stable: same-minute readings keep log order
+        series = WeightSeries()
+        series.extend(points)
+    _series_cache[pet_name] = (weights, count, last, series)
+    return series
+
+
+# --- RENDERING ---
+def _scale(value, low, high, steps):
+    if high - low < 1e-9:
+        return steps // 2
+    return min(steps - 1, max(0, int(round((value - low) / (high - low) * (steps - 1)))))
+
+
+def sparkline(series, width=SPARKLINE_WIDTH, start=None, end=None):
+    """One-line trend of the window, one character per bucket ("" if empty)."""
+    _, _, rows = series.buckets(width, start, end)
+    present = [row for row in rows if row is not None]
+    if not present:
+        return ""
+    low = min(row[0] for row in present)
+    high = max(row[1] for row in present)
+    return "".join(" " if row is None else SPARK_CHARS[_scale(row[2], low, high, len(SPARK_CHARS))]
+                   for row in rows)
+
+
+def render_chart(series, width=CHART_WIDTH, height=CHART_HEIGHT, start=None, end=None):
+    """
+    Multi-line chart of the window. Each column spans its bucket's min..max,
+    so spikes survive downsampling. Returns a list of lines ([] if empty).
+    """
+    t0, t1, rows = series.buckets(width, start, end)
+    present = [row for row in rows if row is not None]
+    if not present:
+        return []
+    low = min(row[0] for row in present)
+    high = max(row[1] for row in present)
+
+    grid = [[" "] * width for _ in range(height)]
+    for x, row in enumerate(rows):
+        if row is None:
+            continue
+        y_low, y_high = _scale(row[0], low, high, height), _scale(row[1], low, high, height)
+        for y in range(y_low, y_high + 1):
+            grid[y][x] = "●" if y_low == y_high else "│"
+
+    lines = []
+    for y in range(height - 1, -1, -1):
+        if y == height - 1:
+            label = f"{high:7.2f}"
+        elif y == 0:
+            label = f"{low:7.2f}"
+        else:
+            label = " " * 7
+        lines.append(f"{label} ┤" + "".join(grid[y]))
+    lines.append(" " * 8 + "└" + "─" * width)
+
+    first = timestamps.from_epoch(t0).strftime("%b %d, %Y")
+    last = timestamps.from_epoch(t1).strftime("%b %d, %Y")
+    lines.append(" " * 9 + first + last.rjust(max(1, width - len(first))))
+    return lines